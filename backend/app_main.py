@@ -5,7 +5,7 @@ from utils.logging_config import setup_logging
 
 # 안전한 import - Railway 환경에서 실패할 수 있는 모듈들
 try:
-    from routers import upload, download, websocket, history
+    from routers import upload, download, websocket, history, batch
     from services.cleanup import cleanup_temp_files, ensure_cleanup_directories
     ROUTERS_AVAILABLE = True
     print("✅ 모든 라우터 import 성공")
@@ -40,6 +40,7 @@ if ROUTERS_AVAILABLE:
     app.include_router(download.router, prefix="/api", tags=["download"])
     app.include_router(websocket.router, prefix="/api", tags=["websocket"])
     app.include_router(history.router, prefix="/api", tags=["history"])
+    app.include_router(batch.router, prefix="/api", tags=["batch"])
     print("✅ 라우터 등록 완료")
 else:
     print("⚠️ 라우터를 사용할 수 없음")
@@ -60,6 +61,8 @@ async def api_info():
         "endpoints": {
             "upload": "/api/upload",
             "download": "/api/download/{file_id}",
+            "batch_upload": "/api/batch/upload",
+            "batch_download": "/api/batch/{batch_id}/download",
             "docs": "/docs",
             "redoc": "/redoc"
         }
@@ -83,8 +86,32 @@ async def startup_event():
             from services.history_service import history_service
             await history_service.start_cleanup_task()
             
+            # 워커 모드면 변환 워커 프로세스 시작
+            from services.worker_pool import worker_pool
+            await worker_pool.start()
+            
+            # 작업 저장소 초기화 및 중단된 작업 복구
+            from services.job_store import job_store
+            from services.enhanced_conversion_service import enhanced_conversion_service
+            await job_store.initialize()
+            await job_store.start_cleanup_task()
+            recovered = await enhanced_conversion_service.recover_interrupted_jobs()
+            if recovered:
+                print(f"♻️ 중단된 변환 작업 {recovered}개 복구")
+            
             print("✅ 백그라운드 서비스 시작 완료")
         except Exception as e:
             print(f"⚠️ 백그라운드 서비스 시작 실패: {e}")
     else:
-        print("⚠️ 백그라운드 서비스를 사용할 수 없음")
\ No newline at end of file
+        print("⚠️ 백그라운드 서비스를 사용할 수 없음")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """애플리케이션 종료 시 실행되는 이벤트"""
+    if ROUTERS_AVAILABLE:
+        try:
+            from services.worker_pool import worker_pool
+            await worker_pool.stop()
+        except Exception as e:
+            print(f"⚠️ 워커 종료 실패: {e}")
\ No newline at end of file
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Claude 응답 파싱 마이크로 벤치마크
+
+실행 (backend 디렉토리에서):
+    python -m benchmarks.bench_claude_parsing --rows 1000 5000 --repeat 20
+
+대용량 응답에 대해 기존 파싱 방식(find/rfind/strip + 연속 replace)과
+현재 `ClaudeIntegration._parse_claude_response` 구현의 소요 시간을 비교한다.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("CLAUDE_API_KEY", "sk-ant-benchmark")
+
+from services import claude_integration
+from services.claude_integration import ClaudeIntegration
+from utils.amount_parser import _parse_amount_string
+
+MERCHANTS = ["스타벅스", "카카오페이 입금", "GS25", "쿠팡", "급여", "관리비", "이마트", "배달의민족"]
+AMOUNTS = ["-5,800원", "₩100,000", "(12,000)", "-3,500", "+2,500,000원", "-45,000원", "-18,900", "(7,700)"]
+
+
+def build_response(rows: int, seed: int = 42) -> str:
+    """```json 블록으로 감싼 합성 Claude 응답 생성"""
+    rng = random.Random(seed)
+    items = [
+        {
+            "Date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "Description": rng.choice(MERCHANTS),
+            "Amount": rng.choice(AMOUNTS),
+        }
+        for _ in range(rows)
+    ]
+    return "다음은 추출된 거래 내역입니다.\n```json\n" + json.dumps(items, ensure_ascii=False, indent=2) + "\n```\n"
+
+
+def legacy_parse(content: str) -> list:
+    """최적화 이전의 파싱 로직 (비교 기준)"""
+    content = content.strip()
+    if "```json" in content:
+        start = content.find("```json") + 7
+        end = content.find("```", start)
+        json_str = content[start:end].strip()
+    elif content.startswith('[') and content.endswith(']'):
+        json_str = content
+    else:
+        start = content.find('[')
+        end = content.rfind(']') + 1
+        json_str = content[start:end]
+
+    validated = []
+    for item in json.loads(json_str):
+        if isinstance(item, dict) and all(key in item for key in ["Date", "Description", "Amount"]):
+            validated.append({
+                "Date": str(item["Date"]),
+                "Description": str(item["Description"]),
+                "Amount": legacy_amount(item["Amount"]),
+            })
+    return validated
+
+
+def legacy_amount(amount_str) -> float:
+    if isinstance(amount_str, (int, float)):
+        return float(amount_str)
+    cleaned = str(amount_str).strip()
+    cleaned = cleaned.replace('₩', '').replace('원', '').replace(',', '').replace(' ', '')
+    is_negative = False
+    if cleaned.startswith('(') and cleaned.endswith(')'):
+        cleaned = cleaned[1:-1]
+        is_negative = True
+    elif cleaned.startswith('-'):
+        is_negative = True
+        cleaned = cleaned[1:]
+    elif cleaned.startswith('+'):
+        cleaned = cleaned[1:]
+    try:
+        amount = float(cleaned)
+        return -amount if is_negative else amount
+    except ValueError:
+        return 0.0
+
+
+def timeit(func, content: str, repeat: int) -> float:
+    """최소 실행 시간(초) 반환"""
+    best = float("inf")
+    for _ in range(repeat):
+        _parse_amount_string.cache_clear()
+        started = time.perf_counter()
+        func(content)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Claude 응답 파싱 벤치마크")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 5000, 20000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    service = ClaudeIntegration()
+    print(f"orjson available: {claude_integration.ORJSON_AVAILABLE}")
+    print(f"{'rows':>8} {'legacy ms':>12} {'current ms':>12} {'speedup':>8}")
+
+    for rows in args.rows:
+        content = build_response(rows)
+        assert legacy_parse(content) == service._parse_claude_response(content)
+
+        legacy = timeit(legacy_parse, content, args.repeat)
+        current = timeit(service._parse_claude_response, content, args.repeat)
+        print(f"{rows:>8} {legacy * 1000:>12.2f} {current * 1000:>12.2f} {legacy / current:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
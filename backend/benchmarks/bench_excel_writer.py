@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Excel 생성 벤치마크 (소요 시간과 최대 메모리)
+
+실행 (backend 디렉토리에서):
+    python -m benchmarks.bench_excel_writer --rows 10000 100000 1000000
+
+기존 방식(xlsxwriter 기본 메모리 모드 + 셀 단위 write, 전체 행 리스트)과
+현재 `ExcelGenerator.write_workbook` 구현(constant_memory + write_row, 행 이터레이터,
+열 단위 타입 추론으로 날짜/금액 변환)을 비교한다.
+최대 RSS는 프로세스 전체 수명의 값이므로 측정마다 새 프로세스에서 실행하고,
+import 직후의 RSS를 기준으로 증가분을 보고한다.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import xlsxwriter
+
+from services.excel_generator import ExcelGenerator
+
+HEADERS = ["날짜", "적요", "출금", "입금", "잔액"]
+MERCHANTS = ["스타벅스", "카카오페이 입금", "GS25", "쿠팡", "급여", "관리비", "이마트", "배달의민족"]
+
+
+def generate_rows(rows: int, seed: int = 42):
+    """합성 거래 행 생성 (금액은 쉼표가 들어간 문자열)"""
+    rng = random.Random(seed)
+    balance = 1_000_000
+    for _ in range(rows):
+        amount = rng.randint(1, 500) * 100
+        withdrawal = rng.random() < 0.7
+        balance += -amount if withdrawal else amount
+        yield [
+            f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            rng.choice(MERCHANTS),
+            f"{amount:,}" if withdrawal else "",
+            "" if withdrawal else f"{amount:,}",
+            f"{balance:,}",
+        ]
+
+
+def legacy_is_numeric(value) -> bool:
+    if not isinstance(value, str):
+        return False
+    cleaned = value.strip().replace(',', '').replace('$', '').replace('₩', '')
+    if cleaned.startswith('(') and cleaned.endswith(')'):
+        cleaned = cleaned[1:-1]
+    try:
+        float(cleaned)
+        return True
+    except ValueError:
+        return False
+
+
+def legacy_parse_numeric(value) -> float:
+    cleaned = value.strip().replace(',', '').replace('$', '').replace('₩', '')
+    is_negative = False
+    if cleaned.startswith('(') and cleaned.endswith(')'):
+        cleaned = cleaned[1:-1]
+        is_negative = True
+    elif cleaned.startswith('-'):
+        is_negative = True
+        cleaned = cleaned[1:]
+    numeric_value = float(cleaned)
+    return -numeric_value if is_negative else numeric_value
+
+
+def legacy_write(excel_path: str, headers, rows):
+    """최적화 이전의 생성 로직 (셀마다 숫자 여부 확인 후 다시 파싱, 비교 기준)"""
+    workbook = xlsxwriter.Workbook(excel_path)
+    worksheet = workbook.add_worksheet('Bank Statement')
+    header_format = workbook.add_format({'bold': True, 'bg_color': '#4CAF50', 'font_color': 'white', 'border': 1})
+    cell_format = workbook.add_format({'border': 1, 'align': 'left', 'valign': 'vcenter'})
+    number_format = workbook.add_format({'border': 1, 'align': 'right', 'valign': 'vcenter', 'num_format': '#,##0.00'})
+
+    for col, header in enumerate(headers):
+        worksheet.write(0, col, header, header_format)
+        worksheet.set_column(col, col, max(len(header) + 2, 12))
+
+    for row_idx, row in enumerate(rows, start=1):
+        for col_idx, cell_value in enumerate(row):
+            if legacy_is_numeric(cell_value):
+                worksheet.write(row_idx, col_idx, legacy_parse_numeric(cell_value), number_format)
+            else:
+                worksheet.write(row_idx, col_idx, cell_value, cell_format)
+
+    worksheet.autofilter(0, 0, len(rows), len(headers) - 1)
+    worksheet.freeze_panes(1, 0)
+    workbook.close()
+
+
+def peak_rss_mb() -> float:
+    # Linux는 KB, macOS는 바이트 단위
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(mode: str, rows: int, result_queue):
+    """새 프로세스에서 한 가지 경우를 실행하고 (초, RSS 증가 MB, 파일 크기 MB) 반환"""
+    baseline = peak_rss_mb()
+    with tempfile.TemporaryDirectory() as directory:
+        excel_path = os.path.join(directory, "bench.xlsx")
+        started = time.perf_counter()
+        if mode == "legacy":
+            legacy_write(excel_path, HEADERS, list(generate_rows(rows)))
+        else:
+            ExcelGenerator().write_workbook(excel_path, HEADERS, generate_rows(rows))
+        elapsed = time.perf_counter() - started
+        size_mb = os.path.getsize(excel_path) / (1024 * 1024)
+    result_queue.put((elapsed, peak_rss_mb() - baseline, size_mb))
+
+
+def measure(mode: str, rows: int) -> tuple:
+    context = multiprocessing.get_context("spawn")
+    result_queue = context.Queue()
+    process = context.Process(target=run_case, args=(mode, rows, result_queue))
+    process.start()
+    result = result_queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Excel 생성 벤치마크")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--skip-legacy", action="store_true", help="기존 방식 측정 생략 (대용량에서 메모리가 부족한 경우)")
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'mode':>9} {'seconds':>9} {'rows/s':>10} {'peak MB':>9} {'file MB':>8}")
+    for rows in args.rows:
+        modes = ["streaming"] if args.skip_legacy else ["legacy", "streaming"]
+        for mode in modes:
+            elapsed, rss_mb, size_mb = measure(mode, rows)
+            print(f"{rows:>9} {mode:>9} {elapsed:>9.2f} {rows / elapsed:>10.0f} {rss_mb:>9.1f} {size_mb:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
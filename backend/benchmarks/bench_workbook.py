@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+"""
+Excel 결과 생성 벤치마크와 회귀 검사
+
+실행 (backend 디렉토리에서):
+    python -m benchmarks.bench_workbook --baseline-ref HEAD   # 커밋되지 않은 변경을 HEAD와 같은 실행에서 비교
+    python -m benchmarks.bench_workbook --baseline-ref main   # 브랜치 변경을 main과 비교
+    python -m benchmarks.bench_workbook                       # 저장된 기준값과 비교
+    python -m benchmarks.bench_workbook --update-baseline     # 현재 측정값을 기준값으로 저장
+    python -m benchmarks.bench_workbook --shapes statement --rows 100000 --no-check
+
+합성 한국 거래 내역 표(모양 × 행 수)마다 새 프로세스에서 다음을 측정한다.
+    - workbook: 파이프라인과 같은 `ExcelGenerator.create_excel` (ColumnarTable 입력, Summary 시트 포함)
+      행/초, 최대 메모리 증가분(입력 표를 만든 뒤 기준), 결과 크기
+    - parse: Excel 생성이 셀마다 호출하는 금액/날짜 파서 (infer_column_types로 고른 열, 캐시 비운 상태) 셀/초
+    - summary: `summarize_table` 거래 요약 행/초
+    - summary sheet: `_add_summary_sheet` 한 번의 소요 시간 (ms)
+
+기준과 비교해 처리량/시간(모든 경우와 회차의 비율 중앙값)이 --tolerance 비율보다 나빠지거나
+경우별 최대 메모리/결과 크기가 그만큼 늘어나면 종료 코드 1을 반환한다.
+
+--baseline-ref 는 지정한 리비전을 임시 git worktree로 꺼내 같은 실행 안에서 경우마다 번갈아 측정하므로
+기계 속도와 부하 변화가 양쪽에 같이 반영된다 (변경의 수치를 낼 때는 이 방식을 사용).
+저장된 기준값(bench_workbook_baseline.json)은 기록한 호스트에서만 회귀로 실패하고,
+다른 호스트에서는 비교 결과를 경고로만 보여준다.
+기준 리비전에는 이 벤치마크가 호출하는 API(ColumnarTable, summarize_table, create_excel)가 있어야 한다.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+# --run-case 하위 프로세스는 이 환경변수가 가리키는 트리(기준 리비전의 worktree)의 코드를 측정
+BACKEND_ENV = "BENCH_WORKBOOK_BACKEND"
+sys.path.insert(0, os.environ.get(BACKEND_ENV, str(BACKEND_DIR)))
+
+import xlsxwriter
+
+from models.columnar import ColumnarTable
+from services.excel_generator import ExcelGenerator, infer_column_types, COLUMN_AMOUNT, COLUMN_DATE
+from services.result_cache import result_cache
+from services.statement_summary import summarize_table
+from utils import amount_parser, date_parser
+from utils.amount_parser import try_parse_korean_amount
+from utils.date_parser import parse_statement_date
+from utils.file_manager import FileManager
+
+BASELINE_PATH = Path(__file__).resolve().parent / "bench_workbook_baseline.json"
+
+MERCHANTS = [
+    "스타벅스 강남점", "카카오페이 입금", "GS25 역삼점", "쿠팡(주)", "급여", "관리비", "이마트 성수점",
+    "배달의민족", "국민연금", "SKT 통신요금", "네이버페이", "현대카드 결제", "토스 홍길동", "ATM 출금",
+]
+BRANCHES = ["강남", "역삼", "성수", "여의도", "인터넷", "모바일"]
+BANKS = ["국민", "신한", "우리", "하나", "농협", "카카오뱅크"]
+
+# 회귀 검사 지표
+# 처리량/시간: 측정 잡음이 커서 모든 경우와 회차의 비율 중앙값으로 판단 (지표 → 클수록 좋은지)
+TIMED_METRICS = {"workbook_rows_s": True, "parse_cells_s": True, "summary_rows_s": True, "summary_sheet_ms": False}
+# 메모리/크기: 경우마다 판단
+SIZE_METRICS = ("peak_mb", "output_mb")
+
+# 짧은 측정을 반복할 최소 시간 (초, 반복 횟수당)
+MIN_ROUND_SECONDS = 0.1
+
+
+def _transactions(rng: random.Random, rows: int, balance: int = 3_000_000):
+    """(날짜, 시각, 거래처, 금액, 잔액) 합성 거래 (오래된 거래부터, 잔액이 맞게)"""
+    day = 0
+    for _ in range(rows):
+        day += rng.random() < 0.3
+        month, date = 1 + (day // 28) % 12, 1 + day % 28
+        amount = rng.randint(1, 800) * 100
+        if rng.random() < 0.7:
+            amount = -amount
+        balance += amount
+        yield (
+            f"2024-{month:02d}-{date:02d}",
+            f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+            rng.choice(MERCHANTS),
+            amount,
+            balance,
+        )
+
+
+def _statement_rows(rng: random.Random, rows: int):
+    """출금/입금/잔액 열이 따로 있는 은행 거래 내역"""
+    for date, _, merchant, amount, balance in _transactions(rng, rows):
+        yield [date, merchant, f"{-amount:,}" if amount < 0 else "", f"{amount:,}" if amount > 0 else "", f"{balance:,}"]
+
+
+def _signed_rows(rng: random.Random, rows: int):
+    """부호 있는 금액 한 열과 점 구분 날짜/시각 (카드/간편결제 내역)"""
+    for date, time_of_day, merchant, amount, _ in _transactions(rng, rows):
+        yield [f"{date.replace('-', '.')} {time_of_day}", merchant, f"{amount:,}원"]
+
+
+def _wide_rows(rng: random.Random, rows: int):
+    """거래점, 상대 계좌, 메모 등 열이 많은 내역"""
+    for date, time_of_day, merchant, amount, balance in _transactions(rng, rows):
+        yield [
+            date, time_of_day, "이체" if rng.random() < 0.5 else "카드", merchant,
+            f"{-amount:,}" if amount < 0 else "", f"{amount:,}" if amount > 0 else "", f"{balance:,}",
+            rng.choice(BRANCHES), rng.choice(BANKS), f"{rng.randint(100, 999)}-{rng.randint(10, 99)}-{rng.randint(100000, 999999)}",
+            "" if rng.random() < 0.8 else f"메모 {rng.randint(1, 50)}", "0",
+        ]
+
+
+STATEMENT_HEADERS = ["거래일자", "적요", "출금", "입금", "잔액"]
+
+# 모양 → (표마다 (헤더, 행 생성 함수))
+SHAPES = {
+    "statement": [(STATEMENT_HEADERS, _statement_rows)],
+    "signed": [(["거래일시", "가맹점", "금액"], _signed_rows)],
+    "wide": [(
+        ["거래일자", "거래시간", "구분", "적요", "출금", "입금", "잔액", "거래점", "상대은행", "상대계좌", "메모", "수수료"],
+        _wide_rows,
+    )],
+    # 계좌 세 개가 한 명세서에 들어 있는 경우 (시트 세 개)
+    "multi": [(STATEMENT_HEADERS, _statement_rows)] * 3,
+}
+
+
+def build_tables(shape: str, rows: int, seed: int = 42) -> List[ColumnarTable]:
+    """모양에 맞는 합성 표 생성 (행 수는 표들에 나눠 담음)"""
+    rng = random.Random(seed)
+    tables = SHAPES[shape]
+    per_table = max(1, rows // len(tables))
+    return [ColumnarTable.from_rows(headers, generate(rng, per_table)) for headers, generate in tables]
+
+
+def _memory_kb(field: str) -> Optional[int]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> float:
+    """
+    최대 RSS 기준점 설정 (MB)
+
+    Linux에서는 입력 표를 만들며 올라간 최대 RSS를 지우고(clear_refs) 현재 RSS를 기준으로 삼는다.
+    지울 수 없으면 지금까지의 최대 RSS가 기준이 되어 증가분이 작게 보고될 수 있다.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return _memory_kb("VmRSS") / 1024
+    except (OSError, TypeError):
+        return _peak_rss_mb()
+
+
+def _peak_rss_mb() -> float:
+    peak_kb = _memory_kb("VmHWM")
+    if peak_kb is not None:
+        return peak_kb / 1024
+    # Linux는 KB, macOS는 바이트 단위
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _clear_parser_caches():
+    amount_parser._try_parse_amount_string.cache_clear()
+    amount_parser._parse_amount_string.cache_clear()
+    date_parser._parse_date_string.cache_clear()
+
+
+def _typical_time(run: Callable[[Any], Any], repeat: int, setup: Optional[Callable[[], Any]] = None,
+                  cleanup: Optional[Callable[[Any], Any]] = None) -> float:
+    """
+    한 번 실행하는 데 걸리는 시간의 중앙값 (초)
+
+    공유 기계에서는 측정이 짧은 간격으로 크게(최대 2배) 빨라지거나 느려지므로
+    최솟값은 드문 빠른 순간을 좇아 실행마다 달라진다. 중앙값이 가장 안정적이다.
+    repeat 회 이상, 그리고 repeat × MIN_ROUND_SECONDS 동안 반복한다.
+    setup/cleanup 시간은 포함하지 않는다.
+    """
+    samples: List[float] = []
+    while len(samples) < repeat or sum(samples) < repeat * MIN_ROUND_SECONDS:
+        argument = setup() if setup else None
+        started = time.perf_counter()
+        run(argument)
+        samples.append(time.perf_counter() - started)
+        if cleanup:
+            cleanup(argument)
+    return statistics.median(samples)
+
+
+def _measure_parsers(tables: List[ColumnarTable], repeat: int) -> float:
+    """Excel 생성과 같은 방식으로 고른 금액/날짜 열의 셀을 변환하는 속도 (셀/초, 캐시 비운 상태)"""
+    columns = []
+    for table in tables:
+        kinds = infer_column_types(table[:ExcelGenerator.type_sample_rows], len(table.headers))
+        for col, kind in enumerate(kinds):
+            if kind in (COLUMN_AMOUNT, COLUMN_DATE):
+                parse = try_parse_korean_amount if kind == COLUMN_AMOUNT else parse_statement_date
+                columns.append((parse, table.column(col)))
+
+    def parse_all(_):
+        for parse, values in columns:
+            for value in values:
+                if value is not None and value != "":
+                    parse(value)
+
+    cells = sum(len(values) for _, values in columns)
+    return cells / _typical_time(parse_all, repeat, setup=_clear_parser_caches)
+
+
+def _measure_summary_sheet(generator: ExcelGenerator, tables: List[ColumnarTable], summary, repeat: int) -> float:
+    """Summary 시트 하나를 쓰는 시간 (ms, 빈 메모리 통합 문서에 추가해 측정)"""
+    sheet_stats = [
+        ("Bank Statement" if index == 0 else f"Bank Statement ({index + 1})", len(table), len(table.headers))
+        for index, table in enumerate(tables)
+    ]
+    seconds = _typical_time(
+        lambda workbook: generator._add_summary_sheet(workbook, sheet_stats, summary),
+        repeat,
+        setup=lambda: xlsxwriter.Workbook(io.BytesIO(), {"in_memory": True}),
+        cleanup=lambda workbook: workbook.close()
+    )
+    return seconds * 1000
+
+
+def run_case(shape: str, rows: int, repeat: int) -> Dict[str, float]:
+    """한 경우를 측정해 지표 딕셔너리 반환 (경우마다 새 프로세스에서 호출)"""
+    tables = build_tables(shape, rows)
+    total_rows = sum(len(table) for table in tables)
+    generator = ExcelGenerator()
+
+    summary = summarize_table(tables[0].headers, tables[0])
+    summary_rows_s = total_rows / _typical_time(
+        lambda _: [summarize_table(table.headers, table) for table in tables], repeat
+    )
+
+    parse_cells_s = _measure_parsers(tables, repeat)
+    summary_sheet_ms = _measure_summary_sheet(generator, tables, summary, repeat)
+
+    with tempfile.TemporaryDirectory() as directory:
+        FileManager.TEMP_DIR = directory
+        rss_before = _reset_peak_rss()
+        samples, output_bytes = [], 0
+        for attempt in range(repeat):
+            started = time.perf_counter()
+            excel_path = asyncio.run(generator.create_excel(tables, f"bench_{attempt}", summary))
+            samples.append(time.perf_counter() - started)
+            output_bytes = result_cache.size(excel_path)
+            result_cache.discard(excel_path)
+        peak_mb = _peak_rss_mb() - rss_before
+        seconds = statistics.median(samples)
+
+    return {
+        "rows": total_rows,
+        "workbook_seconds": round(seconds, 4),
+        "workbook_rows_s": round(total_rows / seconds, 1),
+        "peak_mb": round(peak_mb, 2),
+        "output_mb": round(output_bytes / (1024 * 1024), 3),
+        "parse_cells_s": round(parse_cells_s, 1),
+        "summary_rows_s": round(summary_rows_s, 1),
+        "summary_sheet_ms": round(summary_sheet_ms, 3),
+    }
+
+
+def measure(shape: str, rows: int, repeat: int, backend_dir: Optional[Path] = None) -> Dict[str, float]:
+    """
+    새 프로세스에서 한 경우 측정
+
+    최대 RSS는 프로세스 수명 전체의 값이므로 경우마다 새 프로세스를 쓰고,
+    backend_dir가 주어지면 그 트리의 서비스 코드를 측정한다.
+    """
+    env = dict(os.environ)
+    env.pop(BACKEND_ENV, None)
+    if backend_dir is not None:
+        env[BACKEND_ENV] = str(backend_dir)
+
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_workbook", "--run-case", shape, str(rows), "--repeat", str(repeat)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if completed.returncode:
+        raise RuntimeError(f"{shape}/{rows} failed in {backend_dir or BACKEND_DIR}:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def merge_rounds(rounds: List[Dict[str, float]]) -> Dict[str, float]:
+    """여러 번 측정한 결과의 지표별 중앙값"""
+    merged = dict(rounds[0])
+    for metric in (*TIMED_METRICS, *SIZE_METRICS):
+        values = [result[metric] for result in rounds if metric in result]
+        if values:
+            merged[metric] = statistics.median(values)
+    return merged
+
+
+@contextmanager
+def reference_tree(revision: str) -> Iterator[Path]:
+    """기준 리비전을 임시 git worktree로 꺼내 그 안의 backend 경로 제공"""
+    top = Path(subprocess.run(
+        ["git", "rev-parse", "--show-toplevel"],
+        cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    ).stdout.strip()).resolve()
+    with tempfile.TemporaryDirectory() as directory:
+        worktree = Path(directory) / "reference"
+        subprocess.run(
+            ["git", "-C", str(top), "worktree", "add", "--detach", "--quiet", str(worktree), revision],
+            check=True
+        )
+        try:
+            yield worktree / BACKEND_DIR.relative_to(top)
+        finally:
+            subprocess.run(["git", "-C", str(top), "worktree", "remove", "--force", str(worktree)], check=False)
+
+
+def find_regressions(
+    results: Dict[str, List[Dict[str, float]]],
+    baseline: Dict[str, List[Dict[str, float]]],
+    tolerance: float,
+    memory_slack_mb: float
+) -> List[str]:
+    """
+    기준보다 tolerance 비율 넘게 나빠진 지표 설명 목록 (경우별 변화율도 출력)
+
+    results/baseline은 경우마다 측정 회차 목록이며, 같은 위치의 회차끼리 짝지어 비율을 낸다
+    (--baseline-ref 에서는 연달아 측정한 두 프로세스라 그 사이의 기계 상태가 같다).
+    공유 기계에서는 같은 코드도 한 경우의 처리량이 20~30% 흔들리므로 처리량과 시간은
+    모든 경우와 회차의 비율(클수록 좋게 맞춤) 중앙값으로 판단한다.
+    코드 변경으로 인한 저하는 대개 여러 경우에 함께 나타난다.
+    최대 메모리와 결과 크기는 잡음이 작아 경우마다 중앙값끼리 비교한다.
+    """
+    regressions = []
+    ratios: Dict[str, List[float]] = {metric: [] for metric in TIMED_METRICS}
+
+    print(f"{'case':>16} " + " ".join(f"{metric:>16}" for metric in (*TIMED_METRICS, *SIZE_METRICS)))
+    for case, current_rounds in results.items():
+        baseline_rounds = baseline.get(case)
+        if not baseline_rounds:
+            print(f"{case:>16} no baseline")
+            continue
+
+        changes = []
+        for metric, higher_is_better in TIMED_METRICS.items():
+            pairs = [
+                (now[metric], before[metric])
+                for now, before in zip(current_rounds, baseline_rounds)
+                if now.get(metric) and before.get(metric)
+            ]
+            if not pairs:
+                changes.append(f"{'-':>16}")
+                continue
+            ratios[metric].extend(now / before if higher_is_better else before / now for now, before in pairs)
+            changes.append(f"{statistics.median(now / before for now, before in pairs) - 1:>+16.1%}")
+
+        current, stored = merge_rounds(current_rounds), merge_rounds(baseline_rounds)
+        for metric in SIZE_METRICS:
+            now, before = current[metric], stored.get(metric)
+            if before is None:
+                changes.append(f"{'-':>16}")
+                continue
+            changes.append(f"{(now - before) / before if before else 0.0:>+16.1%}")
+            # 작은 측정값의 RSS 잡음은 절대 여유분으로 흡수
+            slack = memory_slack_mb if metric == "peak_mb" else 0.0
+            if now > before * (1 + tolerance) + slack:
+                regressions.append(f"{case} {metric} {before:g} → {now:g}")
+        print(f"{case:>16} " + " ".join(changes))
+
+    for metric, values in ratios.items():
+        if not values:
+            continue
+        ratio = statistics.median(values)
+        print(f"{'median':>16} {metric} {ratio:.2f}x")
+        if ratio < 1 - tolerance:
+            regressions.append(f"{metric} {ratio:.2f}x of baseline over {len(values)} measurements")
+    return regressions
+
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def environment() -> Dict[str, Any]:
+    """측정 환경 (처리량 기준값은 같은 호스트에서만 비교할 수 있음)"""
+    return {
+        "host": platform.node(),
+        "cpu": _cpu_model(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "xlsxwriter": xlsxwriter.__version__,
+    }
+
+
+def print_result(case: str, result: Dict[str, float]):
+    print(
+        f"{case:>20} {result['workbook_rows_s']:>9.0f} {result['peak_mb']:>8.1f} {result['output_mb']:>8.2f} "
+        f"{result['parse_cells_s']:>14.0f} {result['summary_rows_s']:>15.0f} {result['summary_sheet_ms']:>9.2f}"
+    )
+
+
+def load_baseline(path: Path) -> Optional[Dict]:
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Excel 결과 생성 벤치마크와 회귀 검사")
+    parser.add_argument("--shapes", nargs="+", choices=sorted(SHAPES), default=list(SHAPES))
+    parser.add_argument("--rows", type=int, nargs="+", default=[2_000, 20_000])
+    parser.add_argument("--repeat", type=int, default=3, help="측정마다 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--baseline-ref", metavar="REV", help="이 git 리비전을 같은 실행에서 번갈아 측정해 기준으로 사용")
+    parser.add_argument(
+        "--rounds", type=int, default=3,
+        help="--baseline-ref 비교에서 경우마다 양쪽을 새 프로세스로 측정할 횟수 (프로세스마다 속도 차이가 있어 중앙값 사용)"
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 저하 비율 (0.2 = 20%%)")
+    parser.add_argument("--memory-slack", type=float, default=2.0, help="최대 메모리 비교에 더하는 절대 여유분 (MB)")
+    parser.add_argument("--update-baseline", action="store_true", help="측정값을 기준값 파일에 저장 (같은 경우만 덮어씀)")
+    parser.add_argument("--no-check", action="store_true", help="기준값과 비교하지 않고 측정값만 출력")
+    parser.add_argument("--run-case", nargs=2, metavar=("SHAPE", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        # measure()가 실행하는 하위 프로세스: 결과를 JSON 한 줄로 출력
+        shape, rows = args.run_case
+        print(json.dumps(run_case(shape, int(rows), args.repeat)))
+        return
+    if args.baseline_ref and args.update_baseline:
+        parser.error("--update-baseline 은 --baseline-ref 와 함께 쓸 수 없습니다")
+
+    cases = [(shape, rows) for shape in args.shapes for rows in args.rows]
+    results, reference = {}, {}
+    print(
+        f"{'case':>20} {'rows/s':>9} {'peak MB':>8} {'file MB':>8} "
+        f"{'parse cells/s':>14} {'summary rows/s':>15} {'sheet ms':>9}"
+    )
+
+    if args.baseline_ref:
+        with reference_tree(args.baseline_ref) as reference_dir:
+            for index, (shape, rows) in enumerate(cases):
+                case = f"{shape}/{rows}"
+                current_rounds, reference_rounds = [], []
+                for round_index in range(args.rounds):
+                    # 측정 순서를 번갈아 바꿔 기계 상태 변화가 한쪽에만 몰리지 않게 한다
+                    if (index + round_index) % 2:
+                        current_rounds.append(measure(shape, rows, args.repeat))
+                        reference_rounds.append(measure(shape, rows, args.repeat, reference_dir))
+                    else:
+                        reference_rounds.append(measure(shape, rows, args.repeat, reference_dir))
+                        current_rounds.append(measure(shape, rows, args.repeat))
+                results[case], reference[case] = current_rounds, reference_rounds
+                print_result(case, merge_rounds(current_rounds))
+                print_result(f"@{args.baseline_ref}", merge_rounds(reference_rounds))
+
+        print(f"\nComparing with {args.baseline_ref} (tolerance {args.tolerance:.0%})")
+        regressions = find_regressions(results, reference, args.tolerance, args.memory_slack)
+        if regressions:
+            print("\n❌ Regressions: " + "; ".join(regressions))
+            sys.exit(1)
+        print("\n✅ Within tolerance")
+        return
+
+    for shape, rows in cases:
+        case = f"{shape}/{rows}"
+        results[case] = [measure(shape, rows, args.repeat)]
+        print_result(case, results[case][0])
+
+    baseline = load_baseline(args.baseline)
+
+    if args.update_baseline:
+        stored = dict(baseline["cases"]) if baseline else {}
+        stored.update((case, rounds[0]) for case, rounds in results.items())
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "cases": stored}, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\n💾 Baseline updated: {args.baseline}")
+        return
+
+    if args.no_check:
+        return
+    if baseline is None:
+        print(f"\n⚠️ No baseline at {args.baseline} (run with --update-baseline, or compare with --baseline-ref)")
+        return
+
+    print(f"\nComparing with {args.baseline.name} (tolerance {args.tolerance:.0%})")
+    stored = {case: [result] for case, result in baseline["cases"].items()}
+    regressions = find_regressions(results, stored, args.tolerance, args.memory_slack)
+    if not regressions:
+        print("\n✅ Within tolerance")
+        return
+
+    if baseline.get("environment") != environment():
+        # 다른 호스트의 절대 처리량은 회귀 판단 근거가 되지 않는다
+        print(f"\n⚠️ Worse than the stored baseline: {'; '.join(regressions)}")
+        print(f"⚠️ Baseline was recorded on a different host ({baseline.get('environment')}), not failing.")
+        print("   Compare with --baseline-ref <rev> to measure both trees in the same run.")
+        return
+    print("\n❌ Regressions: " + "; ".join(regressions))
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+열 단위 표
+변환된 표를 행 리스트(List[List[Any]])나 미리보기용 행 딕셔너리 목록 대신 열마다 압축해 보관
+
+- 모든 값이 정수(또는 모두 실수)인 열: array('q') / array('d')
+- 값이 거의 겹치지 않는 정수 문자열 열 ("1,000"): array('q') (읽을 때 같은 문자열로 복원)
+- 그 밖의 열: 중복 없는 값 목록 + 값 번호 array (사전 인코딩, 문자열은 sys.intern)
+
+같은 날짜, 적요, 빈 칸이 반복되는 거래 내역은 셀마다 문자열 객체와 행 리스트를 두는 것보다
+훨씬 작게 보관되고, 헤더 문자열도 표마다 한 번만 저장된다.
+pydantic 모델이 아니므로 서비스 사이에서 넘길 때 검증/복사 비용이 없다.
+
+읽기 전용 행 시퀀스(len, 인덱스/슬라이스, 반복)로도 동작하므로
+행 목록을 받던 Excel 생성, 열 종류 추론, 거래 요약에 그대로 넘길 수 있다.
+"""
+import sys
+from array import array
+from collections.abc import Sequence as SequenceABC
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+# 값 번호 array 타입 (중복 없는 값 수에 맞춰 가장 작은 것 사용)
+_CODE_TYPES = ((1 << 8, "B"), (1 << 16, "H"), (1 << 32, "I"))
+
+# 정수 문자열 열에서 빈 문자열을 나타내는 값
+_EMPTY = -(1 << 63)
+
+
+class _DictColumn:
+    """사전 인코딩 열 (중복 없는 값 목록 + 값 번호)"""
+    __slots__ = ("values", "codes")
+
+    def __init__(self, values: list, codes: array):
+        self.values = values
+        self.codes = codes
+
+    def __getitem__(self, index: int) -> Any:
+        return self.values[self.codes[index]]
+
+    def __iter__(self) -> Iterator[Any]:
+        return map(self.values.__getitem__, self.codes)
+
+
+class _IntTextColumn:
+    """
+    정수 문자열 열 ("1,000", "-25000", "")
+
+    잔액처럼 값이 거의 겹치지 않는 금액 열은 사전 인코딩으로 줄지 않으므로
+    숫자로 보관하고 읽을 때 같은 문자열로 되돌린다 (정확히 되돌릴 수 있는 열만).
+    """
+    __slots__ = ("numbers", "grouped")
+
+    def __init__(self, numbers: array, grouped: bool):
+        self.numbers = numbers
+        # 천 단위 쉼표 사용 여부
+        self.grouped = grouped
+
+    def _text(self, number: int) -> str:
+        if number == _EMPTY:
+            return ""
+        return f"{number:,}" if self.grouped else str(number)
+
+    def __getitem__(self, index: int) -> str:
+        return self._text(self.numbers[index])
+
+    def __iter__(self) -> Iterator[str]:
+        return map(self._text, self.numbers)
+
+
+Column = Union[array, _DictColumn, _IntTextColumn]
+
+
+class ColumnarTable(SequenceABC):
+    __slots__ = ("headers", "_columns", "_row_count")
+
+    def __init__(self, headers: List[str], columns: List[Column], row_count: int):
+        self.headers = headers
+        self._columns = columns
+        self._row_count = row_count
+
+    @classmethod
+    def from_rows(cls, headers: Sequence[str], rows: Iterable[Sequence[Any]]) -> "ColumnarTable":
+        """
+        행 목록을 한 번 훑어 열 단위로 변환
+
+        헤더 수보다 짧은 행은 None으로 채우고 남는 칸은 버린다.
+        """
+        width = len(headers)
+        lookups: List[Dict[Any, int]] = [{} for _ in range(width)]
+        values: List[list] = [[] for _ in range(width)]
+        codes = [array("I") for _ in range(width)]
+
+        row_count = 0
+        for row in rows:
+            row_count += 1
+            row_width = len(row)
+            for col in range(width):
+                value = row[col] if col < row_width else None
+                # 1 == 1.0 == True 처럼 값이 같은 다른 타입이 합쳐지지 않도록 문자열이 아닌 값은 타입과 함께 키로 사용
+                if value.__class__ is str:
+                    key = value
+                else:
+                    try:
+                        key = (value.__class__, value)
+                        hash(key)
+                    except TypeError:
+                        value = key = str(value)
+                code = lookups[col].get(key)
+                if code is None:
+                    code = lookups[col][key] = len(values[col])
+                    values[col].append(value)
+                codes[col].append(code)
+
+        columns = [
+            _encode_column(column_values, column_codes)
+            for column_values, column_codes in zip(values, codes)
+        ]
+        return cls([sys.intern(str(header)) for header in headers], columns, row_count)
+
+    def __len__(self) -> int:
+        return self._row_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(self._row_count))]
+        if index < 0:
+            index += self._row_count
+        if not 0 <= index < self._row_count:
+            raise IndexError("row index out of range")
+        return self._row(index)
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        return zip(*self._columns) if self._columns else iter(())
+
+    def __repr__(self) -> str:
+        return f"ColumnarTable(columns={len(self.headers)}, rows={self._row_count})"
+
+    def column(self, col: int) -> Sequence[Any]:
+        """열 값 (숫자 열은 array 그대로, 나머지는 값 목록)"""
+        column = self._columns[col]
+        return column if isinstance(column, array) else list(column)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """미리보기 API 응답 형식 (행마다 헤더 → 값 딕셔너리)"""
+        headers = self.headers
+        return [dict(zip(headers, row)) for row in self]
+
+    def _row(self, index: int) -> Tuple[Any, ...]:
+        return tuple(column[index] for column in self._columns)
+
+
+def _encode_column(values: list, codes: array) -> Column:
+    """
+    열 하나의 보관 형식 결정
+
+    숫자만 있는 열은 숫자 array, 값이 많이 겹치지 않는 정수 문자열 열은 _IntTextColumn,
+    나머지는 가장 작은 값 번호 array를 쓰는 사전 인코딩.
+    """
+    kinds = {value.__class__ for value in values}
+    if kinds == {int} or kinds == {float}:
+        try:
+            return array("q" if kinds == {int} else "d", map(values.__getitem__, codes))
+        except OverflowError:
+            pass
+
+    # 중복 없는 값이 행의 1/8을 넘으면 문자열 객체보다 숫자 8바이트가 작다
+    if kinds == {str} and len(values) * 8 > len(codes):
+        numbers = _parse_int_texts(values)
+        if numbers is not None:
+            parsed, grouped = numbers
+            return _IntTextColumn(array("q", map(parsed.__getitem__, codes)), grouped)
+
+    # 같은 적요/날짜 문자열은 다른 표와도 한 객체를 공유
+    values = [sys.intern(value) if value.__class__ is str else value for value in values]
+    for limit, typecode in _CODE_TYPES:
+        if len(values) <= limit:
+            break
+    return _DictColumn(values, codes if typecode == codes.typecode else array(typecode, codes))
+
+
+def _parse_int_texts(values: List[str]) -> Optional[Tuple[List[int], bool]]:
+    """모든 값이 같은 형식(쉼표 있음/없음)으로 정확히 되돌릴 수 있는 정수 문자열이면 (숫자, 쉼표 여부)"""
+    grouped = any("," in value for value in values)
+    parsed = []
+    for value in values:
+        if value == "":
+            parsed.append(_EMPTY)
+            continue
+        try:
+            number = int(value.replace(",", "") if grouped else value)
+        except ValueError:
+            return None
+        if (f"{number:,}" if grouped else str(number)) != value or number == _EMPTY:
+            return None
+        parsed.append(number)
+    return parsed, grouped
@@ -1,7 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, field_serializer
 from typing import Optional, List, Dict, Any
 from enum import Enum
 from datetime import datetime
+from .columnar import ColumnarTable
 
 class ProcessingType(str, Enum):
     BASIC = "basic"
@@ -16,6 +17,16 @@ class UploadResponse(BaseModel):
     message: str
     processing_type: ProcessingType
 
+class BatchFileItem(BaseModel):
+    file_id: str
+    original_filename: str
+
+class BatchUploadResponse(BaseModel):
+    batch_id: str
+    message: str
+    processing_type: ProcessingType
+    files: List[BatchFileItem]
+
 class DownloadResponse(BaseModel):
     file_id: str
     download_url: str
@@ -28,10 +39,13 @@ class TableData(BaseModel):
 class ProcessingResult(BaseModel):
     success: bool
     data: Optional[TableData] = None
+    tables: List[TableData] = []  # 여러 표로 된 명세서의 전체 표 (나온 순서, data는 가장 큰 표)
     error: Optional[str] = None
 
 # 히스토리 관련 모델들
 class FileHistoryItem(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    
     file_id: str
     original_filename: str
     converted_filename: str
@@ -40,7 +54,13 @@ class FileHistoryItem(BaseModel):
     file_size: Optional[int] = None
     processing_type: str = "basic"  # "ai" or "basic"
     excel_path: Optional[str] = None
-    converted_data: Optional[List[Dict]] = None  # 변환된 데이터 저장
+    converted_data: Optional[ColumnarTable] = None  # 변환된 데이터 저장 (열 단위로 압축 보관)
+    summary: Optional[Dict[str, Any]] = None  # 월별 입출금, 잔액 검증, 주요 거래처 요약
+    
+    @field_serializer("converted_data")
+    def _serialize_converted_data(self, table: Optional[ColumnarTable]) -> Optional[List[Dict]]:
+        # API 응답은 기존과 같은 행 딕셔너리 목록
+        return table.records() if table is not None else None
 
 class HistoryResponse(BaseModel):
     success: bool
@@ -0,0 +1,163 @@
+"""
+일괄 변환 라우터
+여러 PDF를 한 번에 업로드하고 결과를 ZIP 또는 하나의 Excel 파일로 다운로드
+"""
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Header, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import List, Optional
+import asyncio
+import os
+import uuid
+import logging
+
+from models.schemas import BatchUploadResponse, BatchFileItem, ProcessingType
+from services.batch_service import batch_service, unique_names, sheet_name_for
+from services.enhanced_conversion_service import enhanced_conversion_service
+from services.job_scheduler import job_scheduler, QueueFullError, LANE_BULK, resolve_lane
+from services.history_service import history_service
+from services.result_cache import result_cache
+from utils.file_manager import FileManager
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# 한 번에 업로드할 수 있는 파일 수
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", "24"))
+MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+
+
+@router.post("/batch/upload", response_model=BatchUploadResponse)
+async def upload_batch(
+    files: List[UploadFile] = File(...),
+    use_ai: bool = Form(False),
+    session_id: Optional[str] = Header(None, alias="X-Session-ID"),
+    priority_tier: Optional[str] = Header(None, alias="X-Priority-Tier")
+):
+    """
+    여러 PDF 파일 업로드 및 동시 변환 시작
+    
+    진행률은 /api/ws/{batch_id} 하나로 전체/파일별 상태가 전송된다.
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="파일이 제공되지 않았습니다")
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {MAX_BATCH_FILES}개 파일까지 업로드할 수 있습니다")
+    
+    # 1. 모든 파일을 먼저 검증 (하나라도 잘못되면 아무 작업도 시작하지 않음)
+    uploads = []
+    for file in files:
+        original_filename = file.filename or "document.pdf"
+        if not original_filename.lower().endswith('.pdf'):
+            raise HTTPException(status_code=400, detail=f"PDF 파일만 업로드 가능합니다: {original_filename}")
+        file_content = await file.read()
+        if len(file_content) > MAX_FILE_SIZE:
+            raise HTTPException(status_code=413, detail=f"파일 크기가 너무 큽니다 (최대 10MB): {original_filename}")
+        uploads.append((original_filename, file_content))
+    
+    # 2. 배치 전체를 받을 자리가 있는지 확인
+    try:
+        job_scheduler.check_admission(len(uploads), session_id=session_id)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail="변환 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    # 3. 파일별 변환 작업 등록 (일괄 업로드는 낮은 가중치 레인으로 대기하여 대화형 업로드를 막지 않음)
+    lane = resolve_lane(priority_tier, default=LANE_BULK)
+    batch = batch_service.create_batch(session_id)
+    items = []
+    for original_filename, file_content in uploads:
+        file_id = str(uuid.uuid4())
+        batch_service.add_file(batch, file_id, original_filename)
+        items.append(BatchFileItem(file_id=file_id, original_filename=original_filename))
+        
+        try:
+            await enhanced_conversion_service.submit_conversion(
+                file_id=file_id,
+                file_content=file_content,
+                original_filename=original_filename,
+                use_ai=use_ai,
+                session_id=session_id,
+                check_admission=False,
+                lane=lane
+            )
+        except Exception as e:
+            logger.error(f"❌ Failed to start batch conversion for {file_id}: {e}")
+            if session_id:
+                await history_service.update_file_status(
+                    session_id=session_id,
+                    file_id=file_id,
+                    status="failed"
+                )
+            await FileManager.cleanup_file(file_id)
+            await batch_service.mark_failed(batch, file_id, f"변환 작업 시작 실패: {str(e)}")
+    
+    await batch_service.broadcast(batch, "일괄 변환이 시작되었습니다.")
+    logger.info(f"📦 Batch {batch.batch_id} started with {len(items)} files")
+    
+    return BatchUploadResponse(
+        batch_id=batch.batch_id,
+        message=f"{len(items)}개 파일 업로드 완료. 변환이 백그라운드에서 진행됩니다.",
+        processing_type=ProcessingType.AI if use_ai else ProcessingType.BASIC,
+        files=items
+    )
+
+
+@router.get("/batch/{batch_id}")
+async def get_batch_status(batch_id: str):
+    """배치 전체 진행률과 파일별 상태 조회"""
+    batch = batch_service.get_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch_service.get_status(batch)
+
+
+@router.get("/batch/{batch_id}/download")
+async def download_batch(
+    batch_id: str,
+    format: str = Query("zip", pattern="^(zip|xlsx)$")
+):
+    """
+    배치 결과 다운로드
+    
+    Query:
+        format: zip (파일별 Excel을 묶은 ZIP, 스트리밍) 또는 xlsx (파일별 시트로 된 하나의 Excel,
+            표가 여러 개인 파일은 표마다 시트를 만들고 파일별 Summary 시트는 제외)
+    """
+    batch = batch_service.get_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    if not batch.finished:
+        raise HTTPException(status_code=409, detail="아직 변환 중인 파일이 있습니다")
+    
+    results = batch_service.completed_results(batch)
+    if not results:
+        raise HTTPException(status_code=404, detail="다운로드할 변환 결과가 없습니다")
+    
+    # ZIP 묶기와 시트 합치기는 파일을 읽으므로 메모리에만 있는 결과를 먼저 디스크에 기록
+    for _, path in results:
+        await asyncio.to_thread(result_cache.ensure_on_disk, path)
+    
+    if format == "zip":
+        return StreamingResponse(
+            batch_service.iter_zip(results),
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="batch_{batch_id}.zip"'}
+        )
+    
+    # 여러 시트로 된 Excel은 처음 요청 시 한 번 만들어 둔다
+    excel_path = await FileManager.get_temp_file_path(f"batch_{batch_id}", "xlsx")
+    if not os.path.exists(excel_path):
+        sheet_names = unique_names([sheet_name_for(filename) for filename, _ in results], max_length=31)
+        sources = [(name, path) for name, (_, path) in zip(sheet_names, results)]
+        partial_path = f"{excel_path}.part"
+        await asyncio.to_thread(enhanced_conversion_service.excel_generator.merge_workbooks, sources, partial_path)
+        os.replace(partial_path, excel_path)
+    
+    return FileResponse(
+        path=excel_path,
+        filename=f"batch_{batch_id}.xlsx",
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
@@ -1,57 +1,89 @@
-from fastapi import APIRouter, HTTPException, Header
-from fastapi.responses import FileResponse
-import os
+from fastapi import APIRouter, HTTPException, Header, Query
+from fastapi.responses import FileResponse, Response
 from typing import Optional
+from urllib.parse import quote
+import asyncio
+import os
 from utils.file_manager import FileManager
 from services.history_service import history_service
+from services.result_cache import result_cache
+from services.result_index import result_index
+from services.table_export import table_exporter, EXPORT_FORMATS, FORMAT_XLSX, ExportUnavailableError
 
 router = APIRouter()
 
+
+def _result_response(path: str, filename: str, media_type: str):
+    """메모리 캐시에 있는 결과는 바로 응답하고, 없으면 디스크 파일로 응답"""
+    data = result_cache.get(path)
+    if data is None:
+        return FileResponse(path=path, filename=filename, media_type=media_type)
+    
+    # FileResponse와 같은 Content-Disposition 형식 (한글 파일명은 RFC 5987 인코딩)
+    quoted = quote(filename)
+    if quoted != filename:
+        disposition = f"attachment; filename*=utf-8''{quoted}"
+    else:
+        disposition = f'attachment; filename="{filename}"'
+    return Response(content=data, media_type=media_type, headers={"Content-Disposition": disposition})
+
 @router.get("/download/{file_id}")
 async def download_file(
     file_id: str,
+    format: str = Query(FORMAT_XLSX),
     session_id: Optional[str] = Header(None, alias="X-Session-ID")
 ):
+    """
+    변환 결과 다운로드
+    
+    Query:
+        format: xlsx (기본), csv, jsonl 또는 parquet (pyarrow 필요)
+                Excel 이외의 형식은 처음 요청할 때 저장된 표에서 만들어 캐시한다.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 형식입니다: {format}")
+    
     try:
+        excel_path = filename = None
+        
         # 히스토리에서 파일 정보 조회
         if session_id:
             file_info = await history_service.get_file_info(session_id, file_id)
-            if file_info and file_info.excel_path and os.path.exists(file_info.excel_path):
-                return FileResponse(
-                    path=file_info.excel_path,
-                    filename=file_info.converted_filename,
-                    media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+            if file_info and file_info.excel_path:
+                excel_path, filename = file_info.excel_path, file_info.converted_filename
         
         # 기존 방식으로 폴백
-        file_info = await FileManager.get_file_info(file_id)
+        if excel_path is None:
+            file_info = await FileManager.get_file_info(file_id)
+            
+            if not file_info:
+                raise HTTPException(status_code=404, detail="File not found")
+            
+            excel_path, filename = file_info["path"], f"bank_statement_{file_id}.xlsx"
         
-        if not file_info:
-            raise HTTPException(status_code=404, detail="File not found")
-        
-        file_path = file_info["path"]
-        
-        if not os.path.exists(file_path):
+        path = await asyncio.to_thread(table_exporter.render, excel_path, format)
+        if path is None:
             raise HTTPException(status_code=404, detail="File not found on disk")
         
-        # Return file for download
-        filename = f"bank_statement_{file_id}.xlsx"
-        
-        return FileResponse(
-            path=file_path,
-            filename=filename,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
+        extension, media_type = EXPORT_FORMATS[format]
+        return _result_response(path, f"{os.path.splitext(filename)[0]}.{extension}", media_type)
         
     except HTTPException:
         raise
+    except ExportUnavailableError as e:
+        raise HTTPException(status_code=501, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Download failed: {str(e)}")
 
 @router.delete("/download/{file_id}")
 async def delete_file(file_id: str):
     try:
-        success = await FileManager.delete_file(file_id)
+        # 다른 업로드와 공유 중인 결과 파일은 참조만 해제
+        file_info = await FileManager.get_file_info(file_id)
+        success = await FileManager.delete_file(
+            file_id,
+            remove_from_disk=result_index.release(file_id, file_info["path"] if file_info else None)
+        )
         
         if not success:
             raise HTTPException(status_code=404, detail="File not found")
@@ -78,7 +110,7 @@ async def get_converted_data(
             if file_info and file_info.status == "completed":
                 # 저장된 변환 데이터 반환
                 if file_info.converted_data:
-                    return file_info.converted_data
+                    return file_info.converted_data.records()
                 else:
                     # 데이터가 없으면 빈 배열 반환
                     return []
@@ -5,9 +5,9 @@
 from fastapi import APIRouter, HTTPException, Header, Query
 from typing import Optional, List
 import logging
-import os
 
 from services.history_service import history_service, FileHistoryItem
+from services.result_cache import result_cache
 from models.schemas import HistoryResponse
 
 logger = logging.getLogger(__name__)
@@ -208,7 +208,7 @@ async def redownload_file(
                 detail="완료된 파일만 재다운로드할 수 있습니다."
             )
         
-        if not file_info.excel_path or not os.path.exists(file_info.excel_path):
+        if not file_info.excel_path or not result_cache.exists(file_info.excel_path):
             raise HTTPException(
                 status_code=404,
                 detail="Excel 파일을 찾을 수 없습니다. 파일이 만료되었을 수 있습니다."
@@ -8,10 +8,10 @@ import logging
 
 from models.schemas import UploadResponse, ProcessingType
 from services.enhanced_conversion_service import enhanced_conversion_service
-from services.task_manager import task_manager
+from services.job_scheduler import QueueFullError, resolve_lane
 from services.websocket_manager import manager as ws_manager
 from services.history_service import history_service
-from utils.file_manager import FileManager
+from services.job_store import job_store
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -123,13 +123,22 @@ async def test_conversion():
             "traceback": traceback.format_exc()
         }
 
+def _queue_full_exception(error: QueueFullError) -> HTTPException:
+    """대기열 초과 시 429 응답 생성"""
+    return HTTPException(
+        status_code=429,
+        detail="변환 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.",
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
 @router.post("/upload", response_model=UploadResponse)
 async def upload_pdf(
     file: Optional[UploadFile] = File(None),
     file_data: Optional[str] = Form(None),
     use_ai: bool = Form(False),
     original_filename: Optional[str] = Form(None),
-    session_id: Optional[str] = Header(None, alias="X-Session-ID")
+    session_id: Optional[str] = Header(None, alias="X-Session-ID"),
+    priority_tier: Optional[str] = Header(None, alias="X-Priority-Tier")
 ):
     """
     PDF 파일 업로드 및 백그라운드 변환 시작
@@ -160,54 +169,49 @@ async def upload_pdf(
             if len(file_content) > 10 * 1024 * 1024:  # 10MB
                 raise HTTPException(status_code=413, detail="파일 크기가 너무 큽니다 (최대 10MB)")
             
-            temp_pdf_path = await FileManager.save_temp_file(file_content, file_id, "pdf")
-            
         elif file_data:
             try:
                 file_content = base64.b64decode(file_data)
-                if len(file_content) > 10 * 1024 * 1024:  # 10MB
-                    raise HTTPException(status_code=413, detail="파일 크기가 너무 큽니다 (최대 10MB)")
-                
-                temp_pdf_path = await FileManager.save_temp_file(file_content, file_id, "pdf")
             except Exception as e:
                 raise HTTPException(status_code=400, detail="잘못된 base64 데이터입니다")
+            if len(file_content) > 10 * 1024 * 1024:  # 10MB
+                raise HTTPException(status_code=413, detail="파일 크기가 너무 큽니다 (최대 10MB)")
         else:
             raise HTTPException(status_code=400, detail="파일이 제공되지 않았습니다")
         
-        # 히스토리에 파일 추가 (세션 ID가 있는 경우)
-        if session_id:
-            await history_service.add_file_to_history(
-                session_id=session_id,
-                file_id=file_id,
-                original_filename=original_filename,
-                processing_type="ai" if use_ai else "basic",
-                status="processing"
-            )
+        processing_type = ProcessingType.AI if use_ai else ProcessingType.BASIC
         
-        # 2. 백그라운드에서 변환 작업 시작
+        # 2. 백그라운드에서 변환 작업 시작 (같은 PDF의 완료된 결과가 있으면 재사용)
         logger.info(f"🔄 Starting conversion task for file_id: {file_id}")
         
         try:
-            conversion_task = enhanced_conversion_service.convert_pdf_to_excel(
+            reused = await enhanced_conversion_service.submit_conversion(
                 file_id=file_id,
-                file_path=temp_pdf_path,
+                file_content=file_content,
                 original_filename=original_filename,
                 use_ai=use_ai,
-                session_id=session_id
+                session_id=session_id,
+                lane=resolve_lane(priority_tier)
             )
-            logger.info(f"🔄 Conversion task created successfully for file_id: {file_id}")
             
-            # 3. 태스크 매니저에 작업 등록
-            task = task_manager.start_task(
-                file_id=file_id,
-                coro=conversion_task,
-                task_name=f"pdf_to_excel_{original_filename}"
-            )
-            logger.info(f"🔄 Task registered in task_manager for file_id: {file_id}, task: {task}")
+            if reused:
+                logger.info(f"✅ Upload processed - file_id: {file_id}, reused existing result")
+                return UploadResponse(
+                    file_id=file_id,
+                    message="파일 업로드 완료. 이전에 변환된 결과를 재사용했습니다.",
+                    processing_type=processing_type
+                )
             
-            # 작업이 실제로 시작되었는지 확인
-            if not task:
-                raise Exception("Failed to start background conversion task")
+        except QueueFullError as queue_error:
+            # 업로드 처리 중에 대기열이 가득 찬 경우
+            # (작업 등록과 PDF 저장 전에 거절되므로 히스토리만 실패로 표시)
+            if session_id:
+                await history_service.update_file_status(
+                    session_id=session_id,
+                    file_id=file_id,
+                    status="failed"
+                )
+            raise _queue_full_exception(queue_error)
             
         except Exception as task_error:
             logger.error(f"❌ Failed to start conversion task for file_id {file_id}: {task_error}")
@@ -236,9 +240,7 @@ async def upload_pdf(
                 detail=f"변환 작업을 시작할 수 없습니다: {str(task_error)}"
             )
         
-        # 4. 즉시 응답 반환 (변환은 백그라운드에서 진행)
-        processing_type = ProcessingType.AI if use_ai else ProcessingType.BASIC
-        
+        # 3. 즉시 응답 반환 (변환은 백그라운드에서 진행)
         logger.info(f"✅ Upload processed - file_id: {file_id}, background conversion started")
         
         return UploadResponse(
@@ -271,4 +273,38 @@ async def upload_pdf(
         raise HTTPException(
             status_code=500, 
             detail=f"서버 오류가 발생했습니다: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/retry/{file_id}", response_model=UploadResponse)
+async def retry_conversion(
+    file_id: str,
+    session_id: Optional[str] = Header(None, alias="X-Session-ID"),
+    priority_tier: Optional[str] = Header(None, alias="X-Priority-Tier")
+):
+    """
+    실패한 변환 다시 시도
+    
+    마지막으로 완료된 단계의 결과부터 이어서 실행하므로 AI 분석 이후 단계에서 실패한 작업은
+    Claude 요청 없이 다시 완료된다. 진행률은 같은 file_id의 WebSocket으로 전송된다.
+    """
+    job = await job_store.get_job(file_id)
+    # 세션에 속한 작업은 같은 세션만 다시 시도할 수 있다 (다른 세션의 공정 큐에 작업을 넣지 못하도록)
+    if not job or (job["session_id"] and job["session_id"] != session_id):
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    if job["state"] != "failed":
+        raise HTTPException(status_code=409, detail=f"실패한 작업만 다시 시도할 수 있습니다 (현재 상태: {job['state']})")
+    if not os.path.exists(job["file_path"]):
+        raise HTTPException(status_code=410, detail="원본 PDF가 만료되어 다시 시도할 수 없습니다. 파일을 다시 업로드해주세요.")
+    
+    try:
+        checkpoints = await enhanced_conversion_service.retry_conversion(job, lane=resolve_lane(priority_tier))
+    except QueueFullError as queue_error:
+        raise _queue_full_exception(queue_error)
+    
+    resumed = f" (재사용: {', '.join(checkpoints)})" if checkpoints else ""
+    return UploadResponse(
+        file_id=file_id,
+        message=f"변환을 다시 시작합니다{resumed}",
+        processing_type=ProcessingType.AI if job["use_ai"] else ProcessingType.BASIC
+    )
@@ -9,6 +9,11 @@ import json
 
 from services.websocket_manager import manager as ws_manager
 from services.task_manager import task_manager
+from services.job_scheduler import job_scheduler
+from services.worker_pool import worker_pool
+from services.result_index import result_index
+from services.result_cache import result_cache
+from services.table_export import table_exporter
 
 logger = logging.getLogger(__name__)
 
@@ -131,6 +136,13 @@ async def get_websocket_status():
         "active_connections": ws_manager.get_connection_count(),
         "connected_files": ws_manager.get_active_connections(),
         "running_tasks": task_manager.get_running_task_count(),
+        "scheduler": job_scheduler.get_stats(),
+        "workers": worker_pool.get_stats(),
+        "cancellation": task_manager.get_cancel_stats(),
+        "dedup": result_index.get_stats(),
+        "result_cache": result_cache.get_stats(),
+        "exports": table_exporter.get_stats(),
+        "task_registry": task_manager.get_registry_stats(),
         "all_tasks": task_manager.get_all_tasks()
     }
 
@@ -0,0 +1,239 @@
+"""
+일괄 변환 서비스
+여러 PDF 변환 작업을 하나의 배치로 묶어 전체/파일별 진행률을 집계하고,
+결과를 ZIP 또는 여러 시트로 된 하나의 Excel 파일로 제공
+"""
+import io
+import os
+import re
+import uuid
+import zipfile
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .result_cache import result_cache
+from .websocket_manager import manager as ws_manager
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+@dataclass
+class BatchFile:
+    """배치에 포함된 파일 하나의 상태"""
+    file_id: str
+    original_filename: str
+    status: str = "queued"
+    progress: int = 0
+    message: str = ""
+    excel_path: Optional[str] = None
+
+
+@dataclass
+class Batch:
+    batch_id: str
+    session_id: Optional[str]
+    created_at: datetime
+    # file_id → 파일 상태 (업로드 순서 유지)
+    files: Dict[str, BatchFile] = field(default_factory=dict)
+
+    @property
+    def finished(self) -> bool:
+        return all(f.status in TERMINAL_STATUSES for f in self.files.values())
+
+
+class _ZipStream(io.RawIOBase):
+    """ZipFile이 쓴 바이트를 모아 두었다가 조금씩 내보내는 버퍼"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class BatchService:
+    def __init__(self):
+        self.batches: Dict[str, Batch] = {}
+        # 완료된 배치 정보 유지 시간
+        self.batch_ttl = timedelta(hours=24)
+
+    def create_batch(self, session_id: Optional[str] = None) -> Batch:
+        """새 배치 생성"""
+        self._prune_expired()
+        batch = Batch(batch_id=str(uuid.uuid4()), session_id=session_id, created_at=datetime.now())
+        self.batches[batch.batch_id] = batch
+        logger.info(f"📦 Batch created: {batch.batch_id}")
+        return batch
+
+    def add_file(self, batch: Batch, file_id: str, original_filename: str):
+        """
+        배치에 파일 추가
+
+        변환 작업을 시작하기 전에 호출해야 처음부터 진행률이 집계된다.
+        """
+        batch.files[file_id] = BatchFile(file_id=file_id, original_filename=original_filename)
+
+        async def on_progress(progress_data: dict):
+            await self._on_file_progress(batch, file_id, progress_data)
+
+        ws_manager.add_progress_listener(file_id, on_progress)
+
+    def get_batch(self, batch_id: str) -> Optional[Batch]:
+        return self.batches.get(batch_id)
+
+    def get_status(self, batch: Batch) -> dict:
+        """배치 전체 진행률과 파일별 상태"""
+        files = list(batch.files.values())
+        counts = {status: 0 for status in ("queued", "processing") + TERMINAL_STATUSES}
+        for f in files:
+            counts["processing" if f.status not in counts else f.status] += 1
+
+        return {
+            "batch_id": batch.batch_id,
+            "status": self._batch_status(batch),
+            "progress": round(sum(f.progress for f in files) / len(files)) if files else 0,
+            "total": len(files),
+            "counts": counts,
+            "files": [
+                {
+                    "file_id": f.file_id,
+                    "original_filename": f.original_filename,
+                    "status": f.status,
+                    "progress": f.progress,
+                    "message": f.message
+                }
+                for f in files
+            ]
+        }
+
+    async def broadcast(self, batch: Batch, message: str = ""):
+        """배치 채널(/ws/{batch_id})로 전체/파일별 진행률 전송"""
+        status = self.get_status(batch)
+        await ws_manager.broadcast_status(
+            file_id=batch.batch_id,
+            status=status["status"],
+            progress=status["progress"],
+            message=message or f"{status['counts']['completed']}/{status['total']} 파일 변환 완료",
+            data=status
+        )
+
+    async def mark_failed(self, batch: Batch, file_id: str, message: str):
+        """변환 작업을 시작하지 못한 파일 처리"""
+        await self._on_file_progress(batch, file_id, {"status": "failed", "progress": 0, "message": message})
+
+    def completed_results(self, batch: Batch) -> List[Tuple[str, str]]:
+        """완료된 파일들의 (원본 파일명, Excel 경로) 목록"""
+        return [
+            (f.original_filename, f.excel_path)
+            for f in batch.files.values()
+            if f.status == "completed" and result_cache.exists(f.excel_path)
+        ]
+
+    def iter_zip(self, results: List[Tuple[str, str]], chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+        """
+        결과 Excel 파일들을 ZIP으로 묶어 조각 단위로 생성 (전체를 메모리에 올리지 않음)
+
+        xlsx는 이미 압축된 형식이라 다시 압축하지 않고 저장만 한다.
+        """
+        stream = _ZipStream()
+        with zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            names = unique_names([_converted_filename(filename) for filename, _ in results])
+            for name, (_, excel_path) in zip(names, results):
+                with open(excel_path, "rb") as source, archive.open(name, mode="w", force_zip64=True) as target:
+                    while True:
+                        chunk = source.read(chunk_size)
+                        if not chunk:
+                            break
+                        target.write(chunk)
+                        yield stream.drain()
+                yield stream.drain()
+        yield stream.drain()
+
+    async def _on_file_progress(self, batch: Batch, file_id: str, progress_data: dict):
+        batch_file = batch.files.get(file_id)
+        if batch_file is None:
+            return
+
+        batch_file.status = progress_data["status"]
+        batch_file.progress = progress_data.get("progress", 0)
+        batch_file.message = progress_data.get("message", "")
+
+        if batch_file.status == "completed":
+            batch_file.progress = 100
+            batch_file.excel_path = (progress_data.get("data") or {}).get("excel_path")
+
+        if batch_file.status in TERMINAL_STATUSES:
+            ws_manager.remove_progress_listener(file_id)
+
+        await self.broadcast(batch, f"{batch_file.original_filename}: {batch_file.message}")
+
+    def _batch_status(self, batch: Batch) -> str:
+        if not batch.finished:
+            return "processing"
+        statuses = {f.status for f in batch.files.values()}
+        if statuses == {"completed"}:
+            return "completed"
+        if "completed" in statuses:
+            return "partially_completed"
+        return "failed"
+
+    def _prune_expired(self):
+        """오래된 완료 배치 정리"""
+        now = datetime.now()
+        expired = [
+            batch_id for batch_id, batch in self.batches.items()
+            if batch.finished and now - batch.created_at > self.batch_ttl
+        ]
+        for batch_id in expired:
+            del self.batches[batch_id]
+            ws_manager.cleanup_file(batch_id)
+
+
+def _converted_filename(original_filename: str) -> str:
+    return f"{original_filename.replace('.pdf', '')}_converted.xlsx"
+
+
+def unique_names(names: List[str], max_length: Optional[int] = None) -> List[str]:
+    """
+    중복되지 않는 이름 목록 생성 (같은 이름에는 " (2)" 같은 번호를 붙임)
+
+    Args:
+        max_length: 이름 최대 길이 (Excel 시트 이름은 31자). 지정하면 확장자를 구분하지 않는다.
+    """
+    seen = set()
+    result = []
+    for name in names:
+        stem, ext = (name, "") if max_length else os.path.splitext(name)
+        candidate = (stem[:max_length] if max_length else stem) + ext
+        counter = 2
+        while candidate.lower() in seen:
+            suffix = f" ({counter})"
+            base = stem[:max_length - len(suffix)] if max_length else stem
+            candidate = f"{base}{suffix}{ext}"
+            counter += 1
+        seen.add(candidate.lower())
+        result.append(candidate)
+    return result
+
+
+def sheet_name_for(original_filename: str) -> str:
+    """원본 파일명에서 Excel 시트 이름으로 쓸 수 없는 문자 제거"""
+    name = re.sub(r"[\[\]:*?/\\]", "_", os.path.splitext(original_filename)[0]).strip("'")
+    return name or "Sheet"
+
+
+# 전역 배치 서비스 인스턴스
+batch_service = BatchService()
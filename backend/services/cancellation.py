@@ -0,0 +1,92 @@
+"""
+취소 토큰
+이벤트 루프, 스레드(페이지 단위 PDF 추출), 워커 프로세스 안에서 공통으로 쓰는
+협조적 취소 신호와 취소 후 실제 중단까지 걸린 시간 측정
+"""
+import asyncio
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class CancellationToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        # 취소 요청 시각 (time.monotonic)
+        self.cancelled_at: Optional[float] = None
+    
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+    
+    def cancel(self):
+        """취소 요청 (어느 스레드에서 호출해도 안전)"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.cancelled_at = time.monotonic()
+            self._event.set()
+            callbacks = list(self._callbacks)
+            self._callbacks.clear()
+        
+        for callback in callbacks:
+            callback()
+    
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        취소 시 호출할 함수 등록 (이미 취소되었으면 즉시 호출)
+        
+        Returns:
+            등록 해제 함수
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        
+        callback()
+        return lambda: None
+    
+    def raise_if_cancelled(self):
+        """취소되었으면 CancelledError 발생 (페이지 루프 등에서 호출)"""
+        if self._event.is_set():
+            raise asyncio.CancelledError("변환이 취소되었습니다.")
+    
+    def elapsed_since_cancel(self) -> Optional[float]:
+        """취소 요청 후 경과 시간 (초, 취소되지 않았으면 None)"""
+        if self.cancelled_at is None:
+            return None
+        return time.monotonic() - self.cancelled_at
+    
+    def _remove_callback(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+async def run_cancellable(coro, token: Optional[CancellationToken]):
+    """
+    토큰이 취소되면 진행 중인 코루틴(예: HTTP 요청)을 즉시 중단
+    
+    다른 스레드에서 취소되어도 이벤트 루프를 통해 안전하게 중단한다.
+    """
+    if token is None:
+        return await coro
+    
+    if token.is_cancelled:
+        # 실행하지 않은 코루틴을 닫아 "never awaited" 경고와 누수를 막는다
+        coro.close()
+        token.raise_if_cancelled()
+    
+    loop = asyncio.get_running_loop()
+    task = asyncio.ensure_future(coro)
+    unregister = token.add_callback(lambda: loop.call_soon_threadsafe(task.cancel))
+    
+    try:
+        return await task
+    finally:
+        unregister()
+        if not task.done():
+            task.cancel()
@@ -6,6 +6,15 @@ from typing import Dict, Any, List
 import logging
 from dotenv import load_dotenv
 from models.schemas import ProcessingResult, TableData
+from utils.amount_parser import parse_korean_amount
+
+# orjson이 설치되어 있으면 더 빠른 디코더 사용 (선택적 의존성)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
 
 # .env 파일 로드
 load_dotenv()
@@ -13,6 +22,59 @@ load_dotenv()
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
+_json_decoder = json.JSONDecoder()
+
+
+def _find_json_array(content: str):
+    """
+    응답 문자열에서 JSON 배열 구간의 (시작, 끝) 인덱스를 찾음
+    
+    중간 문자열을 만들지 않고 인덱스만 계산하므로 응답을 한 번만 훑는다.
+    ```json 코드 블록이 있으면 블록 내부로 범위를 제한한다.
+    """
+    search_start = 0
+    search_end = len(content)
+    
+    fence = content.find("```json")
+    if fence != -1:
+        search_start = fence + 7
+        closing = content.find("```", search_start)
+        if closing != -1:
+            search_end = closing
+    
+    start = content.find('[', search_start, search_end)
+    end = content.rfind(']', start + 1, search_end) + 1 if start != -1 else 0
+    
+    if start == -1 or end == 0:
+        raise ValueError("No valid JSON array found in response")
+    
+    return start, end
+
+
+def _decode_json_array(content: str) -> list:
+    """
+    응답 문자열에서 JSON 배열을 디코딩
+    
+    orjson이 있으면 배열 구간만 orjson으로 파싱하고, 없거나 실패하면
+    표준 json의 raw_decode로 원본 문자열에서 바로 파싱한다.
+    """
+    start, end = _find_json_array(content)
+    
+    if ORJSON_AVAILABLE:
+        try:
+            parsed = orjson.loads(content[start:end])
+            if isinstance(parsed, list):
+                return parsed
+        except orjson.JSONDecodeError:
+            # 배열 뒤에 잡음이 섞인 경우 등은 표준 디코더로 재시도
+            pass
+    
+    parsed, _ = _json_decoder.raw_decode(content, start)
+    if not isinstance(parsed, list):
+        raise ValueError("No valid JSON array found in response")
+    return parsed
+
+
 class ClaudeIntegration:
     """
     Claude 3 Haiku API를 사용한 한국어 은행 명세서 처리 서비스
@@ -29,7 +91,8 @@ class ClaudeIntegration:
             logger.error("Invalid Claude API key format")
             raise ValueError("Invalid Claude API key format. Key should start with 'sk-ant-'")
         
-        self.api_url = "https://api.anthropic.com/v1/messages"
+        # 부하/회귀 테스트 시 tools/fake_claude_api.py 로 대체 가능
+        self.api_url = os.getenv("CLAUDE_API_URL", "https://api.anthropic.com/v1/messages")
         self.model = "claude-3-haiku-20240307"
         self.max_retries = 3
         self.retry_delay = 1.0
@@ -74,9 +137,10 @@ class ClaudeIntegration:
                 ]
                 rows.append(row)
             
-            table_data = TableData(headers=headers, rows=rows)
+            # 직접 만든 행이므로 pydantic 검증(행마다 복사)은 생략
+            table_data = TableData.model_construct(headers=headers, rows=rows)
             
-            return ProcessingResult(
+            return ProcessingResult.model_construct(
                 success=True,
                 data=table_data
             )
@@ -218,40 +282,27 @@ class ClaudeIntegration:
         Claude 응답에서 JSON 데이터 추출 및 파싱
         """
         try:
-            # JSON 부분만 추출 (```json ... ``` 블록 처리)
-            content = content.strip()
-            
-            if "```json" in content:
-                start = content.find("```json") + 7
-                end = content.find("```", start)
-                json_str = content[start:end].strip()
-            elif content.startswith('[') and content.endswith(']'):
-                json_str = content
-            else:
-                # JSON 배열 부분 찾기
-                start = content.find('[')
-                end = content.rfind(']') + 1
-                if start != -1 and end != 0:
-                    json_str = content[start:end]
-                else:
-                    raise ValueError("No valid JSON array found in response")
-            
-            # JSON 파싱
-            parsed_data = json.loads(json_str)
+            parsed_data = _decode_json_array(content)
             
             # 데이터 검증 및 정제
             validated_data = []
+            append = validated_data.append
             for item in parsed_data:
-                if isinstance(item, dict) and all(key in item for key in ["Date", "Description", "Amount"]):
-                    # 한국 통화 표기법 처리
-                    amount = self._parse_korean_amount(item["Amount"])
-                    
-                    validated_item = {
-                        "Date": str(item["Date"]),
-                        "Description": str(item["Description"]),
-                        "Amount": amount
-                    }
-                    validated_data.append(validated_item)
+                if not isinstance(item, dict):
+                    continue
+                try:
+                    date = item["Date"]
+                    description = item["Description"]
+                    amount = item["Amount"]
+                except KeyError:
+                    continue
+                
+                # 한국 통화 표기법 처리
+                append({
+                    "Date": date if type(date) is str else str(date),
+                    "Description": description if type(description) is str else str(description),
+                    "Amount": parse_korean_amount(amount)
+                })
             
             return validated_data
             
@@ -268,33 +319,7 @@ class ClaudeIntegration:
         """
         한국 통화 표기법을 숫자로 변환
         """
-        if isinstance(amount_str, (int, float)):
-            return float(amount_str)
-        
-        if not isinstance(amount_str, str):
-            return 0.0
-        
-        # 한국어 통화 기호 및 텍스트 제거
-        cleaned = str(amount_str).strip()
-        cleaned = cleaned.replace('₩', '').replace('원', '').replace(',', '').replace(' ', '')
-        
-        # 괄호로 둘러싸인 음수 처리 (예: (5,000))
-        is_negative = False
-        if cleaned.startswith('(') and cleaned.endswith(')'):
-            cleaned = cleaned[1:-1]
-            is_negative = True
-        elif cleaned.startswith('-'):
-            is_negative = True
-            cleaned = cleaned[1:]
-        elif cleaned.startswith('+'):
-            cleaned = cleaned[1:]
-        
-        try:
-            amount = float(cleaned)
-            return -amount if is_negative else amount
-        except ValueError:
-            logger.warning(f"Could not parse amount: {amount_str}")
-            return 0.0
+        return parse_korean_amount(amount_str)
 
     async def _format_ai_response(self, ai_response: Dict[str, Any]) -> TableData:
         """
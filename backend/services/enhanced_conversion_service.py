@@ -5,7 +5,9 @@ WebSocket 진행률 업데이트와 취소 가능한 변환 작업을 지원
 import asyncio
 import aiofiles
 import os
-from typing import Optional, Dict, Any, List
+import re
+import time
+from typing import Optional, Dict, Any, List, Callable, Awaitable, Tuple
 import logging
 from datetime import datetime
 
@@ -15,16 +17,59 @@ from .claude_integration import ClaudeIntegration
 from .pdf_processor import PDFProcessor
 from .excel_generator import ExcelGenerator
 from .history_service import history_service
+from .job_store import job_store
+from .job_scheduler import job_scheduler, LANE_INTERACTIVE
+from .worker_pool import worker_pool
+from .pipeline import Pipeline, PipelineStage, JobContext
+from .cancellation import CancellationToken, run_cancellable
+from .result_index import result_index, StoredResult, compute_content_hash
+from .result_cache import result_cache
+from .table_export import table_exporter
+from .statement_summary import StatementSummarizer, summarize_table
+from models.schemas import ProcessingResult
+from models.columnar import ColumnarTable
 from utils.file_manager import FileManager
 
 logger = logging.getLogger(__name__)
 
+# 거래 행 판별용 날짜/금액 형식 (예: 2024-01-15, 2024.01.15, 01/15 / ₩5,800, -5,800원, (5,000))
+_DATE_CELL = re.compile(r"^\d{2,4}[-./]\d{1,2}([-./]\d{1,2})?")
+_AMOUNT_CELL = re.compile(r"^[-+(]?₩?\s*\d[\d,]*(\.\d+)?\s*원?\)?$")
+
+
+def table_quality(data: Dict[str, Any]) -> int:
+    """
+    표 품질 점수: 날짜와 금액이 함께 있는 거래 행 수
+    
+    AI 결과와 로컬 표 추출 결과 중 어느 쪽을 최종 결과로 쓸지 비교할 때 사용한다.
+    """
+    score = 0
+    for table in data.get("tables") or [data]:
+        for row in table.get("rows", []):
+            cells = [str(cell).strip() for cell in row if cell is not None]
+            if any(_DATE_CELL.match(cell) for cell in cells) and any(_AMOUNT_CELL.match(cell) for cell in cells):
+                score += 1
+    return score
+
+
 class EnhancedConversionService:
     def __init__(self):
         self.claude_service = ClaudeIntegration()
         self.pdf_processor = PDFProcessor()
         self.excel_generator = ExcelGenerator()
         self.file_manager = FileManager()
+        # 작업 전체 시간 예산과 단계별 제한 시간 (초, 0이면 제한 없음)
+        self.job_budget_seconds = float(os.getenv("JOB_BUDGET_SECONDS", "300"))
+        self.stage_timeouts = {
+            "extract": float(os.getenv("STAGE_TIMEOUT_EXTRACT", "60")),
+            "parse": float(os.getenv("STAGE_TIMEOUT_PARSE", "120")),
+            "excel": float(os.getenv("STAGE_TIMEOUT_EXCEL", "60")),
+        }
+        # 남은 예산이 이보다 적으면 AI 대신 로컬 표 추출로 분석
+        self.ai_degrade_below_seconds = float(os.getenv("AI_DEGRADE_BELOW_SECONDS", "30"))
+        # AI 변환 시 로컬 표 추출을 함께 실행하여 먼저 임시 결과를 보여줄지 여부
+        self.speculative_basic = os.getenv("SPECULATIVE_BASIC_RESULT", "true").lower() == "true"
+        self.pipeline = self._build_pipeline()
     
     async def convert_pdf_to_excel(
         self,
@@ -32,109 +77,71 @@ class EnhancedConversionService:
         file_path: str,
         original_filename: str,
         use_ai: bool = True,
-        session_id: Optional[str] = None
+        session_id: Optional[str] = None,
+        content_hash: Optional[str] = None
     ) -> Optional[str]:
         """
         PDF를 Excel로 변환하는 메인 함수 (WebSocket 진행률 업데이트 포함)
         
+        워커 모드(CONVERSION_WORKERS > 0)에서는 변환 단계를 워커 프로세스가 실행하고,
+        이 함수는 진행률 중계와 히스토리/작업 상태 반영만 담당한다.
+        
         Args:
             file_id: 고유 파일 ID
             file_path: PDF 파일 경로
             original_filename: 원본 파일명
             use_ai: AI 사용 여부
             session_id: 세션 ID (히스토리 업데이트용)
+            content_hash: 업로드 내용 해시 (같은 PDF 재업로드 시 결과 재사용용)
         
         Returns:
             변환된 Excel 파일 경로 또는 None (실패 시)
         """
         try:
-            logger.info(f"🚀 Starting conversion for file_id: {file_id}")
-            
-            # 1. 시작 알림
-            await ws_manager.broadcast_status(
-                file_id=file_id,
-                status="starting",
-                progress=0,
-                message="변환을 시작합니다..."
-            )
-            
-            # 취소 확인
-            if task_manager.is_cancelled(file_id):
-                raise asyncio.CancelledError("변환이 취소되었습니다.")
-            
-            # 2. 파일 검증
-            await ws_manager.broadcast_status(
-                file_id=file_id,
-                status="validating",
-                progress=5,
-                message="파일을 검증하는 중..."
-            )
-            
-            await self._validate_file(file_path)
-            
-            # 취소 확인
+            # 대기열에서 취소된 작업은 시작 알림 없이 바로 정리
             if task_manager.is_cancelled(file_id):
                 raise asyncio.CancelledError("변환이 취소되었습니다.")
             
-            # 3. PDF 텍스트 추출
-            await ws_manager.broadcast_status(
-                file_id=file_id,
-                status="extracting",
-                progress=20,
-                message="PDF에서 텍스트를 추출하는 중..."
-            )
-            
-            extracted_text = await self._extract_pdf_text(file_path)
-            
-            # 취소 확인
-            if task_manager.is_cancelled(file_id):
-                raise asyncio.CancelledError("변환이 취소되었습니다.")
+            logger.info(f"🚀 Starting conversion for file_id: {file_id}")
+            await job_store.mark_state(file_id, "running")
             
-            # 4. AI 분석 (선택적)
-            if use_ai:
-                await ws_manager.broadcast_status(
-                    file_id=file_id,
-                    status="processing",
-                    progress=40,
-                    message="AI로 데이터를 분석하는 중..."
-                )
-                
-                structured_data = await self._process_with_ai(extracted_text)
-                
-                # 취소 확인
-                if task_manager.is_cancelled(file_id):
-                    raise asyncio.CancelledError("변환이 취소되었습니다.")
-                
+            async def report(status: str, progress: int, message: str, data: Optional[dict] = None):
+                if data and data.get("provisional"):
+                    await self._publish_provisional(file_id, session_id, data)
+                    # 클라이언트에는 기존과 같은 행 딕셔너리 목록으로 전달
+                    data = {**data, "preview_data": data["preview_data"].records()}
                 await ws_manager.broadcast_status(
                     file_id=file_id,
-                    status="processing",
-                    progress=70,
-                    message="AI 분석이 완료되었습니다."
+                    status=status,
+                    progress=progress,
+                    message=message,
+                    data=data
                 )
+            
+            # 1~5. 변환 단계 실행 (워커 모드면 워커 프로세스에 위임)
+            if worker_pool.enabled:
+                result = await worker_pool.run_job(file_id, file_path, use_ai, report)
             else:
-                # 간단한 텍스트 파싱
-                await ws_manager.broadcast_status(
-                    file_id=file_id,
-                    status="processing",
-                    progress=50,
-                    message="텍스트를 분석하는 중..."
+                result = await self.run_conversion_stages(
+                    file_id,
+                    file_path,
+                    use_ai,
+                    report,
+                    task_manager.get_token(file_id)
                 )
-                
-                structured_data = await self._simple_text_parsing(extracted_text)
             
-            # 취소 확인
-            if task_manager.is_cancelled(file_id):
-                raise asyncio.CancelledError("변환이 취소되었습니다.")
+            excel_path = result["excel_path"]
+            structured_data = result["structured_data"]
+            summary = result.get("summary")
             
-            # 5. Excel 파일 생성
-            await ws_manager.broadcast_status(
-                file_id=file_id,
-                status="generating",
-                progress=85,
-                message="Excel 파일을 생성하는 중..."
-            )
+            # 파일 매니저에 등록 (다운로드 요청은 API 프로세스에서 처리)
+            await self.file_manager.register_file(file_id, excel_path)
             
-            excel_path = await self._generate_excel_file(file_id, structured_data, original_filename)
+            # 최종 결과로 대체된 임시 Excel 정리
+            provisional_excel = structured_data.get("provisional_excel")
+            if provisional_excel and provisional_excel != excel_path:
+                result_cache.discard(provisional_excel)
+                table_exporter.discard(provisional_excel)
             
             # 취소 확인
             if task_manager.is_cancelled(file_id):
@@ -151,29 +158,53 @@ class EnhancedConversionService:
                 data={
                     "excel_path": excel_path,
                     "original_filename": original_filename,
-                    "file_size": file_size
+                    "file_size": file_size,
+                    "stage_outcomes": result.get("stage_outcomes", {}),
+                    "result_source": structured_data.get("source"),
+                    "summary": summary
                 }
             )
             
+            # 변환된 데이터를 미리보기용으로 포맷팅
+            preview_data = self._format_data_for_preview(structured_data)
+            
+            # 같은 내용의 다음 업로드가 재사용할 수 있도록 등록
+            if content_hash:
+                result_index.publish(
+                    content_hash,
+                    "ai" if use_ai else "basic",
+                    file_id,
+                    excel_path,
+                    file_size,
+                    preview_data,
+                    summary
+                )
+            
             # 히스토리 업데이트 (변환된 데이터 포함)
             if session_id:
-                # 변환된 데이터를 미리보기용으로 포맷팅
-                preview_data = self._format_data_for_preview(structured_data)
-                
                 await history_service.update_file_status(
                     session_id=session_id,
                     file_id=file_id,
                     status="completed",
                     excel_path=excel_path,
                     file_size=file_size,
-                    converted_data=preview_data
+                    converted_data=preview_data,
+                    summary=summary
                 )
             
+            await job_store.mark_state(file_id, "completed")
             logger.info(f"✅ Conversion completed for file_id: {file_id}")
             return excel_path
             
         except asyncio.CancelledError:
+            if not task_manager.is_cancelled(file_id):
+                # 사용자 취소가 아닌 서버 종료로 중단된 작업은 재시작 후 복구되도록
+                # 작업 상태와 임시 파일을 그대로 둔다
+                logger.info(f"⏸️ Conversion interrupted for file_id: {file_id}")
+                raise
+            
             logger.info(f"🛑 Conversion cancelled for file_id: {file_id}")
+            await job_store.mark_state(file_id, "cancelled")
             await ws_manager.broadcast_status(
                 file_id=file_id,
                 status="cancelled",
@@ -198,6 +229,7 @@ class EnhancedConversionService:
             error_trace = traceback.format_exc()
             logger.error(f"❌ Conversion failed for file_id {file_id}: {str(e)}")
             logger.error(f"❌ Full traceback: {error_trace}")
+            await job_store.mark_state(file_id, "failed", error=str(e))
             
             await ws_manager.broadcast_status(
                 file_id=file_id,
@@ -214,14 +246,560 @@ class EnhancedConversionService:
                     status="failed"
                 )
             
-            # 임시 파일 정리
-            await self._cleanup_temp_files(file_id)
+            # 재시도 시 마지막 완료 단계부터 이어서 실행할 수 있도록 원본 PDF와 단계 결과는 남긴다
+            # (임시 파일은 주기 정리 작업이, 단계 결과는 작업 저장소 보존 기간이 지나면 정리)
             raise
             
         finally:
             # 작업 정리
             task_manager.cleanup_task(file_id)
     
+    async def run_conversion_stages(
+        self,
+        file_id: str,
+        file_path: str,
+        use_ai: bool,
+        report: Callable[..., Awaitable[None]],
+        token: CancellationToken
+    ) -> Dict[str, Any]:
+        """
+        검증 → 텍스트 추출 → 데이터 분석 → 거래 요약 → Excel 생성 파이프라인 실행
+        
+        인라인 모드에서는 API 프로세스에서, 워커 모드에서는 워커 프로세스에서 실행된다.
+        
+        Args:
+            file_id: 고유 파일 ID
+            file_path: PDF 파일 경로
+            use_ai: AI 사용 여부
+            report: 진행률 보고 함수 (status, progress, message, data=None)
+            token: 취소 토큰 (페이지 추출 루프와 Claude 요청까지 전파)
+        
+        Returns:
+            {"excel_path": Excel 파일 경로, "structured_data": 변환된 표 데이터, "summary": 거래 요약}
+        """
+        context = JobContext(
+            file_id=file_id,
+            file_path=file_path,
+            use_ai=use_ai,
+            report=report,
+            token=token,
+            deadline=time.monotonic() + self.job_budget_seconds if self.job_budget_seconds > 0 else None
+        )
+        outputs = await self.pipeline.run(context)
+        
+        return {
+            "excel_path": outputs["excel"],
+            "structured_data": outputs["parse"],
+            "summary": outputs.get("summary"),
+            "stage_outcomes": context.stage_outcomes
+        }
+    
+    def _build_pipeline(self) -> Pipeline:
+        """변환 파이프라인 단계 정의"""
+        def timeout(stage: str) -> Optional[float]:
+            return self.stage_timeouts[stage] or None
+        
+        return Pipeline([
+            PipelineStage(
+                name="validate",
+                run=lambda ctx: self._validate_file(ctx.file_path),
+                status="validating",
+                message="파일을 검증하는 중...",
+                weight=5
+            ),
+            PipelineStage(
+                name="extract",
+                run=lambda ctx: self._extract_pdf_text(ctx.file_path, ctx.token),
+                status="extracting",
+                message="PDF에서 텍스트를 추출하는 중...",
+                weight=20,
+                concurrency="extract",
+                checkpoint=True,
+                timeout=timeout("extract")
+            ),
+            PipelineStage(
+                name="parse",
+                run=self._run_parse_stage,
+                status="processing",
+                message=lambda ctx: "AI로 데이터를 분석하는 중..." if ctx.use_ai else "텍스트를 분석하는 중...",
+                weight=50,
+                concurrency=lambda ctx: "ai" if ctx.use_ai else None,
+                checkpoint=True,
+                done_message=lambda ctx: "AI 분석이 완료되었습니다." if ctx.use_ai else None,
+                timeout=timeout("parse"),
+                # 시간이 부족하면 AI 대신 로컬 표 추출로 분석
+                fallback=self._run_local_parse,
+                fallback_if=lambda ctx: ctx.use_ai,
+                degrade_below=self.ai_degrade_below_seconds
+            ),
+            PipelineStage(
+                name="summary",
+                run=self._run_summary_stage,
+                status="processing",
+                message="거래 내역을 요약하는 중...",
+                weight=5
+            ),
+            PipelineStage(
+                name="excel",
+                run=self._run_excel_stage,
+                status="generating",
+                message="Excel 파일을 생성하는 중...",
+                weight=20,
+                concurrency="excel",
+                checkpoint=True,
+                reuse_if=result_cache.exists,
+                timeout=timeout("excel")
+            ),
+        ])
+    
+    async def _run_parse_stage(self, context: JobContext) -> Dict[str, Any]:
+        """데이터 분석 단계 (AI 또는 간단한 텍스트 파싱)"""
+        extracted_text = context.outputs["extract"]
+        if not context.use_ai:
+            return await self._parse_locally(context)
+        if self.speculative_basic:
+            return await self._run_speculative_parse(context)
+        return await self._process_with_ai(extracted_text, context.token)
+    
+    async def _run_speculative_parse(self, context: JobContext) -> Dict[str, Any]:
+        """
+        AI 분석과 로컬 표 추출을 동시에 실행
+        
+        로컬 결과가 먼저 나오면 임시 결과(미리보기 + 임시 Excel)로 바로 전달하고,
+        AI 결과가 도착하면 품질 점수가 로컬 결과보다 낮지 않을 때만 AI 결과로 대체한다.
+        AI 분석이 실패해도 로컬 결과가 있으면 그 결과로 작업을 마친다.
+        """
+        basic_token = CancellationToken()
+        unregister = context.token.add_callback(basic_token.cancel)
+        basic_task = asyncio.create_task(self._deliver_provisional(context, basic_token))
+        
+        try:
+            try:
+                ai_result = await self._process_with_ai(context.outputs["extract"], context.token)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                basic_result = await basic_task
+                if basic_result is None:
+                    raise
+                logger.warning(f"⚠️ AI analysis failed for {context.file_id}, keeping basic result: {e}")
+                return basic_result
+            
+            ai_result["source"] = "ai"
+            if not basic_task.done():
+                # AI가 먼저 끝나면 로컬 결과를 기다리지 않는다
+                return ai_result
+            
+            basic_result = basic_task.result()
+            if basic_result is None:
+                return ai_result
+            
+            ai_score, basic_score = table_quality(ai_result), table_quality(basic_result)
+            if ai_score < basic_score:
+                logger.info(f"🔀 Dropping AI result for {context.file_id}: quality {ai_score} < basic {basic_score}")
+                return basic_result
+            
+            ai_result["provisional_excel"] = basic_result.get("provisional_excel")
+            return ai_result
+        finally:
+            if not basic_task.done():
+                basic_token.cancel()
+                basic_task.cancel()
+            unregister()
+    
+    async def _deliver_provisional(self, context: JobContext, token: CancellationToken) -> Optional[Dict[str, Any]]:
+        """
+        로컬 표 추출 결과로 임시 Excel을 만들어 임시 결과로 보고
+        
+        Returns:
+            로컬 분석 결과 (표가 없거나 실패하면 None)
+        """
+        try:
+            streamed = await self._process_basic_streaming(context, f"{context.file_id}_provisional", token)
+            if streamed is None:
+                return None
+            
+            basic_result, provisional_excel = streamed
+            basic_result["source"] = "basic"
+            basic_result["provisional_excel"] = provisional_excel
+            # 시간 초과로 fallback이 실행되면 이 결과를 다시 쓴다
+            context.outputs["parse_basic"] = basic_result
+            
+            await context.report(
+                status="processing",
+                progress=self.pipeline.stage_progress("parse")[0],
+                message="기본 분석 결과를 먼저 보여드립니다. AI 분석을 계속하는 중...",
+                data={
+                    "provisional": True,
+                    "excel_path": provisional_excel,
+                    "preview_data": self._format_data_for_preview(basic_result)
+                }
+            )
+            return basic_result
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ Speculative basic conversion failed for {context.file_id}: {e}")
+            return None
+    
+    async def _publish_provisional(self, file_id: str, session_id: Optional[str], data: dict):
+        """임시 결과를 다운로드/미리보기에서 볼 수 있도록 등록 (작업 상태는 처리 중으로 유지)"""
+        await self.file_manager.register_file(file_id, data["excel_path"])
+        if session_id:
+            await history_service.update_file_status(
+                session_id=session_id,
+                file_id=file_id,
+                status="processing",
+                excel_path=data["excel_path"],
+                converted_data=data["preview_data"]
+            )
+    
+    async def _run_summary_stage(self, context: JobContext) -> Optional[Dict[str, Any]]:
+        """
+        거래 요약 단계 (대표 표의 월별 입출금, 잔액 검증, 주요 거래처, 합계)
+        
+        행을 한 번만 훑는 계산이라 체크포인트 없이 복구 시 다시 계산한다.
+        입출금 금액 열이 없는 표는 None.
+        """
+        data = context.outputs["parse"]
+        if "summary" in data:
+            # 로컬 표 추출과 함께 계산해 Excel에 이미 기록한 요약
+            return data["summary"]
+        return await asyncio.to_thread(summarize_table, data.get("headers", []), data.get("rows", []))
+    
+    async def _run_excel_stage(self, context: JobContext) -> str:
+        """
+        Excel 생성 단계
+        
+        로컬 표 추출이 추출하면서 만든 Excel이나, 로컬 결과가 최종 결과일 때의 임시 Excel은 그대로 사용한다.
+        """
+        data = context.outputs["parse"]
+        streamed_excel = data.get("streamed_excel")
+        if result_cache.exists(streamed_excel):
+            return streamed_excel
+        provisional_excel = data.get("provisional_excel")
+        if data.get("source") == "basic" and result_cache.exists(provisional_excel):
+            return provisional_excel
+        return await self._generate_excel_file(context.file_id, data, context.outputs.get("summary"))
+    
+    async def _run_local_parse(self, context: JobContext) -> Dict[str, Any]:
+        """AI 분석 대신 쓰는 로컬 표 추출 (표가 없으면 간단한 텍스트 파싱)"""
+        if "parse_basic" in context.outputs:
+            return context.outputs["parse_basic"]
+        
+        await context.report(
+            status="processing",
+            progress=self.pipeline.stage_progress("parse")[0],
+            message="시간이 부족하여 기본 분석으로 전환합니다..."
+        )
+        return await self._parse_locally(context)
+    
+    async def _parse_locally(self, context: JobContext) -> Dict[str, Any]:
+        """
+        로컬 표 추출 (표가 없으면 간단한 텍스트 파싱)
+        
+        추출하는 동안 Excel도 함께 만들어 Excel 단계에서 그대로 사용한다.
+        """
+        streamed = await self._process_basic_streaming(context, context.file_id, context.token)
+        if streamed is None:
+            return await self._simple_text_parsing(context.outputs["extract"])
+        
+        data, excel_path = streamed
+        data["streamed_excel"] = excel_path
+        return data
+    
+    async def _process_basic_streaming(
+        self,
+        context: JobContext,
+        file_id: str,
+        token: CancellationToken
+    ) -> Optional[Tuple[Dict[str, Any], str]]:
+        """
+        로컬 표 추출과 Excel 생성을 겹쳐 실행
+        
+        페이지에서 표가 추출될 때마다 그 행을 바로 워크북에 기록하므로, 표 전체가 모인 뒤
+        Excel을 처음부터 만들지 않는다. 거래 요약도 추출 스레드에서 행이 들어오는 대로 누적하여
+        마지막에 Summary 시트에 기록한다.
+        
+        Returns:
+            (단계 출력 형식의 표 데이터 + "summary", Excel 경로) (표가 없으면 None)
+        """
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        summarizers: List[StatementSummarizer] = []
+        outcome: Dict[str, Any] = {}
+        
+        def on_rows(index: int, headers: List[str], rows: List[List[str]]):
+            # 추출 스레드에서 호출
+            if index == len(summarizers):
+                summarizers.append(StatementSummarizer(headers))
+            summarizers[index].add(rows)
+            loop.call_soon_threadsafe(chunks.put_nowait, (index, headers, rows))
+        
+        async def stream():
+            while (chunk := await chunks.get()) is not None:
+                yield chunk
+        
+        def finalize_summary() -> Optional[Dict[str, Any]]:
+            # 스트림이 끝난 뒤(추출 완료 후) 호출되므로 대표 표가 정해져 있다
+            result = outcome.get("result")
+            if result is None or not result.success or not result.data.rows:
+                return None
+            primary = next(i for i, table in enumerate(result.tables) if table is result.data)
+            outcome["summary"] = summarizers[primary].result()
+            return outcome["summary"]
+        
+        excel_task = asyncio.create_task(
+            self.excel_generator.create_excel_stream(stream(), file_id, summary=finalize_summary)
+        )
+        try:
+            outcome["result"] = await self.pdf_processor.process_basic(context.file_path, token, on_rows)
+        except BaseException:
+            # 이미 받은 행까지 기록을 마치게 한 뒤 미완성 Excel 삭제
+            chunks.put_nowait(None)
+            excel_path, = await asyncio.gather(excel_task, return_exceptions=True)
+            if isinstance(excel_path, str):
+                result_cache.discard(excel_path)
+            raise
+        
+        chunks.put_nowait(None)
+        try:
+            excel_path = await excel_task
+        except Exception as e:
+            raise ValueError(f"Excel 생성 중 오류 발생: {str(e)}")
+        
+        result = outcome["result"]
+        if not result.success or not result.data.rows:
+            result_cache.discard(excel_path)
+            return None
+        
+        data = {**self._table_result(result), "summary": outcome.get("summary")}
+        await self._save_export_table(excel_path, await self._columnar_tables(data), data, data["summary"])
+        return data, excel_path
+    
+    def _table_result(self, result: ProcessingResult) -> Dict[str, Any]:
+        """
+        로컬 표 추출 결과를 단계 출력 형식으로 변환
+        
+        headers/rows는 가장 큰 표(미리보기, 다른 형식 내보내기에 사용)이고,
+        표가 여러 개면 Excel 시트별로 쓸 전체 표를 tables에 나온 순서대로 담는다.
+        """
+        data = {"headers": result.data.headers, "rows": result.data.rows}
+        if len(result.tables) > 1:
+            data["tables"] = [{"headers": table.headers, "rows": table.rows} for table in result.tables]
+            data["primary"] = next(i for i, table in enumerate(result.tables) if table is result.data)
+        return data
+    
+    async def submit_conversion(
+        self,
+        file_id: str,
+        file_content: bytes,
+        original_filename: str,
+        use_ai: bool,
+        session_id: Optional[str] = None,
+        check_admission: bool = True,
+        lane: str = LANE_INTERACTIVE
+    ) -> bool:
+        """
+        업로드된 PDF의 변환 작업 등록
+        
+        같은 내용을 같은 방식으로 변환한 결과가 있으면 대기열을 거치지 않고 바로 연결한다.
+        
+        Args:
+            check_admission: False면 대기열 한도 확인 생략 (일괄 업로드처럼 호출자가 미리 확인한 경우)
+            lane: 스케줄러 우선순위 레인 (paid / interactive / bulk)
+        
+        Returns:
+            기존 결과를 재사용했으면 True
+        
+        Raises:
+            QueueFullError: 대기열이 가득 찬 경우
+        """
+        processing_type = "ai" if use_ai else "basic"
+        content_hash = await asyncio.to_thread(compute_content_hash, file_content)
+        stored = result_index.lookup(content_hash, processing_type)
+        
+        # 대기열이 가득 찼으면 파일을 저장하기 전에 거절
+        if not stored and check_admission:
+            job_scheduler.check_admission(session_id=session_id)
+        
+        # 히스토리에 파일 추가 (세션 ID가 있는 경우)
+        if session_id:
+            await history_service.add_file_to_history(
+                session_id=session_id,
+                file_id=file_id,
+                original_filename=original_filename,
+                processing_type=processing_type,
+                status="processing"
+            )
+        
+        # 변환 없이 기존 결과에 연결하여 바로 완료
+        if stored:
+            result_index.attach(content_hash, processing_type, file_id)
+            await self.reuse_result(file_id, original_filename, stored, session_id)
+            return True
+        
+        temp_pdf_path = await self.file_manager.save_temp_file(file_content, file_id, "pdf")
+        
+        # 재시작 시 복구할 수 있도록 작업 기록
+        await job_store.create_job(
+            file_id=file_id,
+            file_path=temp_pdf_path,
+            original_filename=original_filename,
+            use_ai=use_ai,
+            session_id=session_id
+        )
+        
+        task_manager.start_task(
+            file_id=file_id,
+            coro=self.convert_pdf_to_excel(
+                file_id=file_id,
+                file_path=temp_pdf_path,
+                original_filename=original_filename,
+                use_ai=use_ai,
+                session_id=session_id,
+                content_hash=content_hash
+            ),
+            task_name=f"pdf_to_excel_{original_filename}",
+            check_admission=check_admission,
+            session_id=session_id,
+            lane=lane
+        )
+        logger.info(f"🔄 Task registered in task_manager for file_id: {file_id}")
+        return False
+    
+    async def reuse_result(
+        self,
+        file_id: str,
+        original_filename: str,
+        stored: StoredResult,
+        session_id: Optional[str] = None
+    ) -> str:
+        """
+        같은 내용으로 이미 완료된 변환 결과를 새 file_id에 연결 (변환 없이 즉시 완료)
+        
+        Returns:
+            공유하는 Excel 파일 경로
+        """
+        await self.file_manager.register_file(file_id, stored.excel_path)
+        
+        if session_id:
+            await history_service.update_file_status(
+                session_id=session_id,
+                file_id=file_id,
+                status="completed",
+                excel_path=stored.excel_path,
+                file_size=stored.file_size,
+                converted_data=stored.preview_data,
+                summary=stored.summary
+            )
+        
+        await ws_manager.broadcast_status(
+            file_id=file_id,
+            status="completed",
+            progress=100,
+            message="변환이 완료되었습니다!",
+            data={
+                "excel_path": stored.excel_path,
+                "original_filename": original_filename,
+                "file_size": stored.file_size,
+                "summary": stored.summary,
+                "reused": True
+            }
+        )
+        return stored.excel_path
+    
+    async def recover_interrupted_jobs(self) -> int:
+        """
+        서버 재시작으로 중단된 작업을 다시 대기열에 등록
+        
+        Returns:
+            복구된 작업 수
+        """
+        recovered = 0
+        
+        for job in await job_store.get_interrupted_jobs():
+            file_id = job["file_id"]
+            
+            if not os.path.exists(job["file_path"]):
+                logger.warning(f"⚠️ Cannot recover {file_id}: source PDF is gone")
+                await job_store.mark_state(file_id, "failed", error="원본 PDF 파일이 없어 복구할 수 없습니다.")
+                continue
+            
+            # 인메모리 히스토리는 재시작 시 사라지므로 다시 등록
+            if job["session_id"]:
+                await history_service.add_file_to_history(
+                    session_id=job["session_id"],
+                    file_id=file_id,
+                    original_filename=job["original_filename"],
+                    processing_type="ai" if job["use_ai"] else "basic",
+                    status="processing"
+                )
+            
+            await self._restart_job(job)
+            logger.info(f"♻️ Recovered job {file_id} (last completed stage: {job['last_stage'] or 'none'})")
+            recovered += 1
+        
+        return recovered
+    
+    async def retry_conversion(self, job: Dict[str, Any], lane: str = LANE_INTERACTIVE) -> List[str]:
+        """
+        실패한 작업을 마지막으로 완료된 단계부터 다시 실행
+        
+        추출 텍스트/분석 결과/Excel 같은 단계 결과가 남아 있으면 그대로 재사용하므로
+        Excel 생성이나 히스토리 반영에서 실패한 작업은 Claude 요청 없이 바로 끝난다.
+        
+        Args:
+            job: 작업 저장소의 작업 정보 (상태가 failed이고 원본 PDF가 있어야 함)
+        
+        Returns:
+            재사용할 단계 결과 목록
+        
+        Raises:
+            QueueFullError: 대기열이 가득 찬 경우
+        """
+        file_id = job["file_id"]
+        job_scheduler.check_admission(session_id=job["session_id"])
+        checkpoints = await job_store.get_checkpointed_stages(file_id)
+        
+        # 히스토리에서 지워졌으면 다시 등록
+        if job["session_id"]:
+            updated = await history_service.update_file_status(
+                session_id=job["session_id"],
+                file_id=file_id,
+                status="processing"
+            )
+            if not updated:
+                await history_service.add_file_to_history(
+                    session_id=job["session_id"],
+                    file_id=file_id,
+                    original_filename=job["original_filename"],
+                    processing_type="ai" if job["use_ai"] else "basic",
+                    status="processing"
+                )
+        
+        await self._restart_job(job, lane=lane)
+        logger.info(f"🔁 Retrying job {file_id} (checkpoints: {', '.join(checkpoints) or 'none'})")
+        return checkpoints
+    
+    async def _restart_job(self, job: Dict[str, Any], lane: str = LANE_INTERACTIVE):
+        """저장된 작업 정보로 변환 작업 다시 등록 (완료된 단계는 파이프라인이 체크포인트에서 복원)"""
+        await job_store.mark_state(job["file_id"], "queued")
+        task_manager.start_task(
+            file_id=job["file_id"],
+            coro=self.convert_pdf_to_excel(
+                file_id=job["file_id"],
+                file_path=job["file_path"],
+                original_filename=job["original_filename"],
+                use_ai=bool(job["use_ai"]),
+                session_id=job["session_id"]
+            ),
+            task_name=f"pdf_to_excel_{job['original_filename']}",
+            check_admission=False,
+            session_id=job["session_id"],
+            lane=lane
+        )
+    
     async def _validate_file(self, file_path: str):
         """파일 유효성 검증"""
         if not os.path.exists(file_path):
@@ -240,14 +818,11 @@ class EnhancedConversionService:
             if header != b'%PDF':
                 raise ValueError("유효하지 않은 PDF 파일입니다.")
     
-    async def _extract_pdf_text(self, file_path: str) -> str:
+    async def _extract_pdf_text(self, file_path: str, token: Optional[CancellationToken] = None) -> str:
         """PDF에서 텍스트 추출"""
-        # 시뮬레이션을 위한 약간의 지연
-        await asyncio.sleep(0.5)
-        
         try:
             # extract_text는 단순히 문자열을 반환
-            extracted_text = await self.pdf_processor.extract_text(file_path)
+            extracted_text = await self.pdf_processor.extract_text(file_path, token)
             
             if not extracted_text or not extracted_text.strip():
                 raise ValueError("PDF에서 추출된 텍스트가 없습니다.")
@@ -257,11 +832,17 @@ class EnhancedConversionService:
         except Exception as e:
             raise ValueError(f"PDF 처리 중 오류 발생: {str(e)}")
     
-    async def _process_with_ai(self, text_content: str) -> Dict[str, Any]:
-        """AI를 사용한 텍스트 처리"""
-        # 여러 단계로 나누어 진행률 업데이트
+    async def _process_with_ai(
+        self,
+        text_content: str,
+        token: Optional[CancellationToken] = None
+    ) -> Dict[str, Any]:
+        """AI를 사용한 텍스트 처리 (취소 시 진행 중인 Claude 요청 중단)"""
         try:
-            result = await self.claude_service.process_bank_statement(text_content)
+            result = await run_cancellable(
+                self.claude_service.process_bank_statement(text_content),
+                token
+            )
             
             if not result.success:
                 raise ValueError(f"AI 처리 실패: {result.error}")
@@ -278,9 +859,6 @@ class EnhancedConversionService:
     
     async def _simple_text_parsing(self, text_content: str) -> Dict[str, Any]:
         """간단한 텍스트 파싱 (AI 미사용)"""
-        # 시뮬레이션을 위한 지연
-        await asyncio.sleep(1.0)
-        
         # 기본 파싱 로직 (실제 구현은 더 복잡해야 함)
         lines = text_content.split('\n')
         
@@ -294,66 +872,79 @@ class EnhancedConversionService:
         }
     
     async def _generate_excel_file(
-        self, 
-        file_id: str, 
-        data: Dict[str, Any], 
-        original_filename: str
+        self,
+        file_id: str,
+        data: Dict[str, Any],
+        summary: Optional[Dict[str, Any]] = None
     ) -> str:
-        """Excel 파일 생성"""
-        # 시뮬레이션을 위한 지연
-        await asyncio.sleep(0.3)
-        
+        """Excel 파일 생성 (워크북 쓰기는 스레드에서 실행, 거래 요약은 Summary 시트에 기록)"""
         try:
-            # 데이터를 TableData 형식으로 변환
-            from models.schemas import TableData
-            table_data = TableData(
-                headers=data.get("headers", []),
-                rows=data.get("rows", [])
-            )
+            # 열 단위 표로 한 번 변환해 Excel과 내보내기용 표 저장에 함께 사용
+            # (여러 표로 된 명세서는 표마다 시트 하나)
+            tables = await self._columnar_tables(data)
             
             # Excel 생성
-            excel_path = await self.excel_generator.create_excel(table_data, file_id)
-            
-            # 파일 매니저에 등록
-            await self.file_manager.register_file(file_id, excel_path)
+            excel_path = await self.excel_generator.create_excel(tables, file_id, summary)
+            await self._save_export_table(excel_path, tables, data, summary)
             
             return excel_path
             
         except Exception as e:
             raise ValueError(f"Excel 생성 중 오류 발생: {str(e)}")
     
+    async def _columnar_tables(self, data: Dict[str, Any]) -> List[ColumnarTable]:
+        """단계 출력의 표들을 열 단위 표로 변환 (스레드에서 실행)"""
+        return await asyncio.to_thread(lambda: [
+            ColumnarTable.from_rows(table.get("headers", []), table.get("rows", []))
+            for table in data.get("tables") or [data]
+        ])
+    
+    async def _save_export_table(
+        self,
+        excel_path: str,
+        tables: List[ColumnarTable],
+        data: Dict[str, Any],
+        summary: Optional[Dict[str, Any]]
+    ):
+        """다른 형식(CSV/JSONL/Parquet)은 다운로드 요청 시 만들 수 있도록 표를 열 단위로 저장"""
+        await asyncio.to_thread(
+            table_exporter.save_table,
+            excel_path,
+            tables,
+            data.get("primary", 0),
+            summary
+        )
+    
     async def _get_file_size(self, file_path: str) -> int:
         """파일 크기 조회"""
         try:
-            return os.path.getsize(file_path) if os.path.exists(file_path) else 0
+            return result_cache.size(file_path)
         except:
             return 0
     
-    def _format_data_for_preview(self, structured_data: Dict[str, Any]) -> List[Dict]:
-        """변환된 데이터를 미리보기용으로 포맷팅"""
+    def _format_data_for_preview(self, structured_data: Dict[str, Any]) -> ColumnarTable:
+        """
+        변환된 데이터를 미리보기용으로 포맷팅
+        
+        히스토리와 중복 제거 인덱스가 오래 보관하므로 행 딕셔너리 대신 열 단위 표로 저장하고,
+        API 응답 시에만 행 딕셔너리 목록(records)으로 펼친다.
+        """
+        headers = structured_data.get("headers", [])
         try:
-            headers = structured_data.get("headers", [])
-            rows = structured_data.get("rows", [])
-            
-            preview_data = []
-            for row in rows:
-                if len(row) >= len(headers):
-                    row_dict = {}
-                    for i, header in enumerate(headers):
-                        row_dict[header] = row[i] if i < len(row) else ""
-                    preview_data.append(row_dict)
-            
-            return preview_data
+            # 헤더보다 짧은 행은 미리보기에서 제외
+            rows = [row for row in structured_data.get("rows", []) if len(row) >= len(headers)]
+            return ColumnarTable.from_rows(headers, rows)
             
         except Exception as e:
             logger.error(f"Error formatting data for preview: {e}")
-            return []
+            return ColumnarTable.from_rows(headers, [])
     
     async def _cleanup_temp_files(self, file_id: str):
         """임시 파일 정리"""
         try:
             # 파일 매니저를 통한 정리
             await self.file_manager.cleanup_file(file_id)
+            await self.file_manager.cleanup_file(f"{file_id}_provisional")
             logger.info(f"🧹 Temp files cleaned up for file_id: {file_id}")
         except Exception as e:
             logger.error(f"Temp file cleanup error for {file_id}: {e}")
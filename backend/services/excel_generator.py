@@ -1,142 +1,431 @@
+import asyncio
+import io
 import xlsxwriter
 import os
-from typing import List, Any
+from datetime import datetime
+from itertools import islice
+from typing import AsyncIterable, BinaryIO, Callable, Dict, List, Any, Iterable, Optional, Sequence, Tuple, Union
+from openpyxl import load_workbook
 from models.schemas import TableData
+from models.columnar import ColumnarTable
 from utils.file_manager import FileManager
+from utils.amount_parser import try_parse_korean_amount
+from utils.date_parser import parse_statement_date
+from .result_cache import result_cache
+
+# Column kinds detected by type inference
+COLUMN_DATE = "date"
+COLUMN_AMOUNT = "amount"
+COLUMN_TEXT = "text"
+
+# Share of non-empty sampled cells that must parse for a column to get a type
+COLUMN_TYPE_THRESHOLD = 0.9
+
+
+def infer_column_types(sample: Sequence[Sequence[Any]], column_count: int) -> List[str]:
+    """
+    Classify each column as date, amount or text from a sample of rows
+    
+    Empty cells are ignored; a column is typed only when nearly all of its
+    remaining cells parse (dates are checked before amounts).
+    """
+    kinds = []
+    for col in range(column_count):
+        values = [
+            row[col] for row in sample
+            if col < len(row) and row[col] is not None and str(row[col]).strip()
+        ]
+        kind = COLUMN_TEXT
+        if values:
+            for candidate, parse in ((COLUMN_DATE, parse_statement_date), (COLUMN_AMOUNT, try_parse_korean_amount)):
+                parsed = sum(1 for value in values if parse(value) is not None)
+                if parsed >= len(values) * COLUMN_TYPE_THRESHOLD:
+                    kind = candidate
+                    break
+        kinds.append(kind)
+    return kinds
+
+
+# Name of the first data sheet; further logical tables get " (2)", " (3)", ...
+DATA_SHEET_NAME = 'Bank Statement'
+
+# Name of the statistics sheet added after the data sheets
+SUMMARY_SHEET_NAME = 'Summary'
+
+# Longest worksheet name Excel accepts
+MAX_SHEET_NAME_LENGTH = 31
+
+# One logical table to write: (headers, rows)
+Sheet = Tuple[List[str], Iterable[Sequence[Any]]]
+
+# Rows of one logical table arriving from a stream: (table index, headers, rows).
+# A new table index is always the next one, so sheets are created in order.
+RowChunk = Tuple[int, List[str], Sequence[Sequence[Any]]]
+
+# Upper bound for column widths taken from sampled cell text
+MAX_COLUMN_WIDTH = 50
+
 
 class ExcelGenerator:
     """
     Service for generating Excel files from table data using xlsxwriter
     """
     
-    async def create_excel(self, table_data: TableData, file_id: str) -> str:
+    # Rows buffered to infer column types before streaming the rest
+    type_sample_rows = 200
+    
+    # Tables up to this many rows are built with xlsxwriter in_memory mode;
+    # larger ones in constant_memory mode, which keeps cell memory flat
+    in_memory_max_rows = int(os.getenv("EXCEL_IN_MEMORY_MAX_ROWS", "20000"))
+    
+    async def create_excel(
+        self,
+        tables: Union[TableData, ColumnarTable, Sequence[Union[TableData, ColumnarTable]]],
+        file_id: str,
+        summary: Optional[Dict[str, Any]] = None
+    ) -> str:
         """
         Create Excel file from table data
         
+        The workbook is written on a worker thread so the event loop keeps
+        serving WebSocket heartbeats and other jobs while it is generated.
+        The workbook is built in a memory buffer and handed to the result
+        cache, which serves downloads from memory and only spills large or
+        evicted workbooks to disk.
+        
         Args:
-            table_data: TableData object with headers and rows
+            tables: TableData or ColumnarTable, or several logical tables
+                of one statement (one worksheet each, in order)
             file_id: Unique identifier for the file
+            summary: Financial summary for the Summary sheet (see statement_summary)
             
         Returns:
             Path to the generated Excel file
         """
         try:
+            if isinstance(tables, (TableData, ColumnarTable)):
+                tables = [tables]
             excel_path = await FileManager.get_temp_file_path(file_id, "xlsx")
+            # A ColumnarTable is itself the sequence of its rows
+            sheets = [
+                (table.headers, table if isinstance(table, ColumnarTable) else table.rows)
+                for table in tables
+            ]
+            await asyncio.to_thread(self.write_result, excel_path, sheets, summary)
+            return excel_path
             
-            # Create workbook and worksheet
-            workbook = xlsxwriter.Workbook(excel_path)
-            worksheet = workbook.add_worksheet('Bank Statement')
+        except Exception as e:
+            raise Exception(f"Failed to create Excel file: {str(e)}")
+    
+    async def create_excel_stream(
+        self,
+        chunks: AsyncIterable[RowChunk],
+        file_id: str,
+        summary: Optional[Callable[[], Optional[Dict[str, Any]]]] = None
+    ) -> str:
+        """
+        Create an Excel file from rows as they are produced
+        
+        Each chunk is written on a worker thread as soon as it arrives, so
+        the workbook is built while the parser is still reading pages
+        instead of after the whole table has been collected. Column widths,
+        autofilter ranges and the Summary sheet are finalized when the
+        stream ends. The workbook is assembled in memory and handed to the
+        result cache, which spills large results to disk; with the cache
+        disabled it streams straight to disk.
+        
+        Args:
+            chunks: Async stream of (table index, headers, rows)
+            file_id: Unique identifier for the file
+            summary: Called once the stream ends to get the financial
+                summary for the Summary sheet
             
-            # Define formats
-            header_format = workbook.add_format({
+        Returns:
+            Path to the generated Excel file
+        """
+        excel_path = await FileManager.get_temp_file_path(file_id, "xlsx")
+        buffer = io.BytesIO() if result_cache.enabled else None
+        if buffer is None:
+            # A cached result from an earlier run would shadow the new file
+            result_cache.discard(excel_path)
+        
+        stream = WorkbookStream(self, buffer or excel_path, {'constant_memory': True})
+        try:
+            async for index, headers, rows in chunks:
+                await asyncio.to_thread(stream.add, index, headers, rows)
+            await asyncio.to_thread(stream.close, summary() if summary else None)
+        except BaseException:
+            stream.abort()
+            if buffer is None:
+                result_cache.discard(excel_path)
+            raise
+        
+        if buffer is not None:
+            result_cache.put(excel_path, buffer.getvalue())
+        return excel_path
+    
+    def write_result(
+        self,
+        excel_path: str,
+        sheets: Sequence[Sheet],
+        summary: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """
+        Write a conversion result to excel_path through the result cache
+        
+        Small tables use xlsxwriter in_memory mode and larger ones
+        constant_memory mode; both write the finished file to a buffer, and
+        the result cache keeps it or spills it to disk by its actual size
+        (RESULT_CACHE_SPILL_BYTES). With the cache disabled the workbook is
+        streamed straight to disk.
+        
+        Args:
+            excel_path: Path identifying the result
+            sheets: (headers, rows) of each logical table
+            summary: Financial summary for the Summary sheet
+            
+        Returns:
+            Number of data rows written
+        """
+        if result_cache.enabled:
+            constant_memory = sum(len(rows) for _, rows in sheets) > self.in_memory_max_rows
+            buffer = io.BytesIO()
+            row_count = self.write_sheets(buffer, sheets, summary, constant_memory=constant_memory)
+            result_cache.put(excel_path, buffer.getvalue())
+            return row_count
+        
+        # A cached result from an earlier run would shadow the new file
+        result_cache.discard(excel_path)
+        return self.write_sheets(excel_path, sheets, summary)
+    
+    def write_workbook(
+        self,
+        target: Union[str, BinaryIO],
+        headers: List[str],
+        rows: Iterable[Sequence[Any]]
+    ) -> int:
+        """
+        Stream the rows of a single table into a workbook (see write_sheets)
+        
+        Returns:
+            Number of data rows written
+        """
+        return self.write_sheets(target, [(headers, rows)])
+    
+    def write_sheets(
+        self,
+        target: Union[str, BinaryIO],
+        sheets: Iterable[Sheet],
+        summary: Optional[Dict[str, Any]] = None,
+        constant_memory: Optional[bool] = None
+    ) -> int:
+        """
+        Stream logical tables into a workbook, one worksheet each, with constant memory use
+        
+        Tables and their rows are consumed one at a time from any iterables
+        and flushed to disk in order (xlsxwriter constant_memory mode), so
+        memory stays flat no matter how many rows the statement has. A
+        file-like target is built in memory instead (xlsxwriter in_memory
+        mode) unless constant_memory is set; in constant_memory mode the
+        finished file is still written to the buffer. In each table the first rows are buffered
+        to infer each column's type (date, amount or text); every cell is
+        then converted once by its column's parser, so dates become real
+        Excel dates and amounts numbers. Autofilter ranges and the summary
+        sheet are filled in once the row counts are known.
+        
+        Args:
+            target: Path of the workbook to create, or a binary buffer
+            sheets: (headers, rows) of each table; the first sheet is named
+                "Bank Statement", later ones "Bank Statement (2)" and so on
+            summary: Financial summary added to the Summary sheet
+            constant_memory: Use constant_memory mode (defaults to True for a
+                path and False for a buffer)
+            
+        Returns:
+            Number of data rows written over all sheets
+        """
+        if constant_memory is None:
+            constant_memory = isinstance(target, str)
+        options = {'constant_memory': True} if constant_memory else {'in_memory': True}
+        stream = WorkbookStream(self, target, options)
+        try:
+            for index, (headers, rows) in enumerate(sheets):
+                stream.add(index, headers, rows)
+        except BaseException:
+            stream.abort()
+            raise
+        return stream.close(summary)
+    
+    def _add_formats(self, workbook: xlsxwriter.Workbook) -> Dict[str, Any]:
+        """Cell formats shared by the data sheets of a workbook"""
+        return {
+            'header': workbook.add_format({
                 'bold': True,
                 'bg_color': '#4CAF50',
                 'font_color': 'white',
                 'border': 1,
                 'align': 'center',
                 'valign': 'vcenter'
-            })
-            
-            cell_format = workbook.add_format({
+            }),
+            'cell': workbook.add_format({
                 'border': 1,
                 'align': 'left',
                 'valign': 'vcenter'
-            })
-            
-            number_format = workbook.add_format({
+            }),
+            'number': workbook.add_format({
                 'border': 1,
                 'align': 'right',
                 'valign': 'vcenter',
                 'num_format': '#,##0.00'
-            })
-            
-            # Write headers
-            for col, header in enumerate(table_data.headers):
-                worksheet.write(0, col, header, header_format)
-                
-                # Auto-adjust column width based on header length
-                worksheet.set_column(col, col, max(len(header) + 2, 12))
-            
-            # Write data rows
-            for row_idx, row in enumerate(table_data.rows, start=1):
-                for col_idx, cell_value in enumerate(row):
-                    # Try to detect if the cell contains a number (amount)
-                    if self._is_numeric_value(cell_value):
-                        try:
-                            numeric_value = self._parse_numeric_value(cell_value)
-                            worksheet.write(row_idx, col_idx, numeric_value, number_format)
-                        except ValueError:
-                            worksheet.write(row_idx, col_idx, cell_value, cell_format)
-                    else:
-                        worksheet.write(row_idx, col_idx, cell_value, cell_format)
-            
-            # Add auto-filter to the data
-            if table_data.headers and table_data.rows:
-                last_row = len(table_data.rows)
-                last_col = len(table_data.headers) - 1
-                worksheet.autofilter(0, 0, last_row, last_col)
-            
-            # Freeze the header row
-            worksheet.freeze_panes(1, 0)
-            
-            # Add summary information
-            if table_data.rows:
-                self._add_summary_sheet(workbook, table_data)
-            
-            workbook.close()
-            
-            return excel_path
-            
-        except Exception as e:
-            raise Exception(f"Failed to create Excel file: {str(e)}")
+            }),
+            'date': workbook.add_format({
+                'border': 1,
+                'align': 'center',
+                'valign': 'vcenter',
+                'num_format': 'yyyy-mm-dd'
+            }),
+            'datetime': workbook.add_format({
+                'border': 1,
+                'align': 'center',
+                'valign': 'vcenter',
+                'num_format': 'yyyy-mm-dd hh:mm'
+            }),
+        }
     
-    def _is_numeric_value(self, value: str) -> bool:
+    def _column_writers(
+        self,
+        worksheet,
+        kinds: List[str],
+        cell_format,
+        number_format,
+        date_format,
+        datetime_format
+    ) -> List[Callable[[int, int, Any], None]]:
         """
-        Check if a string value represents a numeric amount
+        Build one cell writer per column from its inferred type
+        
+        Each writer converts with its column's parser and calls the typed
+        xlsxwriter method directly, skipping write()'s per-cell type dispatch.
+        Cells that do not fit the column's type are written unchanged as text.
         """
-        if not isinstance(value, str):
-            return False
+        write_string = worksheet.write_string
+        write_number = worksheet.write_number
+        write_datetime = worksheet.write_datetime
+        write_blank = worksheet.write_blank
+        write_any = worksheet.write
         
-        # Clean the value
-        cleaned = value.strip().replace(',', '').replace('$', '').replace('₩', '')
+        def write_text(row_idx: int, col_idx: int, value: Any):
+            if value is None or value == "":
+                write_blank(row_idx, col_idx, None, cell_format)
+            elif isinstance(value, str):
+                write_string(row_idx, col_idx, value, cell_format)
+            else:
+                write_any(row_idx, col_idx, value, cell_format)
         
-        # Check for negative values in parentheses (100.00) or with minus sign
-        if cleaned.startswith('(') and cleaned.endswith(')'):
-            cleaned = cleaned[1:-1]
+        def write_amount(row_idx: int, col_idx: int, value: Any):
+            amount = try_parse_korean_amount(value)
+            if amount is None:
+                write_text(row_idx, col_idx, value)
+            else:
+                write_number(row_idx, col_idx, amount, number_format)
         
-        try:
-            float(cleaned)
-            return True
-        except ValueError:
-            return False
+        def write_date(row_idx: int, col_idx: int, value: Any):
+            parsed = parse_statement_date(value)
+            if parsed is None:
+                write_text(row_idx, col_idx, value)
+            elif parsed.hour or parsed.minute or parsed.second:
+                write_datetime(row_idx, col_idx, parsed, datetime_format)
+            else:
+                write_datetime(row_idx, col_idx, parsed, date_format)
+        
+        writer_for = {COLUMN_AMOUNT: write_amount, COLUMN_DATE: write_date, COLUMN_TEXT: write_text}
+        return [writer_for[kind] for kind in kinds]
     
-    def _parse_numeric_value(self, value: str) -> float:
+    def merge_workbooks(self, sources: List[Tuple[str, str]], output_path: str) -> str:
         """
-        Parse string value to numeric value
+        Combine the data sheets of several generated workbooks into one workbook
+        
+        Every data sheet of each source is copied, so statements written as
+        several tables keep all of them: the first gets the source's sheet
+        name, later ones "{name} (2)", "{name} (3)" and so on. The Summary
+        sheet of each source is left out on purpose; its totals describe a
+        single statement and its layout is not a table.
+        
+        Args:
+            sources: (sheet name, Excel path) pairs; sheet names must already be unique
+            output_path: Path of the combined workbook
+            
+        Returns:
+            Path to the combined Excel file
         """
-        if not isinstance(value, str):
-            return float(value)
+        workbook = xlsxwriter.Workbook(output_path, {'constant_memory': True})
+        header_format = workbook.add_format({
+            'bold': True,
+            'bg_color': '#4CAF50',
+            'font_color': 'white',
+            'border': 1,
+            'align': 'center',
+            'valign': 'vcenter'
+        })
+        number_format = workbook.add_format({'num_format': '#,##0.00'})
+        date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
         
-        cleaned = value.strip().replace(',', '').replace('$', '').replace('₩', '')
+        # Names taken so far (Excel compares sheet names case-insensitively)
+        used = {sheet_name.lower() for sheet_name, _ in sources}
         
-        # Handle negative values in parentheses
-        is_negative = False
-        if cleaned.startswith('(') and cleaned.endswith(')'):
-            cleaned = cleaned[1:-1]
-            is_negative = True
-        elif cleaned.startswith('-'):
-            is_negative = True
-            cleaned = cleaned[1:]
+        def extra_sheet_name(sheet_name: str, number: int) -> str:
+            while True:
+                suffix = f" ({number})"
+                candidate = sheet_name[:MAX_SHEET_NAME_LENGTH - len(suffix)] + suffix
+                if candidate.lower() not in used:
+                    used.add(candidate.lower())
+                    return candidate
+                number += 1
         
-        numeric_value = float(cleaned)
-        return -numeric_value if is_negative else numeric_value
+        try:
+            for sheet_name, excel_path in sources:
+                source = load_workbook(excel_path, read_only=True)
+                try:
+                    data_sheets = [sheet for sheet in source.worksheets if sheet.title != SUMMARY_SHEET_NAME]
+                    for index, source_sheet in enumerate(data_sheets):
+                        name = sheet_name if index == 0 else extra_sheet_name(sheet_name, index + 1)
+                        worksheet = workbook.add_worksheet(name)
+                        for row_idx, row in enumerate(source_sheet.iter_rows(values_only=True)):
+                            for col_idx, value in enumerate(row):
+                                if value is None:
+                                    continue
+                                if row_idx == 0:
+                                    worksheet.write(row_idx, col_idx, value, header_format)
+                                elif isinstance(value, datetime):
+                                    worksheet.write_datetime(row_idx, col_idx, value, date_format)
+                                elif isinstance(value, (int, float)):
+                                    worksheet.write_number(row_idx, col_idx, value, number_format)
+                                else:
+                                    worksheet.write(row_idx, col_idx, value)
+                        worksheet.freeze_panes(1, 0)
+                finally:
+                    source.close()
+        finally:
+            workbook.close()
+        
+        return output_path
     
-    def _add_summary_sheet(self, workbook: xlsxwriter.Workbook, table_data: TableData):
+    def _add_summary_sheet(
+        self,
+        workbook: xlsxwriter.Workbook,
+        sheet_stats: List[Tuple[str, int, int]],
+        summary: Optional[Dict[str, Any]] = None
+    ):
         """
         Add a summary sheet with basic statistics
+        
+        Args:
+            sheet_stats: (sheet name, data rows, columns) of each data sheet
+            summary: Totals, monthly flows, balance check and top
+                counterparties computed by the summary stage
         """
         try:
-            summary_sheet = workbook.add_worksheet('Summary')
+            summary_sheet = workbook.add_worksheet(SUMMARY_SHEET_NAME)
             
             # Define formats
             title_format = workbook.add_format({
@@ -165,16 +454,240 @@ class ExcelGenerator:
             # Add basic statistics
             row = 2
             summary_sheet.write(row, 0, 'Total Records:', label_format)
-            summary_sheet.write(row, 1, len(table_data.rows), value_format)
+            summary_sheet.write(row, 1, sum(rows for _, rows, _ in sheet_stats), value_format)
             
-            row += 1
-            summary_sheet.write(row, 0, 'Columns:', label_format)
-            summary_sheet.write(row, 1, len(table_data.headers), value_format)
+            if len(sheet_stats) == 1:
+                row += 1
+                summary_sheet.write(row, 0, 'Columns:', label_format)
+                summary_sheet.write(row, 1, sheet_stats[0][2], value_format)
+            else:
+                # Records per table when the statement has several
+                row += 1
+                summary_sheet.write(row, 0, 'Tables:', label_format)
+                summary_sheet.write(row, 1, len(sheet_stats), value_format)
+                for name, rows, _ in sheet_stats:
+                    row += 1
+                    summary_sheet.write(row, 0, f'{name}:', label_format)
+                    summary_sheet.write(row, 1, rows, value_format)
+            
+            if summary:
+                self._write_financial_summary(workbook, summary_sheet, row + 2, summary, label_format, value_format)
             
             # Set column widths
             summary_sheet.set_column(0, 0, 20)
-            summary_sheet.set_column(1, 1, 15)
+            summary_sheet.set_column(1, 4, 15)
             
         except Exception:
             # If summary creation fails, continue without it
-            pass
\ No newline at end of file
+            pass
+    
+    def _write_financial_summary(
+        self,
+        workbook: xlsxwriter.Workbook,
+        sheet,
+        row: int,
+        summary: Dict[str, Any],
+        label_format,
+        value_format
+    ):
+        """
+        Write totals, balance check, monthly flows and top counterparties
+        below the basic statistics, starting at the given row
+        """
+        count_format = workbook.add_format({'border': 1, 'num_format': '#,##0'})
+        text_format = workbook.add_format({'border': 1})
+        
+        period = summary.get('period')
+        if period:
+            sheet.write(row, 0, 'Period:', label_format)
+            sheet.write(row, 1, f"{period['start']} ~ {period['end']}", text_format)
+            row += 1
+        
+        sheet.write(row, 0, 'Transactions:', label_format)
+        sheet.write(row, 1, summary['transactions'], count_format)
+        for label, key in (('Total Inflow:', 'total_inflow'), ('Total Outflow:', 'total_outflow'), ('Net:', 'net')):
+            row += 1
+            sheet.write(row, 0, label, label_format)
+            sheet.write(row, 1, summary[key], value_format)
+        
+        balance_check = summary.get('balance_check')
+        if balance_check:
+            row += 1
+            sheet.write(row, 0, 'Opening Balance:', label_format)
+            sheet.write(row, 1, balance_check['opening_balance'], value_format)
+            row += 1
+            sheet.write(row, 0, 'Closing Balance:', label_format)
+            sheet.write(row, 1, balance_check['closing_balance'], value_format)
+            row += 1
+            sheet.write(row, 0, 'Balance Check:', label_format)
+            if balance_check['mismatches']:
+                rows = ', '.join(str(number) for number in balance_check['mismatch_rows'])
+                status = f"{balance_check['mismatches']} of {balance_check['checked']} rows mismatch (rows {rows})"
+            else:
+                status = f"OK ({balance_check['checked']} rows checked)"
+            sheet.write(row, 1, status, text_format)
+        
+        tables = (
+            ('Monthly', ['Month', 'Inflow', 'Outflow', 'Net', 'Count'],
+             [(m['month'], m['inflow'], m['outflow'], m['net'], m['count']) for m in summary.get('monthly', [])]),
+            ('Top Counterparties', ['Name', 'Inflow', 'Outflow', 'Count'],
+             [(c['name'], c['inflow'], c['outflow'], c['count']) for c in summary.get('top_counterparties', [])]),
+        )
+        for title, headers, values in tables:
+            if not values:
+                continue
+            row += 2
+            sheet.write(row, 0, title, label_format)
+            row += 1
+            sheet.write_row(row, 0, headers, label_format)
+            for value_row in values:
+                row += 1
+                sheet.write(row, 0, value_row[0], text_format)
+                for col, value in enumerate(value_row[1:-1], start=1):
+                    sheet.write(row, col, value, value_format)
+                sheet.write(row, len(value_row) - 1, value_row[-1], count_format)
+
+
+class WorkbookStream:
+    """
+    Workbook whose data sheets are filled incrementally
+    
+    Rows are added in batches per logical table (a new table gets the next
+    worksheet) and may interleave between tables; in constant_memory mode
+    every sheet still flushes its rows in order. close() finalizes each
+    sheet and adds the Summary sheet.
+    """
+    
+    def __init__(self, generator: ExcelGenerator, target: Union[str, BinaryIO], options: Dict[str, Any]):
+        self.generator = generator
+        self.workbook = xlsxwriter.Workbook(target, options)
+        self.formats = generator._add_formats(self.workbook)
+        self.sheets: List[Tuple[str, "_SheetWriter"]] = []
+    
+    def add(self, index: int, headers: List[str], rows: Iterable[Sequence[Any]]):
+        """Add rows to the table at index (index == number of tables so far starts a new sheet)"""
+        if index == len(self.sheets):
+            name = DATA_SHEET_NAME if index == 0 else f"{DATA_SHEET_NAME} ({index + 1})"
+            writer = _SheetWriter(self.generator, self.workbook.add_worksheet(name), headers, self.formats)
+            self.sheets.append((name, writer))
+        elif index > len(self.sheets):
+            raise ValueError(f"Table {index} started before table {len(self.sheets)}")
+        self.sheets[index][1].add(rows)
+    
+    def close(self, summary: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Finalize all sheets, add the Summary sheet and write the workbook
+        
+        Returns:
+            Number of data rows written over all sheets
+        """
+        try:
+            sheet_stats = [(name, writer.finish(), len(writer.headers)) for name, writer in self.sheets]
+            
+            # Add summary information
+            row_total = sum(row_count for _, row_count, _ in sheet_stats)
+            if row_total:
+                self.generator._add_summary_sheet(self.workbook, sheet_stats, summary)
+        finally:
+            self.workbook.close()
+        return row_total
+    
+    def abort(self):
+        """Release the workbook's temporary files after a failure"""
+        try:
+            self.workbook.close()
+        except Exception:
+            pass
+
+
+class _SheetWriter:
+    """
+    Incremental writer for one data worksheet
+    
+    The first type_sample_rows rows are buffered to infer each column's type
+    (date, amount or text) and width; after that every batch is written
+    straight through, converting each cell once with its column's writer.
+    Widths, the autofilter range and the frozen header are set in finish(),
+    once the row count is known.
+    """
+    
+    def __init__(self, generator: ExcelGenerator, worksheet, headers: List[str], formats: Dict[str, Any]):
+        self.generator = generator
+        self.worksheet = worksheet
+        self.headers = headers
+        self.formats = formats
+        self.row_count = 0
+        self._sample: List[Sequence[Any]] = []
+        self._writers: Optional[List[Callable[[int, int, Any], None]]] = None
+        self._text_writer = None
+        self._widths: List[int] = []
+    
+    def add(self, rows: Iterable[Sequence[Any]]):
+        rows = iter(rows)
+        if self._writers is None:
+            limit = self.generator.type_sample_rows
+            self._sample.extend(islice(rows, limit - len(self._sample)))
+            if len(self._sample) < limit:
+                # The batch ran out before the sample was complete
+                return
+            self._start()
+        self._write(rows)
+    
+    def finish(self) -> int:
+        """Set column widths, autofilter and frozen header; return the data row count"""
+        if self._writers is None:
+            self._start()
+        
+        worksheet = self.worksheet
+        for col, width in enumerate(self._widths):
+            worksheet.set_column(col, col, width)
+        
+        # Add auto-filter to the data
+        if self.headers and self.row_count:
+            worksheet.autofilter(0, 0, self.row_count, len(self.headers) - 1)
+        
+        # Freeze the header row
+        worksheet.freeze_panes(1, 0)
+        return self.row_count
+    
+    def _start(self):
+        """Infer column types and widths from the sample, write the header and the sample"""
+        sample, self._sample = self._sample, []
+        headers, formats = self.headers, self.formats
+        column_count = len(headers)
+        
+        kinds = infer_column_types(sample, column_count)
+        writers = self.generator._column_writers(
+            self.worksheet,
+            kinds + [COLUMN_TEXT],
+            formats['cell'],
+            formats['number'],
+            formats['date'],
+            formats['datetime']
+        )
+        # Cells beyond the header columns are written as text
+        self._text_writer = writers.pop()
+        self._writers = writers
+        
+        # Widths fit the header and the sampled text cells (dates and amounts use fixed formats)
+        self._widths = []
+        for col, (header, kind) in enumerate(zip(headers, kinds)):
+            width = max(len(header) + 2, 12)
+            if kind == COLUMN_TEXT:
+                longest = max((len(str(row[col])) for row in sample if col < len(row) and row[col] is not None), default=0)
+                width = max(width, min(longest + 2, MAX_COLUMN_WIDTH))
+            self._widths.append(width)
+        
+        self.worksheet.write_row(0, 0, headers, formats['header'])
+        self._write(sample)
+    
+    def _write(self, rows: Iterable[Sequence[Any]]):
+        """Write data rows in order, converting each cell with its column's writer"""
+        writers, text_writer = self._writers, self._text_writer
+        column_count = len(self.headers)
+        row_count = self.row_count
+        for row_count, row in enumerate(rows, start=row_count + 1):
+            for col_idx, cell_value in enumerate(row):
+                writer = writers[col_idx] if col_idx < column_count else text_writer
+                writer(row_count, col_idx, cell_value)
+        self.row_count = row_count
@@ -3,12 +3,15 @@
 사용자별 변환 기록 관리 (세션 기반)
 """
 import json
-import os
 import asyncio
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 from models.schemas import FileHistoryItem  # FileHistoryItem은 schemas.py에서 정의되어야 합니다.
+from models.columnar import ColumnarTable
+from .result_index import result_index
+from .result_cache import result_cache
+from .table_export import table_exporter
 import logging
 
 logger = logging.getLogger(__name__)
@@ -129,7 +132,8 @@ class HistoryService:
         status: str,
         excel_path: Optional[str] = None,
         file_size: Optional[int] = None,
-        converted_data: Optional[List[Dict]] = None
+        converted_data: Optional[ColumnarTable] = None,
+        summary: Optional[Dict[str, Any]] = None
     ) -> bool:
         """파일 상태 업데이트"""
         try:
@@ -147,6 +151,8 @@ class HistoryService:
                         file_item.file_size = file_size
                     if converted_data:
                         file_item.converted_data = converted_data
+                    if summary:
+                        file_item.summary = summary
                     
                     logger.info(f"📝 Updated file status: {file_id} -> {status}")
                     return True
@@ -250,9 +256,13 @@ class HistoryService:
     async def _cleanup_file_data(self, file_item: FileHistoryItem):
         """파일 데이터 정리"""
         try:
-            # Excel 파일 삭제
-            if file_item.excel_path and os.path.exists(file_item.excel_path):
-                os.remove(file_item.excel_path)
+            # 같은 Excel 파일을 공유하는 다른 file_id가 있으면 파일은 남겨둔다
+            if not result_index.release(file_item.file_id, file_item.excel_path):
+                return
+            
+            # Excel 파일과 다른 형식의 내보내기 결과 삭제
+            table_exporter.discard(file_item.excel_path)
+            if result_cache.discard(file_item.excel_path):
                 logger.info(f"🧹 Cleaned up Excel file: {file_item.excel_path}")
             
         except Exception as e:
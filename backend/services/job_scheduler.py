@@ -0,0 +1,336 @@
+"""
+변환 작업 스케줄러
+동시 실행 작업 수와 대기열 길이를 제한하고 단계별 동시성을 관리
+대기 작업은 세션별 가중 공정 큐(WFQ)로 실행 순서를 정함
+"""
+import asyncio
+import bisect
+import itertools
+import math
+import os
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .websocket_manager import manager as ws_manager
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """대기열이 가득 차서 새 작업을 받을 수 없음"""
+
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(f"Conversion queue is full, retry after {retry_after}s")
+
+
+# 우선순위 레인: 유료(인앱 결제) 사용자 / 일반 대화형 업로드 / 일괄 업로드
+LANE_PAID = "paid"
+LANE_INTERACTIVE = "interactive"
+LANE_BULK = "bulk"
+
+
+def resolve_lane(priority_tier: Optional[str], default: str = LANE_INTERACTIVE) -> str:
+    """
+    요청 헤더(X-Priority-Tier)로 우선순위 레인 결정
+    
+    앱이 인앱 결제 상태를 알려주는 값이라 서버에서 영수증을 검증하지는 않는다.
+    """
+    if priority_tier and priority_tier.strip().lower() == LANE_PAID:
+        return LANE_PAID
+    return default
+
+
+@dataclass
+class _WaitingJob:
+    file_id: str
+    # 공정성 단위 (세션 ID, 세션이 없으면 file_id)
+    flow: str
+    lane: str
+    future: asyncio.Future
+    # 가상 완료 시각 (작을수록 먼저 실행)
+    finish_tag: float
+    seq: int
+    
+    @property
+    def key(self) -> Tuple[float, int]:
+        """실행 순서 키"""
+        return (self.finish_tag, self.seq)
+
+
+class JobScheduler:
+    def __init__(self):
+        # 단계별 동시 실행 수 (CPU 단계는 코어 수, AI 단계는 API 동시 호출 한도 기준)
+        cpu_count = os.cpu_count() or 1
+        self.stage_limits: Dict[str, int] = {
+            "extract": int(os.getenv("STAGE_CONCURRENCY_EXTRACT", str(cpu_count))),
+            "ai": int(os.getenv("STAGE_CONCURRENCY_AI", "4")),
+            "excel": int(os.getenv("STAGE_CONCURRENCY_EXCEL", str(cpu_count))),
+        }
+        # 동시에 실행할 수 있는 작업 수
+        # 기본값은 CPU 단계와 AI 단계가 동시에 가득 찰 수 있는 크기
+        default_running = self.stage_limits["extract"] + self.stage_limits["ai"]
+        self.max_running_jobs = int(os.getenv("MAX_RUNNING_JOBS", str(default_running)))
+        # 실행 슬롯을 기다릴 수 있는 작업 수 (초과 시 429)
+        self.max_queued_jobs = int(os.getenv("MAX_QUEUED_JOBS", "50"))
+        
+        # 세션 하나가 동시에 실행할 수 있는 작업 수 (나머지 슬롯은 다른 세션 몫으로 남김)
+        self.max_running_per_session = int(os.getenv(
+            "MAX_RUNNING_JOBS_PER_SESSION", str(max(1, self.max_running_jobs // 2))
+        ))
+        # 세션 하나가 대기열에 올릴 수 있는 작업 수 (한 세션이 대기열을 독차지하지 않도록)
+        self.max_queued_per_session = int(os.getenv(
+            "MAX_QUEUED_JOBS_PER_SESSION", str(max(1, self.max_queued_jobs // 2))
+        ))
+        # 레인별 가중치 (클수록 같은 시간에 더 많은 슬롯을 받음)
+        self.lane_weights: Dict[str, float] = {
+            LANE_PAID: float(os.getenv("SCHEDULER_WEIGHT_PAID", "4")),
+            LANE_INTERACTIVE: float(os.getenv("SCHEDULER_WEIGHT_INTERACTIVE", "2")),
+            LANE_BULK: float(os.getenv("SCHEDULER_WEIGHT_BULK", "1")),
+        }
+        
+        # 실행 중인 작업들 (file_id → 세션)
+        self.running: Dict[str, str] = {}
+        self._running_per_flow: Dict[str, int] = {}
+        # 대기 중인 작업들 (file_id → 대기 정보)
+        self.waiting: Dict[str, _WaitingJob] = {}
+        # 대기 작업의 실행 순서 키 (정렬 유지, 상태 조회마다 순번을 이진 탐색으로 계산)
+        self._order: List[Tuple[float, int]] = []
+        # 세션별 대기 작업 (세션 안에서는 도착 순서)
+        self._flows: Dict[str, Deque[_WaitingJob]] = {}
+        # 세션별 마지막 가상 완료 시각과 시스템 가상 시각
+        self._flow_finish: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+        # 단계별 세마포어
+        self._stage_semaphores: Dict[str, asyncio.Semaphore] = {}
+        # 평균 작업 소요 시간 (Retry-After 추정용 지수이동평균, 초)
+        self.average_job_seconds = 10.0
+    
+    def check_admission(self, count: int = 1, session_id: Optional[str] = None):
+        """
+        새 작업을 받을 수 있는지 확인 (대기열이 가득 차면 QueueFullError)
+        
+        Args:
+            count: 한 번에 받을 작업 수 (일괄 업로드는 전체를 받거나 전부 거절)
+            session_id: 세션별 대기 한도를 확인할 세션
+        """
+        free_slots = max(0, self.max_running_jobs - self.running_count())
+        free_queue = max(0, self.max_queued_jobs - len(self.waiting))
+        if count > free_slots + free_queue:
+            retry_after = self.estimate_retry_after()
+            logger.warning(f"🚦 Queue full ({len(self.waiting)} waiting), retry after {retry_after}s")
+            raise QueueFullError(retry_after)
+        
+        if session_id:
+            session_slots = max(0, self.max_running_per_session - self._running_per_flow.get(session_id, 0))
+            session_queue = max(0, self.max_queued_per_session - len(self._flows.get(session_id, ())))
+            if count > session_slots + session_queue:
+                retry_after = self.estimate_retry_after()
+                logger.warning(f"🚦 Session queue full for {session_id}, retry after {retry_after}s")
+                raise QueueFullError(retry_after)
+    
+    async def acquire(self, file_id: str, session_id: Optional[str] = None, lane: str = LANE_INTERACTIVE):
+        """
+        실행 슬롯 확보 (없으면 대기열에서 순서를 기다림)
+        
+        대기 작업은 세션별로 가상 완료 시각(이전 작업의 완료 시각 + 1/레인 가중치)을 받고,
+        가장 작은 작업부터 실행된다. 한 세션이 작업을 많이 올려도 다른 세션의 작업은
+        자기 몫의 순서를 받으므로 뒤로 밀리지 않는다.
+        """
+        flow = session_id or file_id
+        weight = self.lane_weights.get(lane, self.lane_weights[LANE_INTERACTIVE])
+        start_tag = max(self._virtual_time, self._flow_finish.get(flow, 0.0))
+        finish_tag = start_tag + 1.0 / weight
+        self._flow_finish[flow] = finish_tag
+        
+        future = asyncio.get_running_loop().create_future()
+        job = _WaitingJob(file_id, flow, lane, future, finish_tag, next(self._seq))
+        self.waiting[file_id] = job
+        bisect.insort(self._order, job.key)
+        self._flows.setdefault(flow, deque()).append(job)
+        self._dispatch()
+        
+        if not future.done():
+            position = self.get_queue_position(file_id)
+            logger.info(f"⏳ Job queued: {file_id} (lane {lane}, position {position})")
+            await self._broadcast_position(file_id, position)
+        
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 슬롯을 넘겨받은 직후 취소된 경우 다음 작업에 양보
+                self.release(file_id)
+            else:
+                self._remove_waiting(job)
+                asyncio.create_task(self._broadcast_all_positions())
+            raise
+    
+    def release(self, file_id: str, duration: Optional[float] = None):
+        """실행 슬롯 반환 후 다음 대기 작업 시작"""
+        flow = self.running.pop(file_id, None)
+        if flow is not None:
+            remaining = self._running_per_flow.get(flow, 1) - 1
+            if remaining > 0:
+                self._running_per_flow[flow] = remaining
+            else:
+                self._running_per_flow.pop(flow, None)
+        
+        if duration is not None:
+            self.average_job_seconds = 0.8 * self.average_job_seconds + 0.2 * duration
+        
+        if self._dispatch() and self.waiting:
+            asyncio.create_task(self._broadcast_all_positions())
+    
+    def _dispatch(self) -> bool:
+        """
+        빈 슬롯에 대기 작업 배정
+        
+        실행 한도에 걸리지 않은 세션의 맨 앞 작업 중 가상 완료 시각이 가장 작은 작업을 고른다.
+        대기 중인 세션 수는 대기열 길이로 제한되므로 세션을 훑어도 비용이 작다.
+        
+        Returns:
+            배정된 작업이 있으면 True
+        """
+        dispatched = False
+        while self.running_count() < self.max_running_jobs:
+            candidates = [
+                queue[0] for flow, queue in self._flows.items()
+                if self._running_per_flow.get(flow, 0) < self.max_running_per_session
+            ]
+            if not candidates:
+                break
+            
+            job = min(candidates, key=lambda j: j.key)
+            self._remove_waiting(job)
+            if job.future.done():
+                # 취소됐지만 acquire의 정리가 아직 실행되지 않은 대기 작업 (서버 종료 시 일괄 취소)
+                continue
+            self._virtual_time = max(self._virtual_time, job.finish_tag - 1.0 / self.lane_weights.get(job.lane, 1.0))
+            self.running[job.file_id] = job.flow
+            self._running_per_flow[job.flow] = self._running_per_flow.get(job.flow, 0) + 1
+            job.future.set_result(True)
+            dispatched = True
+            logger.info(f"▶️ Job dequeued: {job.file_id} (lane {job.lane})")
+        
+        self._forget_idle_flows()
+        return dispatched
+    
+    def _remove_waiting(self, job: _WaitingJob):
+        if self.waiting.get(job.file_id) is job:
+            del self.waiting[job.file_id]
+            index = bisect.bisect_left(self._order, job.key)
+            if index < len(self._order) and self._order[index] == job.key:
+                del self._order[index]
+        queue = self._flows.get(job.flow)
+        if queue is None:
+            return
+        if queue and queue[0] is job:
+            queue.popleft()
+        elif job in queue:
+            queue.remove(job)
+        if not queue:
+            del self._flows[job.flow]
+    
+    def _forget_idle_flows(self):
+        """대기/실행 작업이 없고 가상 시각이 따라잡은 세션 기록 정리 (메모리 유지)"""
+        if not self._flows and not self.running:
+            # 시스템이 비면 이전 사용량은 더 이상 순서에 영향을 주지 않는다
+            self._flow_finish.clear()
+            return
+        if len(self._flow_finish) <= len(self._flows) + len(self._running_per_flow):
+            return
+        for flow in [
+            flow for flow, finish in self._flow_finish.items()
+            if finish <= self._virtual_time and flow not in self._flows and flow not in self._running_per_flow
+        ]:
+            del self._flow_finish[flow]
+    
+    @asynccontextmanager
+    async def slot(self, file_id: str):
+        """작업 실행 슬롯 컨텍스트"""
+        await self.acquire(file_id)
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        try:
+            yield
+        finally:
+            self.release(file_id, loop.time() - started_at)
+    
+    def configure_stage(self, name: str, limit: int):
+        """단계 동시성 변경 (워커 프로세스처럼 실행 환경에 맞춰 조정할 때 사용)"""
+        self.stage_limits[name] = limit
+        self._stage_semaphores.pop(name, None)
+    
+    @asynccontextmanager
+    async def stage(self, name: str):
+        """단계별 동시성 제한 컨텍스트 (예: async with job_scheduler.stage("ai"))"""
+        semaphore = self._stage_semaphores.get(name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.stage_limits.get(name, self.max_running_jobs))
+            self._stage_semaphores[name] = semaphore
+        
+        async with semaphore:
+            yield
+    
+    def get_queue_position(self, file_id: str) -> Optional[int]:
+        """대기열 순번 조회 (1부터 시작, 대기 중이 아니면 None)"""
+        job = self.waiting.get(file_id)
+        if job is None:
+            return None
+        return 1 + bisect.bisect_left(self._order, job.key)
+    
+    def running_count(self) -> int:
+        """실행 중인 작업 수"""
+        return len(self.running)
+    
+    def estimate_retry_after(self) -> int:
+        """대기열이 한 칸 비기까지 걸릴 것으로 예상되는 시간 (초)"""
+        slots = max(1, self.max_running_jobs)
+        estimate = self.average_job_seconds * (len(self.waiting) + 1) / slots
+        return int(min(300, max(1, math.ceil(estimate))))
+    
+    def get_stats(self) -> dict:
+        """스케줄러 상태"""
+        return {
+            "running_jobs": self.running_count(),
+            "queued_jobs": len(self.waiting),
+            "max_running_jobs": self.max_running_jobs,
+            "max_queued_jobs": self.max_queued_jobs,
+            "max_running_per_session": self.max_running_per_session,
+            "max_queued_per_session": self.max_queued_per_session,
+            "waiting_sessions": len(self._flows),
+            "queued_by_lane": {
+                lane: sum(1 for job in self.waiting.values() if job.lane == lane)
+                for lane in self.lane_weights
+            },
+            "stage_limits": self.stage_limits,
+            "average_job_seconds": round(self.average_job_seconds, 2)
+        }
+    
+    async def _broadcast_position(self, file_id: str, position: int):
+        """대기 순번 WebSocket 알림"""
+        await ws_manager.broadcast_status(
+            file_id=file_id,
+            status="queued",
+            progress=0,
+            message=f"변환 대기 중입니다... (대기 순번 {position})",
+            data={
+                "queue_position": position,
+                "queue_length": len(self.waiting)
+            }
+        )
+    
+    async def _broadcast_all_positions(self):
+        """대기 중인 모든 작업에 순번 알림"""
+        ordered: List[_WaitingJob] = sorted(self.waiting.values(), key=lambda j: j.key)
+        for position, job in enumerate(ordered, start=1):
+            await self._broadcast_position(job.file_id, position)
+
+
+# 전역 스케줄러 인스턴스
+job_scheduler = JobScheduler()
@@ -0,0 +1,248 @@
+"""
+영속 작업 저장소
+변환 작업의 상태 전이와 단계별 결과를 SQLite(WAL)에 기록하여
+서버 재시작 후에도 중단된 작업을 마지막 완료 단계부터 이어서 실행
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 재시작 시 다시 실행해야 하는 상태
+INTERRUPTED_STATES = ("queued", "running")
+# 더 이상 진행되지 않는 상태
+TERMINAL_STATES = ("completed", "failed", "cancelled")
+# 다시 시도할 수 있는 상태 (단계 결과를 보존 기간 동안 남겨 마지막 완료 단계부터 재시도)
+RETRYABLE_STATES = ("failed",)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    file_id TEXT PRIMARY KEY,
+    file_path TEXT NOT NULL,
+    original_filename TEXT NOT NULL,
+    use_ai INTEGER NOT NULL,
+    session_id TEXT,
+    state TEXT NOT NULL,
+    last_stage TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state);
+CREATE TABLE IF NOT EXISTS job_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    stage TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_job_events_file_id ON job_events(file_id);
+CREATE TABLE IF NOT EXISTS stage_outputs (
+    file_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (file_id, stage)
+);
+"""
+
+
+class JobStore:
+    def __init__(self, db_path: Optional[str] = None):
+        # Railway 재배포 후에도 유지하려면 영구 볼륨 경로를 지정해야 함
+        self.db_path = db_path or os.getenv("JOB_STORE_PATH", "data/jobs.db")
+        self.retention = timedelta(hours=int(os.getenv("JOB_RETENTION_HOURS", "48")))
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._cleanup_task = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        """DB 연결 (최초 호출 시 스키마 생성)"""
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            logger.info(f"🗄️ Job store opened: {self.db_path}")
+        return self._conn
+    
+    def _execute(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+    
+    def _execute_many(self, statements: List[tuple]):
+        """여러 구문을 하나의 트랜잭션으로 실행"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            try:
+                for sql, params in statements:
+                    conn.execute(sql, params)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+    
+    async def _write(self, statements: List[tuple]) -> bool:
+        """쓰기 실행 (저장소 오류가 변환 자체를 실패시키지 않도록 로그만 남김)"""
+        try:
+            await asyncio.to_thread(self._execute_many, statements)
+            return True
+        except Exception as e:
+            logger.error(f"Job store write failed: {e}")
+            return False
+    
+    async def _read(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        """읽기 실행 (오류 시 빈 결과)"""
+        try:
+            return await asyncio.to_thread(self._execute, sql, params)
+        except Exception as e:
+            logger.error(f"Job store read failed: {e}")
+            return []
+    
+    async def initialize(self):
+        """저장소 초기화 (앱 시작 시 호출)"""
+        await asyncio.to_thread(self._connect)
+    
+    async def create_job(
+        self,
+        file_id: str,
+        file_path: str,
+        original_filename: str,
+        use_ai: bool,
+        session_id: Optional[str] = None
+    ) -> bool:
+        """새 작업 등록 (queued 상태)"""
+        now = datetime.now().isoformat()
+        return await self._write([
+            (
+                "INSERT OR REPLACE INTO jobs (file_id, file_path, original_filename, use_ai, session_id, "
+                "state, last_stage, error, created_at, updated_at) VALUES (?, ?, ?, ?, ?, 'queued', NULL, NULL, ?, ?)",
+                (file_id, file_path, original_filename, int(use_ai), session_id, now, now)
+            ),
+            (
+                "INSERT INTO job_events (file_id, state, stage, created_at) VALUES (?, 'queued', NULL, ?)",
+                (file_id, now)
+            ),
+        ])
+    
+    async def mark_state(self, file_id: str, state: str, error: Optional[str] = None) -> bool:
+        """작업 상태 전이 기록 (재시도할 수 없는 종료 상태가 되면 단계 결과 삭제)"""
+        now = datetime.now().isoformat()
+        statements = [
+            ("UPDATE jobs SET state = ?, error = ?, updated_at = ? WHERE file_id = ?", (state, error, now, file_id)),
+            ("INSERT INTO job_events (file_id, state, stage, created_at) VALUES (?, ?, NULL, ?)", (file_id, state, now)),
+        ]
+        if state in TERMINAL_STATES and state not in RETRYABLE_STATES:
+            statements.append(("DELETE FROM stage_outputs WHERE file_id = ?", (file_id,)))
+        return await self._write(statements)
+    
+    async def complete_stage(self, file_id: str, stage: str, output: Any) -> bool:
+        """단계 완료와 그 결과 기록"""
+        now = datetime.now().isoformat()
+        payload = json.dumps(output, ensure_ascii=False)
+        return await self._write([
+            (
+                "INSERT OR REPLACE INTO stage_outputs (file_id, stage, payload, created_at) VALUES (?, ?, ?, ?)",
+                (file_id, stage, payload, now)
+            ),
+            ("UPDATE jobs SET last_stage = ?, updated_at = ? WHERE file_id = ?", (stage, now, file_id)),
+            (
+                "INSERT INTO job_events (file_id, state, stage, created_at) VALUES (?, 'stage_completed', ?, ?)",
+                (file_id, stage, now)
+            ),
+        ])
+    
+    async def record_stage_outcome(self, file_id: str, stage: str, outcome: str) -> bool:
+        """단계의 시간 초과/축소 실행 같은 결과 기록 (예: outcome="timeout" → state "stage_timeout")"""
+        now = datetime.now().isoformat()
+        return await self._write([
+            (
+                "INSERT INTO job_events (file_id, state, stage, created_at) VALUES (?, ?, ?, ?)",
+                (file_id, f"stage_{outcome}", stage, now)
+            ),
+        ])
+    
+    async def get_stage_output(self, file_id: str, stage: str) -> Optional[Any]:
+        """완료된 단계 결과 조회 (없으면 None)"""
+        rows = await self._read(
+            "SELECT payload FROM stage_outputs WHERE file_id = ? AND stage = ?",
+            (file_id, stage)
+        )
+        return json.loads(rows[0]["payload"]) if rows else None
+    
+    async def get_checkpointed_stages(self, file_id: str) -> List[str]:
+        """결과가 저장된 단계 목록 (완료 순)"""
+        rows = await self._read(
+            "SELECT stage FROM stage_outputs WHERE file_id = ? ORDER BY created_at",
+            (file_id,)
+        )
+        return [row["stage"] for row in rows]
+    
+    async def get_job(self, file_id: str) -> Optional[Dict]:
+        """작업 조회"""
+        rows = await self._read("SELECT * FROM jobs WHERE file_id = ?", (file_id,))
+        return dict(rows[0]) if rows else None
+    
+    async def get_interrupted_jobs(self) -> List[Dict]:
+        """재시작으로 중단된 작업 목록 (생성 순)"""
+        placeholders = ", ".join("?" for _ in INTERRUPTED_STATES)
+        rows = await self._read(
+            f"SELECT * FROM jobs WHERE state IN ({placeholders}) ORDER BY created_at",
+            INTERRUPTED_STATES
+        )
+        return [dict(row) for row in rows]
+    
+    async def purge_finished_jobs(self) -> int:
+        """보존 기간이 지난 종료 작업 삭제"""
+        cutoff = (datetime.now() - self.retention).isoformat()
+        placeholders = ", ".join("?" for _ in TERMINAL_STATES)
+        condition = f"state IN ({placeholders}) AND updated_at < ?"
+        params = (*TERMINAL_STATES, cutoff)
+        
+        expired = await self._read(f"SELECT file_id FROM jobs WHERE {condition}", params)
+        if not expired:
+            return 0
+        
+        file_ids = [row["file_id"] for row in expired]
+        id_placeholders = ", ".join("?" for _ in file_ids)
+        await self._write([
+            (f"DELETE FROM job_events WHERE file_id IN ({id_placeholders})", tuple(file_ids)),
+            (f"DELETE FROM stage_outputs WHERE file_id IN ({id_placeholders})", tuple(file_ids)),
+            (f"DELETE FROM jobs WHERE file_id IN ({id_placeholders})", tuple(file_ids)),
+        ])
+        return len(file_ids)
+    
+    async def start_cleanup_task(self):
+        """정리 작업 시작 (앱 시작 시 호출)"""
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._cleanup_finished_jobs())
+    
+    async def _cleanup_finished_jobs(self):
+        """종료된 작업 주기적 정리"""
+        while True:
+            try:
+                purged = await self.purge_finished_jobs()
+                if purged:
+                    logger.info(f"🧹 Purged {purged} finished jobs from job store")
+            except Exception as e:
+                logger.error(f"Error in job store cleanup task: {e}")
+            
+            # 1시간마다 정리
+            await asyncio.sleep(3600)
+
+
+# 전역 작업 저장소 인스턴스
+job_store = JobStore()
@@ -1,56 +1,162 @@
+import asyncio
+import re
 import pdfplumber
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from models.schemas import ProcessingResult, TableData
 from services.claude_integration import ClaudeIntegration
+from services.cancellation import CancellationToken
+from utils.amount_parser import try_parse_korean_amount
+from utils.date_parser import parse_statement_date
+
+# Receives the rows each extracted table adds: (table index, headers, new rows)
+RowSink = Callable[[int, List[str], List[List[str]]], None]
+
+
+def header_signature(row: List[str]) -> Tuple[str, ...]:
+    """Normalized header cells (case and whitespace ignored) identifying a logical table"""
+    return tuple(re.sub(r"\s+", "", cell).lower() for cell in row)
+
+
+def looks_like_header(row: List[str]) -> bool:
+    """A header row has some text and no cell that reads as a date or an amount"""
+    cells = [cell for cell in row if cell]
+    return bool(cells) and not any(
+        parse_statement_date(cell) is not None or try_parse_korean_amount(cell) is not None
+        for cell in cells
+    )
+
+
+class TableGrouper:
+    """
+    Group tables extracted page by page into logical tables
+    
+    A table whose first row is a header joins the earlier table with the
+    same header signature, so a statement table continued over many pages
+    (header repeated on each page) becomes one table while account sections
+    with different headers stay apart. A table starting with a data row
+    continues the most recent table of the same width. Header rows repeated
+    inside a table body are dropped. Tables are fed one at a time, so only
+    the grouped rows are kept, never the pages. Logical tables are numbered
+    in order of their first data row, which is also the order of tables().
+    """
+    
+    def __init__(self):
+        # header signature -> logical table, in order of first appearance
+        self._groups: Dict[Tuple[str, ...], TableData] = {}
+        # column count -> signature of the most recent table of that width
+        self._last_by_width: Dict[int, Tuple[str, ...]] = {}
+        # signature -> index among the tables that have data rows (order of first row)
+        self._indexes: Dict[Tuple[str, ...], int] = {}
+    
+    def add(self, table: List[List[Any]]) -> Optional[Tuple[int, List[str], List[List[str]]]]:
+        """
+        Add one extracted table (rows of raw cells)
+        
+        Returns:
+            (table index, headers, rows added) or None if no data rows were added
+        """
+        rows = [
+            [str(cell).strip() if cell else "" for cell in row]
+            for row in table
+            if any(cell and str(cell).strip() for cell in row)
+        ]
+        if not rows:
+            return None
+        
+        width = len(rows[0])
+        if looks_like_header(rows[0]):
+            signature = header_signature(rows[0])
+            if signature not in self._groups:
+                headers = [cell or f"Column {i+1}" for i, cell in enumerate(rows[0])]
+                self._groups[signature] = TableData.model_construct(headers=headers, rows=[])
+            rows = rows[1:]
+        else:
+            signature = self._last_by_width.get(width)
+            if signature is None:
+                # Data without any header seen at this width: a table of its own
+                signature = ("",) * width + (str(len(self._groups)),)
+                self._groups[signature] = TableData.model_construct(
+                    headers=[f"Column {i+1}" for i in range(width)],
+                    rows=[]
+                )
+        
+        group = self._groups[signature]
+        self._last_by_width[width] = signature
+        rows = [row for row in rows if header_signature(row) != signature]
+        if not rows:
+            return None
+        
+        index = self._indexes.setdefault(signature, len(self._indexes))
+        group.rows.extend(rows)
+        return index, group.headers, rows
+    
+    def tables(self) -> List[TableData]:
+        """Logical tables that have data rows, in order of their first data row"""
+        return [self._groups[signature] for signature in self._indexes]
+
 
 class PDFProcessor:
     def __init__(self):
         self.claude_integration = ClaudeIntegration()
     
-    async def process_basic(self, pdf_path: str) -> ProcessingResult:
+    async def process_basic(
+        self,
+        pdf_path: str,
+        token: Optional[CancellationToken] = None,
+        on_rows: Optional[RowSink] = None
+    ) -> ProcessingResult:
         """
         Basic PDF processing using pdfplumber to extract tables
+        
+        Runs in a worker thread so the event loop keeps serving other jobs
+        
+        Args:
+            on_rows: Called from the worker thread with the rows each page
+                table adds to its logical table, as pages are read
+        """
+        return await asyncio.to_thread(self._process_basic, pdf_path, token, on_rows)
+    
+    def _process_basic(
+        self,
+        pdf_path: str,
+        token: Optional[CancellationToken] = None,
+        on_rows: Optional[RowSink] = None
+    ) -> ProcessingResult:
+        """
+        Extract tables page by page, checking the cancellation token before every page
+        
+        Tables are grouped into logical tables by header signature as pages
+        are read (see TableGrouper). The result's data is the largest table;
+        tables holds all of them in order of their first data row.
         """
         try:
-            tables_data = []
+            grouper = TableGrouper()
             
             with pdfplumber.open(pdf_path) as pdf:
-                for page_num, page in enumerate(pdf.pages):
-                    # Extract tables from the page
-                    tables = page.extract_tables()
+                for page in pdf.pages:
+                    if token is not None:
+                        token.raise_if_cancelled()
                     
-                    for table in tables:
-                        if table and len(table) > 1:  # Ensure table has data
-                            # Clean and filter empty rows
-                            cleaned_table = []
-                            for row in table:
-                                if any(cell and str(cell).strip() for cell in row):
-                                    cleaned_row = [str(cell).strip() if cell else "" for cell in row]
-                                    cleaned_table.append(cleaned_row)
-                            
-                            if cleaned_table:
-                                tables_data.extend(cleaned_table)
+                    # Single-row tables are kept too: a table split across a page
+                    # break can leave one data row on either side
+                    for table in page.extract_tables():
+                        if table:
+                            added = grouper.add(table)
+                            if added and on_rows is not None:
+                                on_rows(*added)
             
-            if not tables_data:
+            tables = grouper.tables()
+            if not tables:
                 return ProcessingResult(
                     success=False,
                     error="No tables found in PDF"
                 )
             
-            # Use first row as headers, rest as data
-            headers = tables_data[0] if tables_data else []
-            rows = tables_data[1:] if len(tables_data) > 1 else []
-            
-            # Clean headers
-            headers = [str(h).strip() for h in headers if h]
-            if not headers:
-                headers = [f"Column {i+1}" for i in range(len(rows[0]) if rows else 0)]
-            
-            table_data = TableData(headers=headers, rows=rows)
-            
-            return ProcessingResult(
+            # Tables built here need no validation; skipping it also avoids copying every row
+            return ProcessingResult.model_construct(
                 success=True,
-                data=table_data
+                data=max(tables, key=lambda table: len(table.rows)),
+                tables=tables
             )
             
         except Exception as e:
@@ -84,20 +190,27 @@ class PDFProcessor:
                 error=f"AI processing failed: {str(e)}"
             )
     
-    async def extract_text(self, pdf_path: str) -> str:
+    async def extract_text(self, pdf_path: str, token: Optional[CancellationToken] = None) -> str:
         """
         Extract all text content from PDF (public async method)
+        
+        Runs in a worker thread so the event loop keeps serving other jobs
         """
-        return self._extract_text(pdf_path)
+        return await asyncio.to_thread(self._extract_text, pdf_path, token)
     
-    def _extract_text(self, pdf_path: str) -> str:
+    def _extract_text(self, pdf_path: str, token: Optional[CancellationToken] = None) -> str:
         """
         Extract all text content from PDF
+        
+        The cancellation token is checked before every page, so a cancelled
+        job stops after at most one more page
         """
         text_content = ""
         
         with pdfplumber.open(pdf_path) as pdf:
             for page in pdf.pages:
+                if token is not None:
+                    token.raise_if_cancelled()
                 page_text = page.extract_text()
                 if page_text:
                     text_content += page_text + "\n"
@@ -0,0 +1,238 @@
+"""
+변환 파이프라인 엔진
+단계를 선언적으로 정의하고 취소 확인, 진행률 보고, 단계별 동시성 제한,
+단계 결과 체크포인트, 단계별 제한 시간과 작업 전체 시간 예산을 한곳에서 처리
+"""
+import asyncio
+import dataclasses
+import logging
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from .cancellation import CancellationToken
+from .job_scheduler import job_scheduler
+from .job_store import job_store
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JobContext:
+    """파이프라인 실행 중 단계 사이에 전달되는 작업 정보"""
+    file_id: str
+    file_path: str
+    use_ai: bool
+    report: Callable[..., Awaitable[None]]
+    token: CancellationToken
+    # 작업 전체 마감 시각 (time.monotonic 기준, None이면 제한 없음)
+    deadline: Optional[float] = None
+    # 단계 이름 → 단계 결과
+    outputs: Dict[str, Any] = field(default_factory=dict)
+    # 단계 이름 → {"outcome": ok/restored/degraded/timeout, "seconds": 소요 시간}
+    stage_outcomes: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    
+    def remaining(self) -> Optional[float]:
+        """남은 시간 예산 (초, 제한이 없으면 None)"""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+
+class StageTimeoutError(Exception):
+    """단계 제한 시간 또는 작업 시간 예산 초과"""
+    
+    def __init__(self, stage: str, seconds: float):
+        self.stage = stage
+        self.seconds = seconds
+        super().__init__(f"'{stage}' 단계가 제한 시간({round(seconds, 1):g}초)을 초과했습니다.")
+
+
+# 문자열 또는 작업 정보에 따라 값을 정하는 함수
+ContextValue = Union[str, None, Callable[[JobContext], Optional[str]]]
+
+
+@dataclass
+class PipelineStage:
+    """
+    파이프라인 단계 선언
+    
+    Attributes:
+        name: 단계 이름 (결과는 context.outputs[name]에 저장)
+        run: 단계 실행 함수
+        status: 단계 시작 시 보고할 상태
+        message: 단계 시작 시 보고할 메시지
+        weight: 전체 진행률에서 이 단계가 차지하는 비중
+        concurrency: job_scheduler 단계 동시성 키 (None이면 제한 없음)
+        checkpoint: 결과를 작업 저장소에 기록하고 복구 시 재사용할지 여부
+        done_message: 단계 완료 시 보고할 메시지 (None이면 보고하지 않음)
+        reuse_if: 체크포인트 결과를 재사용해도 되는지 확인하는 함수 (예: 파일 존재 여부)
+        timeout: 단계 제한 시간 (초, None이면 작업 시간 예산만 적용)
+        fallback: 시간이 부족하거나 제한 시간을 넘겼을 때 대신 실행할 가벼운 함수
+        fallback_if: fallback을 쓸 수 있는 작업인지 확인하는 함수 (None이면 항상)
+        degrade_below: 남은 예산이 이 값(초)보다 적으면 처음부터 fallback 실행
+    """
+    name: str
+    run: Callable[[JobContext], Awaitable[Any]]
+    status: str
+    message: ContextValue
+    weight: int = 1
+    concurrency: ContextValue = None
+    checkpoint: bool = False
+    done_message: ContextValue = None
+    reuse_if: Optional[Callable[[Any], bool]] = None
+    timeout: Optional[float] = None
+    fallback: Optional[Callable[[JobContext], Awaitable[Any]]] = None
+    fallback_if: Optional[Callable[[JobContext], bool]] = None
+    degrade_below: Optional[float] = None
+
+
+def _resolve(value: ContextValue, context: JobContext) -> Optional[str]:
+    return value(context) if callable(value) else value
+
+
+class Pipeline:
+    def __init__(self, stages: List[PipelineStage]):
+        self.stages = stages
+        total_weight = sum(stage.weight for stage in stages) or 1
+        
+        # 단계별 시작/완료 진행률 (0~95, 100은 완료 처리에서 보고)
+        self._progress: Dict[str, tuple] = {}
+        accumulated = 0
+        for stage in stages:
+            start = accumulated * 95 // total_weight
+            accumulated += stage.weight
+            self._progress[stage.name] = (start, accumulated * 95 // total_weight)
+    
+    def stage_progress(self, name: str) -> tuple:
+        """단계의 (시작, 완료) 진행률"""
+        return self._progress[name]
+    
+    async def run(self, context: JobContext) -> Dict[str, Any]:
+        """
+        모든 단계를 순서대로 실행
+        
+        단계 사이마다 취소 여부를 확인하며, 동시성 키가 있는 단계는
+        job_scheduler의 단계 세마포어 안에서 실행되어 서로 다른 작업의
+        CPU 단계와 네트워크 단계가 겹쳐 실행될 수 있다.
+        
+        Returns:
+            단계 이름 → 단계 결과
+        """
+        await context.report(status="starting", progress=0, message="변환을 시작합니다...")
+        
+        for stage in self.stages:
+            self._check_cancelled(context)
+            start_progress, done_progress = self._progress[stage.name]
+            
+            # 재시작 후 복구된 작업이면 이미 완료된 단계 결과를 재사용
+            if stage.checkpoint:
+                saved = await job_store.get_stage_output(context.file_id, stage.name)
+                if saved is not None and (stage.reuse_if is None or stage.reuse_if(saved)):
+                    context.outputs[stage.name] = saved
+                    context.stage_outcomes[stage.name] = {"outcome": "restored", "seconds": 0.0}
+                    logger.info(f"⏭️ Stage '{stage.name}' restored from checkpoint for {context.file_id}")
+                    continue
+            
+            await context.report(
+                status=stage.status,
+                progress=start_progress,
+                message=_resolve(stage.message, context)
+            )
+            
+            concurrency_key = _resolve(stage.concurrency, context)
+            limiter = job_scheduler.stage(concurrency_key) if concurrency_key else nullcontext()
+            async with limiter:
+                self._check_cancelled(context)
+                output = await self._run_stage(stage, context)
+            
+            context.outputs[stage.name] = output
+            if stage.checkpoint:
+                await job_store.complete_stage(context.file_id, stage.name, output)
+            
+            done_message = _resolve(stage.done_message, context)
+            if done_message:
+                await context.report(status=stage.status, progress=done_progress, message=done_message)
+        
+        self._check_cancelled(context)
+        return context.outputs
+    
+    async def _run_stage(self, stage: PipelineStage, context: JobContext) -> Any:
+        """
+        제한 시간 안에서 단계 실행
+        
+        남은 예산이 degrade_below보다 적거나 제한 시간을 넘기면 fallback이 있는 단계는
+        fallback으로 대신하고, 없으면 StageTimeoutError로 작업을 끝낸다.
+        """
+        started_at = time.monotonic()
+        remaining = context.remaining()
+        can_degrade = stage.fallback is not None and (stage.fallback_if is None or stage.fallback_if(context))
+        
+        if can_degrade and stage.degrade_below is not None and remaining is not None \
+                and remaining < stage.degrade_below:
+            logger.warning(f"⏬ Stage '{stage.name}' degraded for {context.file_id}: {remaining:.1f}s budget left")
+            return await self._run_fallback(stage, context, started_at)
+        
+        try:
+            output = await self._run_with_deadline(stage.run, stage, context, self._stage_timeout(stage, context))
+        except StageTimeoutError:
+            await job_store.record_stage_outcome(context.file_id, stage.name, "timeout")
+            if not can_degrade or self._budget_exhausted(context):
+                context.stage_outcomes[stage.name] = {"outcome": "timeout", "seconds": round(time.monotonic() - started_at, 3)}
+                raise
+            logger.warning(f"⏬ Stage '{stage.name}' timed out for {context.file_id}, running fallback")
+            return await self._run_fallback(stage, context, started_at)
+        
+        context.stage_outcomes[stage.name] = {"outcome": "ok", "seconds": round(time.monotonic() - started_at, 3)}
+        return output
+    
+    async def _run_fallback(self, stage: PipelineStage, context: JobContext, started_at: float) -> Any:
+        await job_store.record_stage_outcome(context.file_id, stage.name, "degraded")
+        try:
+            output = await self._run_with_deadline(stage.fallback, stage, context, context.remaining())
+        except StageTimeoutError:
+            context.stage_outcomes[stage.name] = {"outcome": "timeout", "seconds": round(time.monotonic() - started_at, 3)}
+            raise
+        context.stage_outcomes[stage.name] = {"outcome": "degraded", "seconds": round(time.monotonic() - started_at, 3)}
+        return output
+    
+    async def _run_with_deadline(
+        self,
+        run: Callable[[JobContext], Awaitable[Any]],
+        stage: PipelineStage,
+        context: JobContext,
+        timeout: Optional[float]
+    ) -> Any:
+        """
+        제한 시간을 넘기면 단계를 중단하고 StageTimeoutError 발생
+        
+        단계에는 작업 토큰에 연결된 단계 전용 토큰을 넘겨, 시간 초과 시 스레드에서 도는
+        페이지 추출 루프까지 멈추되 작업 자체가 사용자 취소로 처리되지 않게 한다.
+        """
+        if timeout is None:
+            return await run(context)
+        if timeout <= 0:
+            raise StageTimeoutError(stage.name, 0)
+        
+        stage_token = CancellationToken()
+        unregister = context.token.add_callback(stage_token.cancel)
+        try:
+            return await asyncio.wait_for(run(dataclasses.replace(context, token=stage_token)), timeout)
+        except asyncio.TimeoutError:
+            stage_token.cancel()
+            raise StageTimeoutError(stage.name, timeout)
+        finally:
+            unregister()
+    
+    def _stage_timeout(self, stage: PipelineStage, context: JobContext) -> Optional[float]:
+        """단계 제한 시간과 남은 작업 예산 중 작은 값"""
+        limits = [limit for limit in (stage.timeout, context.remaining()) if limit is not None]
+        return min(limits) if limits else None
+    
+    def _budget_exhausted(self, context: JobContext) -> bool:
+        remaining = context.remaining()
+        return remaining is not None and remaining <= 0
+    
+    def _check_cancelled(self, context: JobContext):
+        context.token.raise_if_cancelled()
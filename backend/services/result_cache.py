@@ -0,0 +1,171 @@
+"""
+변환 결과 메모리 캐시
+작은 Excel 결과를 디스크에 쓰지 않고 메모리(LRU, 전체 크기 제한)에 보관하여 다운로드에 바로 제공하고,
+크기 한도를 넘는 결과나 캐시에서 밀려나는 결과만 디스크에 기록
+
+결과는 기존과 같은 경로 문자열(temp_files/{file_id}.xlsx)로 식별하므로
+경로를 다루는 코드는 os.path 대신 이 캐시의 exists/size/discard를 사용한다.
+"""
+import os
+import threading
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    def __init__(self):
+        # 캐시 전체 크기 한도 (0이면 사용 안 함)
+        self.max_bytes = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        # 이보다 큰 결과는 바로 디스크에 기록
+        self.spill_bytes = int(os.getenv("RESULT_CACHE_SPILL_BYTES", str(4 * 1024 * 1024)))
+        # 경로 → Excel 내용 (오래 안 쓴 순서)
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        # Excel 생성은 스레드에서 실행되므로 잠금으로 보호
+        self._lock = threading.Lock()
+        self.stats = {"stored": 0, "hits": 0, "misses": 0, "spilled": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def put(self, path: str, data: bytes) -> bool:
+        """
+        결과 저장 (크기 한도를 넘으면 디스크에 기록)
+
+        Returns:
+            메모리에 보관했으면 True
+        """
+        if not self.enabled or len(data) > self.spill_bytes:
+            self._write_file(path, data)
+            with self._lock:
+                previous = self._entries.pop(path, None)
+                if previous is not None:
+                    self._size -= len(previous)
+            self.stats["spilled"] += 1
+            return False
+
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[path] = data
+            self._size += len(data)
+            self.stats["stored"] += 1
+
+            # 오래 안 쓴 결과부터 한도 안으로 들어올 때까지 밀어냄
+            evicted, excess = [], self._size - self.max_bytes
+            for evicted_path, evicted_data in self._entries.items():
+                if excess <= 0 or evicted_path == path:
+                    break
+                evicted.append((evicted_path, evicted_data))
+                excess -= len(evicted_data)
+
+        # 같은 경로의 예전 파일이 캐시 내용을 가리지 않도록 삭제
+        if os.path.exists(path):
+            os.remove(path)
+
+        # 밀려난 결과는 버리지 않고 디스크에 기록한 뒤 메모리에서 제거
+        # (기록하는 동안에도 메모리에서 계속 제공되도록 순서를 지킴)
+        for evicted_path, evicted_data in evicted:
+            self._move_to_disk(evicted_path, evicted_data)
+            logger.info(f"💾 Result spilled to disk: {evicted_path}")
+        return True
+
+    def get(self, path: str) -> Optional[bytes]:
+        """메모리에 있는 결과 조회 (없으면 None, 디스크 파일은 호출자가 직접 제공)"""
+        with self._lock:
+            data = self._entries.get(path)
+            if data is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(path)
+            self.stats["hits"] += 1
+            return data
+
+    def exists(self, path: Optional[str]) -> bool:
+        """메모리 또는 디스크에 결과가 있는지 확인"""
+        if not path:
+            return False
+        with self._lock:
+            if path in self._entries:
+                return True
+        return os.path.exists(path)
+
+    def size(self, path: str) -> int:
+        """결과 크기 (없으면 0)"""
+        with self._lock:
+            data = self._entries.get(path)
+        if data is not None:
+            return len(data)
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    def discard(self, path: Optional[str]) -> bool:
+        """
+        결과 삭제 (메모리와 디스크 모두)
+
+        Returns:
+            삭제한 결과가 있었으면 True
+        """
+        if not path:
+            return False
+        with self._lock:
+            data = self._entries.pop(path, None)
+            if data is not None:
+                self._size -= len(data)
+        removed = data is not None
+        if os.path.exists(path):
+            os.remove(path)
+            removed = True
+        return removed
+
+    def ensure_on_disk(self, path: str) -> str:
+        """
+        파일 경로가 필요한 작업(ZIP/시트 합치기)을 위해 메모리 결과를 디스크에 기록
+
+        Returns:
+            디스크의 결과 경로
+        """
+        with self._lock:
+            data = self._entries.get(path)
+        if data is not None:
+            self._move_to_disk(path, data)
+        return path
+
+    def _move_to_disk(self, path: str, data: bytes):
+        self._write_file(path, data)
+        with self._lock:
+            # 기록하는 동안 같은 경로에 새 결과가 들어왔으면 그대로 둔다
+            if self._entries.get(path) is data:
+                del self._entries[path]
+                self._size -= len(data)
+        self.stats["spilled"] += 1
+
+    def _write_file(self, path: str, data: bytes):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        partial_path = f"{path}.part"
+        with open(partial_path, "wb") as f:
+            f.write(data)
+        os.replace(partial_path, path)
+
+    def get_stats(self) -> dict:
+        """캐시 통계"""
+        with self._lock:
+            entries, size = len(self._entries), self._size
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "spill_bytes": self.spill_bytes,
+            **self.stats
+        }
+
+
+# 전역 결과 캐시 인스턴스
+result_cache = ResultCache()
@@ -0,0 +1,137 @@
+"""
+변환 결과 중복 제거 인덱스
+업로드된 PDF 내용의 해시와 처리 방식으로 완료된 변환 결과를 찾아 재사용하고,
+여러 file_id가 같은 Excel 파일을 공유할 때 참조 수를 관리
+"""
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Set
+
+from models.columnar import ColumnarTable
+from .result_cache import result_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StoredResult:
+    """재사용 가능한 변환 결과"""
+    excel_path: str
+    file_size: Optional[int]
+    preview_data: Optional[ColumnarTable]
+    # 거래 요약 (statement_summary)
+    summary: Optional[Dict[str, Any]] = None
+    # 이 결과를 가리키는 file_id들 (참조 수)
+    file_ids: Set[str] = field(default_factory=set)
+
+
+def compute_content_hash(content: bytes) -> str:
+    """업로드 내용의 SHA-256 해시"""
+    return hashlib.sha256(content).hexdigest()
+
+
+class ResultIndex:
+    def __init__(self):
+        # (내용 해시, 처리 방식) → 변환 결과
+        self._results: Dict[tuple, StoredResult] = {}
+        # file_id → 참조 중인 결과 키
+        self._file_keys: Dict[str, tuple] = {}
+        # Excel 파일 경로 → 결과 키
+        self._path_keys: Dict[str, tuple] = {}
+        self.stats = {"hits": 0, "misses": 0}
+
+    def lookup(self, content_hash: str, processing_type: str) -> Optional[StoredResult]:
+        """같은 내용/처리 방식의 완료된 결과 조회 (파일이 사라졌으면 항목 제거)"""
+        key = (content_hash, processing_type)
+        result = self._results.get(key)
+
+        if result and not result_cache.exists(result.excel_path):
+            # 주기 정리 작업이 파일을 지운 경우
+            self._drop(key)
+            result = None
+
+        if result:
+            self.stats["hits"] += 1
+        else:
+            self.stats["misses"] += 1
+        return result
+
+    def publish(
+        self,
+        content_hash: str,
+        processing_type: str,
+        file_id: str,
+        excel_path: str,
+        file_size: Optional[int],
+        preview_data: Optional[ColumnarTable],
+        summary: Optional[Dict[str, Any]] = None
+    ):
+        """변환이 끝난 결과를 재사용 가능하도록 등록"""
+        key = (content_hash, processing_type)
+        if key in self._results:
+            # 같은 내용이 동시에 변환된 경우 먼저 등록된 결과를 유지한다
+            return
+
+        self._results[key] = StoredResult(
+            excel_path=excel_path,
+            file_size=file_size,
+            preview_data=preview_data,
+            summary=summary,
+            file_ids={file_id}
+        )
+        self._file_keys[file_id] = key
+        self._path_keys[excel_path] = key
+
+    def attach(self, content_hash: str, processing_type: str, file_id: str):
+        """새 file_id를 기존 결과에 연결 (참조 수 증가)"""
+        key = (content_hash, processing_type)
+        self._results[key].file_ids.add(file_id)
+        self._file_keys[file_id] = key
+        logger.info(f"♻️ Reusing conversion result for {file_id} ({len(self._results[key].file_ids)} references)")
+
+    def release(self, file_id: str, excel_path: Optional[str] = None) -> bool:
+        """
+        file_id의 참조 해제
+
+        Args:
+            excel_path: file_id가 가리키던 Excel 파일 (이미 참조가 해제된 file_id 확인용)
+
+        Returns:
+            Excel 파일을 삭제해도 되면 True (공유하는 다른 file_id가 남아 있으면 False)
+        """
+        key = self._file_keys.pop(file_id, None)
+        if key is None:
+            # 이미 해제된 file_id라도 파일이 아직 공유 중이면 지우지 않는다
+            return excel_path is None or excel_path not in self._path_keys
+
+        result = self._results.get(key)
+        if result is None:
+            return True
+
+        result.file_ids.discard(file_id)
+        if result.file_ids:
+            return False
+
+        self._drop(key)
+        return True
+
+    def _drop(self, key: tuple):
+        result = self._results.pop(key, None)
+        if result:
+            self._path_keys.pop(result.excel_path, None)
+            for file_id in result.file_ids:
+                self._file_keys.pop(file_id, None)
+
+    def get_stats(self) -> dict:
+        """중복 제거 통계"""
+        return {
+            "stored_results": len(self._results),
+            "shared_references": len(self._file_keys),
+            "hits": self.stats["hits"],
+            "misses": self.stats["misses"]
+        }
+
+
+# 전역 결과 인덱스 인스턴스
+result_index = ResultIndex()
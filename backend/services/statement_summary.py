@@ -0,0 +1,284 @@
+"""
+거래 요약 서비스
+변환된 거래 표에서 월별 입출금, 잔액 검증, 주요 거래처와 합계를 계산
+
+날짜/금액 열은 Excel 생성과 같은 규칙(infer_column_types, 공용 날짜/금액 파서)으로 찾고,
+행을 한 번만 훑으므로 행 수에 비례하는 시간과 거래처/월 수에 비례하는 메모리만 사용한다.
+"""
+import heapq
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+from .excel_generator import ExcelGenerator, infer_column_types, COLUMN_AMOUNT, COLUMN_DATE, COLUMN_TEXT
+from utils.amount_parser import try_parse_korean_amount
+from utils.date_parser import parse_statement_date
+
+# 헤더 키워드로 열 역할 판별 (앞의 역할이 우선)
+# 금액 역할은 표본 행에서 금액 열로 추론된 열에만 부여한다
+_ROLE_KEYWORDS = (
+    ("balance", ("잔액", "잔고", "balance")),
+    ("inflow", ("입금", "맡기신", "받은금액", "deposit", "credit")),
+    ("outflow", ("출금", "찾으신", "지급", "withdrawal", "debit")),
+    ("amount", ("금액", "amount")),
+    ("counterparty", ("거래처", "가맹점", "받는분", "보낸분", "적요", "내용", "내역", "merchant", "payee", "description", "memo")),
+    ("date", ("날짜", "일자", "일시", "date")),
+)
+_MONEY_ROLES = {"balance", "inflow", "outflow", "amount"}
+
+# 사람/기관 이름 열 헤더 (입금자명, 보낸자, 출금처 등): 금액 키워드를 포함해도 거래처로 본다
+_NAME_HEADER = re.compile(r"(자|처)명?$|자명")
+
+# 주요 거래처 수
+TOP_COUNTERPARTIES = 5
+
+# 잔액 검증 허용 오차 (원 단위 반올림)
+BALANCE_TOLERANCE = 0.5
+
+# 잔액이 맞지 않는 행 번호를 몇 개까지 기록할지
+MAX_MISMATCH_ROWS = 5
+
+
+def _detect_columns(headers: List[str], sample: Sequence[Sequence[Any]]) -> Dict[str, int]:
+    """헤더 키워드와 열 종류로 역할별 열 위치 결정"""
+    kinds = infer_column_types(sample, len(headers))
+    # 표본에서 모두 비어 있는 열(예: 입금이 없던 기간의 입금 열)은 종류를 알 수 없으므로 금액 열로 허용
+    empty = [
+        not any(value is not None and str(value).strip() for value in (_cell(row, col) for row in sample))
+        for col in range(len(headers))
+    ]
+    money = [kind == COLUMN_AMOUNT or is_empty for kind, is_empty in zip(kinds, empty)]
+    columns: Dict[str, int] = {}
+    for col, header in enumerate(headers):
+        name = str(header).replace(" ", "").lower()
+        is_name = bool(_NAME_HEADER.search(name))
+        for role, keywords in _ROLE_KEYWORDS:
+            if not any(keyword in name for keyword in keywords):
+                continue
+            if role in _MONEY_ROLES and (not money[col] or is_name):
+                # 예: "입금자명"은 입금 키워드가 있어도 금액 열이 아니다
+                continue
+            if role not in columns:
+                columns[role] = col
+            break
+        else:
+            if is_name and "counterparty" not in columns:
+                columns["counterparty"] = col
+
+    assigned = set(columns.values())
+    if "date" not in columns and COLUMN_DATE in kinds:
+        columns["date"] = kinds.index(COLUMN_DATE)
+    # 역할을 알 수 없는 금액 열은 부호 있는 거래 금액으로 본다
+    if not {"inflow", "outflow", "amount"} & columns.keys():
+        for col, kind in enumerate(kinds):
+            if kind == COLUMN_AMOUNT and col not in assigned:
+                columns["amount"] = col
+                break
+    if "counterparty" not in columns:
+        for col, kind in enumerate(kinds):
+            if kind == COLUMN_TEXT and col not in assigned and col != columns.get("date"):
+                columns["counterparty"] = col
+                break
+    return columns
+
+
+def _cell(row: Sequence[Any], col: Optional[int]) -> Any:
+    return row[col] if col is not None and col < len(row) else None
+
+
+def _amount(row: Sequence[Any], col: Optional[int]) -> Optional[float]:
+    value = _cell(row, col)
+    return try_parse_korean_amount(value) if value not in (None, "") else None
+
+
+class StatementSummarizer:
+    """
+    행 묶음을 받는 대로 누적하는 거래 요약
+
+    열 역할은 앞쪽 type_sample_rows개 행으로 정하므로 그만큼 모일 때까지는 행을 보관했다가
+    한꺼번에 처리한다. 스트리밍 Excel 생성처럼 표 전체가 한 번에 주어지지 않는 경우에 사용.
+    """
+
+    def __init__(self, headers: List[str]):
+        self.headers = headers
+        self.columns: Optional[Dict[str, int]] = None
+        self._pending: List[Sequence[Any]] = []
+        self._row_number = 0
+
+        self.total_inflow = self.total_outflow = 0.0
+        self.transactions = 0
+        self.first_date = self.last_date = None
+        self.monthly: Dict[str, List[float]] = {}
+        self.counterparties: Dict[str, List[float]] = {}
+
+        # 잔액 검증: 오래된 거래가 먼저 나오는 순서와 최근 거래가 먼저 나오는 순서를 함께 검사
+        self._previous = None  # (잔액, 입금, 출금)
+        self.checked = 0
+        self.mismatches = {"ascending": [], "descending": []}
+        self.mismatch_counts = {"ascending": 0, "descending": 0}
+        self._first_balance_row = self._last_balance_row = None  # (잔액, 입금, 출금)
+
+    def add(self, rows: Sequence[Sequence[Any]]):
+        """행 묶음 추가"""
+        if self.columns is None:
+            self._pending.extend(rows)
+            if len(self._pending) < ExcelGenerator.type_sample_rows:
+                return
+            self._start()
+            return
+        self._add(rows)
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """
+        요약 결과
+
+        Returns:
+            합계, 월별 입출금, 잔액 검증, 주요 거래처 (입출금 금액 열을 찾지 못하면 None)
+        """
+        if self.columns is None:
+            self._start()
+        if not {"inflow", "outflow", "amount"} & self.columns.keys():
+            return None
+
+        balance_check = None
+        if self._first_balance_row is not None:
+            counts = self.mismatch_counts
+            order = "descending" if counts["descending"] < counts["ascending"] else "ascending"
+            earliest, latest = self._first_balance_row, self._last_balance_row
+            if order == "descending":
+                earliest, latest = latest, earliest
+            balance_check = {
+                "order": order,
+                "checked": self.checked,
+                "mismatches": counts[order],
+                "mismatch_rows": self.mismatches[order],
+                # 첫 거래 직전 잔액과 마지막 거래 후 잔액
+                "opening_balance": round(earliest[0] - earliest[1] + earliest[2], 2),
+                "closing_balance": round(latest[0], 2),
+            }
+
+        top = heapq.nlargest(
+            TOP_COUNTERPARTIES,
+            self.counterparties.items(),
+            key=lambda item: item[1][0] + item[1][1]
+        )
+
+        return {
+            "columns": {role: self.headers[col] for role, col in self.columns.items()},
+            "transactions": self.transactions,
+            "total_inflow": round(self.total_inflow, 2),
+            "total_outflow": round(self.total_outflow, 2),
+            "net": round(self.total_inflow - self.total_outflow, 2),
+            "period": {
+                "start": self.first_date.date().isoformat(),
+                "end": self.last_date.date().isoformat()
+            } if self.first_date else None,
+            "monthly": [
+                {
+                    "month": month,
+                    "inflow": round(inflow, 2),
+                    "outflow": round(outflow, 2),
+                    "net": round(inflow - outflow, 2),
+                    "count": count
+                }
+                for month, (inflow, outflow, count) in sorted(self.monthly.items())
+            ],
+            "balance_check": balance_check,
+            "top_counterparties": [
+                {"name": name, "inflow": round(inflow, 2), "outflow": round(outflow, 2), "count": count}
+                for name, (inflow, outflow, count) in top
+            ],
+        }
+
+    def _start(self):
+        """모인 앞쪽 행으로 열 역할을 정하고 보관한 행 처리"""
+        pending, self._pending = self._pending, []
+        self.columns = _detect_columns(self.headers, pending[:ExcelGenerator.type_sample_rows])
+        self._add(pending)
+
+    def _add(self, rows: Sequence[Sequence[Any]]):
+        columns = self.columns
+        if not {"inflow", "outflow", "amount"} & columns.keys():
+            return
+
+        date_col = columns.get("date")
+        inflow_col, outflow_col, amount_col = columns.get("inflow"), columns.get("outflow"), columns.get("amount")
+        balance_col, counterparty_col = columns.get("balance"), columns.get("counterparty")
+        monthly, counterparties = self.monthly, self.counterparties
+        mismatches, mismatch_counts = self.mismatches, self.mismatch_counts
+        previous = self._previous
+
+        for row_number, row in enumerate(rows, start=self._row_number + 1):
+            inflow = _amount(row, inflow_col) or 0.0
+            outflow = _amount(row, outflow_col) or 0.0
+            if amount_col is not None:
+                amount = _amount(row, amount_col) or 0.0
+                if amount >= 0:
+                    inflow += amount
+                else:
+                    outflow -= amount
+            inflow, outflow = abs(inflow), abs(outflow)
+
+            if inflow or outflow:
+                self.transactions += 1
+                self.total_inflow += inflow
+                self.total_outflow += outflow
+
+                date = parse_statement_date(_cell(row, date_col))
+                if date is not None:
+                    if self.first_date is None or date < self.first_date:
+                        self.first_date = date
+                    if self.last_date is None or date > self.last_date:
+                        self.last_date = date
+                    month = monthly.setdefault(date.strftime("%Y-%m"), [0.0, 0.0, 0])
+                    month[0] += inflow
+                    month[1] += outflow
+                    month[2] += 1
+
+                name = str(_cell(row, counterparty_col) or "").strip()
+                if name:
+                    entry = counterparties.setdefault(name, [0.0, 0.0, 0])
+                    entry[0] += inflow
+                    entry[1] += outflow
+                    entry[2] += 1
+
+            balance = _amount(row, balance_col)
+            if balance is None:
+                # 잔액이 없는 행 다음부터 다시 이어서 검사
+                previous = None
+                continue
+            current = (balance, inflow, outflow)
+            if self._first_balance_row is None:
+                self._first_balance_row = current
+            self._last_balance_row = current
+            if previous is not None:
+                self.checked += 1
+                prev_balance, prev_inflow, prev_outflow = previous
+                checks = (
+                    ("ascending", prev_balance + inflow - outflow - balance),
+                    ("descending", balance + prev_inflow - prev_outflow - prev_balance),
+                )
+                for order, difference in checks:
+                    if abs(difference) > BALANCE_TOLERANCE:
+                        mismatch_counts[order] += 1
+                        if len(mismatches[order]) < MAX_MISMATCH_ROWS:
+                            mismatches[order].append(row_number)
+            previous = current
+
+        self._previous = previous
+        self._row_number += len(rows)
+
+
+def summarize_table(headers: List[str], rows: Sequence[Sequence[Any]]) -> Optional[Dict[str, Any]]:
+    """
+    거래 표 요약 (행을 한 번만 훑음)
+
+    Args:
+        headers: 열 헤더
+        rows: 거래 행
+
+    Returns:
+        합계, 월별 입출금, 잔액 검증, 주요 거래처 (입출금 금액 열을 찾지 못하면 None)
+    """
+    summarizer = StatementSummarizer(headers)
+    summarizer.add(rows)
+    return summarizer.result()
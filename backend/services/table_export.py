@@ -0,0 +1,242 @@
+"""
+변환 결과 내보내기
+분석된 표를 열 단위의 중립 형식(JSON)으로 한 번 저장해 두고,
+다운로드 요청이 오면 CSV / JSON Lines / Parquet / Excel 중 요청한 형식을 처음 한 번만 만들어 캐시
+
+모든 파일은 Excel 결과 경로를 기준으로 이름을 정한다 (temp_files/{file_id}.xlsx →
+temp_files/{file_id}.table.json, temp_files/{file_id}.csv ...).
+중복 제거로 여러 file_id가 같은 Excel을 공유하면 내보내기 결과도 함께 공유된다.
+"""
+import csv
+import io
+import json
+import os
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from .excel_generator import ExcelGenerator, infer_column_types, COLUMN_AMOUNT, COLUMN_DATE
+from .result_cache import result_cache
+from models.columnar import ColumnarTable
+from utils.amount_parser import try_parse_korean_amount
+from utils.date_parser import parse_statement_date
+
+# pyarrow가 설치되어 있으면 Parquet 내보내기 지원 (선택적 의존성)
+try:
+    import pyarrow
+    import pyarrow.parquet
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pyarrow = None
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+FORMAT_XLSX = "xlsx"
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMAT_PARQUET = "parquet"
+
+# 형식 → (확장자, media type)
+EXPORT_FORMATS = {
+    FORMAT_XLSX: ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    FORMAT_CSV: ("csv", "text/csv; charset=utf-8"),
+    FORMAT_JSONL: ("jsonl", "application/x-ndjson"),
+    FORMAT_PARQUET: ("parquet", "application/vnd.apache.parquet"),
+}
+
+TABLE_SUFFIX = ".table.json"
+
+
+class ExportUnavailableError(Exception):
+    """요청한 형식을 만들 수 없음 (선택적 의존성 미설치)"""
+
+
+def table_path_for(excel_path: str) -> str:
+    """Excel 결과에 대응하는 열 단위 표 파일 경로"""
+    return os.path.splitext(excel_path)[0] + TABLE_SUFFIX
+
+
+def export_path_for(excel_path: str, export_format: str) -> str:
+    """Excel 결과에 대응하는 내보내기 파일 경로"""
+    extension, _ = EXPORT_FORMATS[export_format]
+    return f"{os.path.splitext(excel_path)[0]}.{extension}"
+
+
+class TableExporter:
+    def __init__(self):
+        self.excel_generator = ExcelGenerator()
+        self.stats = {"tables": 0, "rendered": 0, "reused": 0}
+
+    def save_table(
+        self,
+        excel_path: str,
+        tables: Sequence[ColumnarTable],
+        primary: int = 0,
+        summary: Optional[Dict[str, Any]] = None
+    ):
+        """
+        표를 열 단위 형식으로 저장 (Excel 생성 직후 한 번)
+
+        열 종류(date/amount/text)는 Excel과 같은 방식으로 앞쪽 행에서 추론해 함께 저장한다.
+
+        Args:
+            tables: Excel 시트 순서대로의 열 단위 표
+            primary: CSV/JSONL/Parquet로 내보낼 대표 표의 위치 (여러 표로 된 명세서)
+            summary: Excel을 다시 만들 때 Summary 시트에 쓸 거래 요약
+        """
+        stored = []
+        for table in tables:
+            column_count = len(table.headers)
+            stored.append({
+                "headers": list(table.headers),
+                "types": infer_column_types(table[:self.excel_generator.type_sample_rows], column_count),
+                "row_count": len(table),
+                "columns": [list(table.column(col)) for col in range(column_count)],
+            })
+
+        # 같은 경로의 예전 내보내기 결과는 새 표와 맞지 않으므로 삭제
+        self._discard_renderings(excel_path)
+        data = json.dumps(
+            {"primary": primary, "summary": summary, "tables": stored},
+            ensure_ascii=False
+        ).encode("utf-8")
+        result_cache.put(table_path_for(excel_path), data)
+        self.stats["tables"] += 1
+
+    def render(self, excel_path: str, export_format: str) -> Optional[str]:
+        """
+        요청한 형식의 결과 경로 반환 (없으면 저장된 표에서 만들어 캐시)
+
+        Returns:
+            결과 경로 (Excel도 표도 남아 있지 않으면 None)
+
+        Raises:
+            ExportUnavailableError: Parquet인데 pyarrow가 없는 경우
+        """
+        if export_format == FORMAT_PARQUET and not PYARROW_AVAILABLE:
+            raise ExportUnavailableError("Parquet 내보내기에는 pyarrow 패키지가 필요합니다")
+
+        path = excel_path if export_format == FORMAT_XLSX else export_path_for(excel_path, export_format)
+        if result_cache.exists(path):
+            self.stats["reused"] += 1
+            return path
+
+        stored = self._load_table(excel_path)
+        if stored is None:
+            return None
+
+        if export_format == FORMAT_XLSX:
+            # 캐시에서 밀려나 정리된 Excel을 표에서 다시 생성
+            sheets = [
+                (table["headers"], [list(row) for row in zip(*table["columns"])])
+                for table in stored["tables"]
+            ]
+            self.excel_generator.write_result(path, sheets, stored.get("summary"))
+        else:
+            # 한 표만 담을 수 있는 형식은 대표 표를 내보낸다
+            table = stored["tables"][stored["primary"]]
+            renderer = {
+                FORMAT_CSV: self._render_csv,
+                FORMAT_JSONL: self._render_jsonl,
+                FORMAT_PARQUET: self._render_parquet,
+            }[export_format]
+            result_cache.put(path, renderer(table))
+
+        self.stats["rendered"] += 1
+        logger.info(f"📤 Rendered {export_format} export: {path}")
+        return path
+
+    def discard(self, excel_path: Optional[str]):
+        """Excel 결과에 딸린 표와 내보내기 결과 삭제"""
+        if not excel_path:
+            return
+        result_cache.discard(table_path_for(excel_path))
+        self._discard_renderings(excel_path)
+
+    def _discard_renderings(self, excel_path: str):
+        for export_format in EXPORT_FORMATS:
+            if export_format != FORMAT_XLSX:
+                result_cache.discard(export_path_for(excel_path, export_format))
+
+    def _load_table(self, excel_path: str) -> Optional[Dict[str, Any]]:
+        path = table_path_for(excel_path)
+        data = result_cache.get(path)
+        if data is None:
+            if not os.path.exists(path):
+                return None
+            with open(path, "rb") as f:
+                data = f.read()
+        return json.loads(data)
+
+    def _typed_columns(self, table: Dict[str, Any]) -> List[List[Any]]:
+        """열 종류에 따라 금액은 숫자, 날짜는 datetime으로 변환 (변환되지 않는 값은 원래 문자열 유지)"""
+        typed = []
+        for kind, column in zip(table["types"], table["columns"]):
+            if kind == COLUMN_AMOUNT:
+                parse = try_parse_korean_amount
+            elif kind == COLUMN_DATE:
+                parse = parse_statement_date
+            else:
+                typed.append(column)
+                continue
+            values = []
+            for value in column:
+                if value is None or value == "":
+                    values.append(None)
+                else:
+                    parsed = parse(value)
+                    values.append(value if parsed is None else parsed)
+            typed.append(values)
+        return typed
+
+    def _render_csv(self, table: Dict[str, Any]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(table["headers"])
+        for row in zip(*self._typed_columns(table)):
+            writer.writerow([_plain_value(value) for value in row])
+        return buffer.getvalue().encode("utf-8")
+
+    def _render_jsonl(self, table: Dict[str, Any]) -> bytes:
+        headers = table["headers"]
+        lines = [
+            json.dumps(dict(zip(headers, map(_plain_value, row))), ensure_ascii=False)
+            for row in zip(*self._typed_columns(table))
+        ]
+        return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+
+    def _render_parquet(self, table: Dict[str, Any]) -> bytes:
+        arrays = []
+        for kind, values in zip(table["types"], self._typed_columns(table)):
+            # 변환되지 않은 값이 섞인 열은 문자열 열로 저장
+            if kind == COLUMN_AMOUNT and all(v is None or isinstance(v, float) for v in values):
+                arrays.append(pyarrow.array(values, type=pyarrow.float64()))
+            elif kind == COLUMN_DATE and all(v is None or isinstance(v, datetime) for v in values):
+                arrays.append(pyarrow.array(values, type=pyarrow.timestamp("s")))
+            else:
+                arrays.append(pyarrow.array(
+                    [None if v is None else str(_plain_value(v)) for v in values],
+                    type=pyarrow.string()
+                ))
+
+        buffer = io.BytesIO()
+        pyarrow.parquet.write_table(pyarrow.Table.from_arrays(arrays, names=table["headers"]), buffer)
+        return buffer.getvalue()
+
+    def get_stats(self) -> dict:
+        """내보내기 통계"""
+        return {"parquet_available": PYARROW_AVAILABLE, **self.stats}
+
+
+def _plain_value(value: Any) -> Any:
+    """CSV/JSON에 쓸 값 (날짜는 ISO 형식, 정수 금액은 소수점 없이)"""
+    if isinstance(value, datetime):
+        return value.date().isoformat() if value.time() == datetime.min.time() else value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+# 전역 내보내기 인스턴스
+table_exporter = TableExporter()
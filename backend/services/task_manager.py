@@ -3,11 +3,19 @@
 취소 가능한 변환 작업 관리를 위한 TaskManager
 """
 import asyncio
-from typing import Dict, Optional, Callable, Any
+import heapq
+import itertools
+import os
+import time
+from typing import Dict, List, Optional, Callable, Any, Tuple
 from datetime import datetime
 import logging
 import uuid
 
+from .job_scheduler import job_scheduler, LANE_INTERACTIVE
+from .cancellation import CancellationToken
+from .websocket_manager import manager as ws_manager
+
 logger = logging.getLogger(__name__)
 
 class TaskManager:
@@ -15,43 +23,114 @@ class TaskManager:
         # 실행 중인 작업들
         self.running_tasks: Dict[str, asyncio.Task] = {}
         # 취소 토큰들
-        self.cancellation_tokens: Dict[str, bool] = {}
-        # 작업 메타데이터
+        self.cancellation_tokens: Dict[str, CancellationToken] = {}
+        # 진행 중인(대기 포함) 작업 메타데이터
         self.task_metadata: Dict[str, dict] = {}
+        # 끝난 작업 메타데이터 (늦게 온 상태 조회에 답하기 위해 TTL 동안 유지)
+        self.finished_tasks: Dict[str, dict] = {}
+        self.finished_ttl_seconds = float(os.getenv("TASK_METADATA_TTL_SECONDS", "3600"))
+        self.max_finished_tasks = int(os.getenv("TASK_METADATA_MAX_FINISHED", "10000"))
+        # 만료 시각 순 힙 (만료 시각, 순번, file_id) - 같은 file_id가 다시 끝나면 이전 항목은 무시
+        self._expiry_heap: List[Tuple[float, int, str]] = []
+        self._finished_expiry: Dict[str, float] = {}
+        self._expiry_seq = itertools.count()
+        # 시작했지만 아직 끝나지 않은 작업 수 (완료 콜백에서 감소)
+        self._active_count = 0
+        self.finished_counts = {"completed": 0, "failed": 0, "cancelled": 0}
+        # 취소 요청 후 작업이 실제로 멈추기까지 걸린 시간 통계 (초)
+        self.cancel_stats = {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
     
-    def start_task(self, file_id: str, coro, task_name: str = "conversion") -> asyncio.Task:
-        """새로운 비동기 작업 시작"""
+    def start_task(
+        self,
+        file_id: str,
+        coro,
+        task_name: str = "conversion",
+        check_admission: bool = True,
+        session_id: Optional[str] = None,
+        lane: str = LANE_INTERACTIVE
+    ) -> asyncio.Task:
+        """
+        새로운 비동기 작업 시작
+        
+        작업은 스케줄러의 실행 슬롯을 얻은 뒤에 실행되며,
+        대기열이 가득 찬 경우 QueueFullError를 발생시킨다.
+        (재시작 후 복구되는 작업처럼 이미 받아들인 작업은 check_admission=False)
+        
+        Args:
+            session_id: 공정 스케줄링 단위 (같은 세션의 작업끼리 실행 몫을 나눔)
+            lane: 우선순위 레인 (paid / interactive / bulk)
+        """
+        if check_admission:
+            try:
+                job_scheduler.check_admission(session_id=session_id)
+            except Exception:
+                coro.close()
+                raise
+        
         # 기존 작업이 있으면 취소
         if file_id in self.running_tasks:
             logger.info(f"🛑 Cancelling existing task for file_id: {file_id}")
             self.cancel_task(file_id)
         
         # 취소 토큰 초기화
-        self.cancellation_tokens[file_id] = False
+        self.cancellation_tokens[file_id] = CancellationToken()
         
         # 작업 생성 및 시작
-        task = asyncio.create_task(coro)
+        task = asyncio.create_task(self._run_scheduled(file_id, coro, session_id, lane))
         self.running_tasks[file_id] = task
         
         # 메타데이터 저장
-        self.task_metadata[file_id] = {
+        metadata = {
             "task_name": task_name,
             "started_at": datetime.now(),
-            "status": "running"
+            "status": "queued"
         }
+        self.task_metadata[file_id] = metadata
+        self.finished_tasks.pop(file_id, None)
+        self._finished_expiry.pop(file_id, None)
+        self._active_count += 1
         
         # 작업 완료 시 자동 정리를 위한 콜백 추가
-        task.add_done_callback(lambda t: self._task_done_callback(file_id, t))
+        task.add_done_callback(lambda t: self._task_done_callback(file_id, t, metadata))
         
         logger.info(f"🚀 Task started for file_id: {file_id}, task: {task_name}")
         return task
     
+    async def _run_scheduled(self, file_id: str, coro, session_id: Optional[str] = None, lane: str = LANE_INTERACTIVE):
+        """실행 슬롯을 확보한 뒤 작업 실행"""
+        token = self.cancellation_tokens[file_id]
+        try:
+            await job_scheduler.acquire(file_id, session_id=session_id, lane=lane)
+        except asyncio.CancelledError:
+            if token.is_cancelled:
+                # 사용자가 대기 중에 취소한 작업(cancel_task가 토큰을 먼저 설정)도
+                # 정리 경로(히스토리/임시 파일)를 타도록 취소된 상태로 실행한다
+                await coro
+            else:
+                # 서버 종료로 취소된 대기 작업은 실행하지 않고 queued 상태와 원본 PDF를 남겨
+                # 재시작 후 recover_interrupted_jobs가 다시 대기열에 등록하게 한다
+                coro.close()
+            raise
+        
+        if file_id in self.task_metadata:
+            self.task_metadata[file_id]["status"] = "running"
+        
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        try:
+            return await coro
+        finally:
+            # 취소된 작업의 슬롯은 여기서 바로 다음 대기 작업에 넘어간다
+            job_scheduler.release(file_id, loop.time() - started_at)
+            if token.is_cancelled:
+                self.record_cancel_latency(file_id, token.elapsed_since_cancel())
+    
     def cancel_task(self, file_id: str) -> bool:
         """작업 취소"""
         try:
-            # 취소 토큰 설정
+            # 취소 토큰 설정 (페이지 추출 루프, 진행 중인 Claude 요청, 워커 프로세스로 전파)
             if file_id in self.cancellation_tokens:
-                self.cancellation_tokens[file_id] = True
+                self.cancellation_tokens[file_id].cancel()
             
             # 실행 중인 작업 취소
             if file_id in self.running_tasks:
@@ -75,7 +154,34 @@ class TaskManager:
     
     def is_cancelled(self, file_id: str) -> bool:
         """취소 여부 확인"""
-        return self.cancellation_tokens.get(file_id, False)
+        token = self.cancellation_tokens.get(file_id)
+        return token is not None and token.is_cancelled
+    
+    def get_token(self, file_id: str) -> CancellationToken:
+        """작업의 취소 토큰 조회 (등록되지 않은 작업이면 새 토큰)"""
+        return self.cancellation_tokens.get(file_id) or CancellationToken()
+    
+    def record_cancel_latency(self, file_id: str, seconds: Optional[float]):
+        """취소 요청부터 작업 중단까지 걸린 시간 기록"""
+        if seconds is None:
+            return
+        
+        self.cancel_stats["count"] += 1
+        self.cancel_stats["total_seconds"] += seconds
+        self.cancel_stats["max_seconds"] = max(self.cancel_stats["max_seconds"], seconds)
+        
+        if file_id in self.task_metadata:
+            self.task_metadata[file_id]["cancel_latency_ms"] = round(seconds * 1000, 1)
+        logger.info(f"🛑 Cancellation of {file_id} took effect after {seconds * 1000:.1f}ms")
+    
+    def get_cancel_stats(self) -> dict:
+        """취소 반영 시간 통계"""
+        count = self.cancel_stats["count"]
+        return {
+            "count": count,
+            "average_ms": round(self.cancel_stats["total_seconds"] * 1000 / count, 1) if count else 0.0,
+            "max_ms": round(self.cancel_stats["max_seconds"] * 1000, 1)
+        }
     
     def is_running(self, file_id: str) -> bool:
         """작업 실행 여부 확인"""
@@ -86,9 +192,11 @@ class TaskManager:
         return not task.done()
     
     def get_task_status(self, file_id: str) -> Optional[dict]:
-        """작업 상태 조회"""
+        """작업 상태 조회 (끝난 작업은 TTL 동안 마지막 상태를 반환)"""
         if file_id not in self.task_metadata:
-            return None
+            self._expire_finished()
+            finished = self.finished_tasks.get(file_id)
+            return finished.copy() if finished else None
         
         metadata = self.task_metadata[file_id].copy()
         
@@ -103,50 +211,98 @@ class TaskManager:
                 else:
                     metadata["status"] = "completed"
             else:
-                metadata["status"] = "running"
+                position = job_scheduler.get_queue_position(file_id)
+                if position is not None:
+                    metadata["status"] = "queued"
+                    metadata["queue_position"] = position
+                else:
+                    metadata["status"] = "running"
         
         return metadata
     
     def cleanup_task(self, file_id: str):
-        """작업 정리"""
+        """작업 정리 (메타데이터는 작업이 끝나면 만료 대상으로 옮겨짐)"""
         self.running_tasks.pop(file_id, None)
         self.cancellation_tokens.pop(file_id, None)
-        self.task_metadata.pop(file_id, None)
         logger.info(f"🧹 Task cleaned up for file_id: {file_id}")
     
-    def _task_done_callback(self, file_id: str, task: asyncio.Task):
+    def _task_done_callback(self, file_id: str, task: asyncio.Task, metadata: dict):
         """작업 완료 시 콜백"""
         try:
-            if file_id in self.task_metadata:
-                self.task_metadata[file_id]["finished_at"] = datetime.now()
-                
-                if task.cancelled():
-                    self.task_metadata[file_id]["status"] = "cancelled"
-                elif task.exception():
-                    self.task_metadata[file_id]["status"] = "failed"
-                    self.task_metadata[file_id]["error"] = str(task.exception())
-                else:
-                    self.task_metadata[file_id]["status"] = "completed"
+            self._active_count -= 1
+            metadata["finished_at"] = datetime.now()
+            
+            if task.cancelled():
+                metadata["status"] = "cancelled"
+            elif task.exception():
+                metadata["status"] = "failed"
+                metadata["error"] = str(task.exception())
+            else:
+                metadata["status"] = "completed"
+            self.finished_counts[metadata["status"]] += 1
+            
+            # 같은 file_id로 새 작업이 시작된 경우 이전 작업의 메타데이터는 버린다
+            if self.task_metadata.get(file_id) is metadata:
+                del self.task_metadata[file_id]
+                self.running_tasks.pop(file_id, None)
+                self.cancellation_tokens.pop(file_id, None)
+                self._retain_finished(file_id, metadata)
             
             logger.info(f"✅ Task finished for file_id: {file_id}")
             
         except Exception as e:
             logger.error(f"Task done callback error for {file_id}: {e}")
     
+    def _retain_finished(self, file_id: str, metadata: dict):
+        """끝난 작업 메타데이터를 TTL 동안 보관"""
+        expires_at = time.monotonic() + self.finished_ttl_seconds
+        self.finished_tasks[file_id] = metadata
+        self._finished_expiry[file_id] = expires_at
+        heapq.heappush(self._expiry_heap, (expires_at, next(self._expiry_seq), file_id))
+        self._expire_finished()
+    
+    def _expire_finished(self):
+        """
+        TTL이 지났거나 보관 개수를 넘은 끝난 작업 제거
+        
+        힙 맨 앞(가장 먼저 만료되는 항목)만 확인하므로 만료할 항목이 없으면 O(1)이다.
+        """
+        now = time.monotonic()
+        while self._expiry_heap:
+            expires_at, _, file_id = self._expiry_heap[0]
+            if expires_at > now and len(self.finished_tasks) <= self.max_finished_tasks:
+                break
+            
+            heapq.heappop(self._expiry_heap)
+            # 다시 시작되었거나 다시 끝나서 만료 시각이 바뀐 항목은 무시
+            if self._finished_expiry.get(file_id) != expires_at:
+                continue
+            
+            del self._finished_expiry[file_id]
+            self.finished_tasks.pop(file_id, None)
+            if file_id not in self.task_metadata:
+                ws_manager.cleanup_file(file_id)
+    
     def get_all_tasks(self) -> Dict[str, dict]:
-        """모든 작업 상태 조회"""
+        """진행 중인(대기 포함) 작업 상태 조회 (실행/대기 한도만큼만 존재)"""
         result = {}
         for file_id in self.task_metadata:
             result[file_id] = self.get_task_status(file_id)
         return result
     
     def get_running_task_count(self) -> int:
-        """실행 중인 작업 수 반환"""
-        count = 0
-        for file_id, task in self.running_tasks.items():
-            if not task.done():
-                count += 1
-        return count
+        """실행 중인(대기 포함) 작업 수 반환"""
+        return self._active_count
+    
+    def get_registry_stats(self) -> dict:
+        """작업 레지스트리 크기와 누적 결과 통계"""
+        self._expire_finished()
+        return {
+            "active": self._active_count,
+            "retained_finished": len(self.finished_tasks),
+            "finished_ttl_seconds": self.finished_ttl_seconds,
+            "finished_totals": dict(self.finished_counts)
+        }
     
     async def wait_for_task(self, file_id: str, timeout: Optional[float] = None) -> bool:
         """작업 완료 대기"""
@@ -3,7 +3,7 @@ WebSocket 연결 관리자
 실시간 변환 진행률 업데이트를 위한 WebSocket 관리
 """
 from fastapi import WebSocket
-from typing import Dict, List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional
 import json
 import asyncio
 from datetime import datetime
@@ -17,6 +17,8 @@ class ConnectionManager:
         self.active_connections: Dict[str, WebSocket] = {}
         # 진행률 캐시 (WebSocket 연결 전에 발생한 이벤트 저장)
         self.progress_cache: Dict[str, dict] = {}
+        # 파일 ID별 진행률 구독자 (일괄 변환의 전체 진행률 집계 등)
+        self.progress_listeners: Dict[str, Callable[[dict], Awaitable[None]]] = {}
         
     async def connect(self, websocket: WebSocket, file_id: str):
         """WebSocket 연결 수락 및 등록"""
@@ -55,6 +57,21 @@ class ConnectionManager:
                 self.disconnect(file_id)
         else:
             logger.debug(f"📦 Progress cached for {file_id}: {progress_data['status']} {progress_data['progress']}%")
+        
+        listener = self.progress_listeners.get(file_id)
+        if listener and "status" in progress_data:
+            try:
+                await listener(progress_data)
+            except Exception as e:
+                logger.error(f"Progress listener failed for {file_id}: {e}")
+    
+    def add_progress_listener(self, file_id: str, listener: Callable[[dict], Awaitable[None]]):
+        """파일 진행률 구독 (파일당 하나)"""
+        self.progress_listeners[file_id] = listener
+    
+    def remove_progress_listener(self, file_id: str):
+        """파일 진행률 구독 해제"""
+        self.progress_listeners.pop(file_id, None)
     
     async def broadcast_status(
         self, 
@@ -80,6 +97,7 @@ class ConnectionManager:
         """파일 관련 모든 데이터 정리"""
         self.disconnect(file_id)
         self.progress_cache.pop(file_id, None)
+        self.progress_listeners.pop(file_id, None)
         logger.info(f"🧹 Cleaned up data for file_id: {file_id}")
     
     def get_active_connections(self) -> List[str]:
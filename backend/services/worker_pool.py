@@ -0,0 +1,360 @@
+"""
+변환 워커 프로세스 풀
+CPU를 많이 쓰는 변환 단계(PDF 추출, 파싱, Excel 생성)를 별도 프로세스에서 실행하고
+API 프로세스에는 진행률 이벤트와 결과만 전달
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from .cancellation import CancellationToken
+
+logger = logging.getLogger(__name__)
+
+# 워커 → API 이벤트 종류
+EVENT_STARTED = "started"
+EVENT_PROGRESS = "progress"
+EVENT_RESULT = "result"
+EVENT_ERROR = "error"
+EVENT_CANCELLED = "cancelled"
+
+# API → 워커 제어 메시지
+CONTROL_CANCEL = "cancel"
+
+
+class WorkerCrashedError(Exception):
+    """작업을 처리하던 워커 프로세스가 비정상 종료됨"""
+    pass
+
+
+class WorkerPool:
+    def __init__(self):
+        # 0이면 워커 모드 비활성화 (API 프로세스에서 직접 변환)
+        self.worker_count = int(os.getenv("CONVERSION_WORKERS", "0"))
+        # 취소 후 워커가 실제로 멈출 때까지 기다리는 최대 시간 (초)
+        self.cancel_grace_seconds = float(os.getenv("WORKER_CANCEL_GRACE_SECONDS", "5"))
+        self._context = multiprocessing.get_context("spawn")
+        self._job_queue = None
+        self._event_queue = None
+        # worker_id → (프로세스, 제어 큐)
+        self._workers: Dict[int, tuple] = {}
+        # file_id → (결과 Future, 진행률 보고 함수)
+        self._pending: Dict[str, tuple] = {}
+        # file_id → 워커에서 작업이 끝났음을 알리는 이벤트
+        self._stopped: Dict[str, asyncio.Event] = {}
+        # file_id → 처리 중인 worker_id
+        self._assignments: Dict[str, int] = {}
+        # 워커가 받기 전에 취소된 작업
+        self._cancel_requested: Set[str] = set()
+        self._relay_task: Optional[asyncio.Task] = None
+        self._relay_executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    @property
+    def enabled(self) -> bool:
+        return self.worker_count > 0
+    
+    async def start(self):
+        """워커 프로세스 시작 (앱 시작 시 호출)"""
+        if not self.enabled or self._workers:
+            return
+        
+        self._loop = asyncio.get_running_loop()
+        self._job_queue = self._context.Queue()
+        self._event_queue = self._context.Queue()
+        self._relay_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="worker-relay")
+        
+        for worker_id in range(self.worker_count):
+            self._spawn_worker(worker_id)
+        
+        self._relay_task = asyncio.create_task(self._relay_events())
+        logger.info(f"👷 Started {self.worker_count} conversion worker processes")
+    
+    async def stop(self):
+        """워커 프로세스 종료 (앱 종료 시 호출)"""
+        if not self._workers:
+            return
+        
+        # 종료 중인 워커를 재시작하지 않도록 중계 작업부터 중단
+        if self._relay_task:
+            self._relay_task.cancel()
+        
+        for _ in self._workers:
+            self._job_queue.put(None)
+        
+        for process, control_queue in self._workers.values():
+            await asyncio.to_thread(process.join, 5)
+            if process.is_alive():
+                process.terminate()
+            control_queue.put(None)
+        
+        self._workers.clear()
+        if self._relay_executor:
+            self._relay_executor.shutdown(wait=False)
+        logger.info("👷 Conversion workers stopped")
+    
+    async def run_job(
+        self,
+        file_id: str,
+        file_path: str,
+        use_ai: bool,
+        report: Callable[..., Awaitable[None]]
+    ) -> Dict[str, Any]:
+        """
+        워커에 변환 작업을 맡기고 결과를 기다림
+        
+        Args:
+            report: 워커가 보낸 진행률을 전달할 함수 (status, progress, message, data=None)
+        
+        Returns:
+            {"excel_path": ..., "structured_data": ...}
+        """
+        future = asyncio.get_running_loop().create_future()
+        stopped = asyncio.Event()
+        self._pending[file_id] = (future, report)
+        self._stopped[file_id] = stopped
+        self._job_queue.put({
+            "file_id": file_id,
+            "file_path": file_path,
+            "use_ai": use_ai
+        })
+        
+        try:
+            return await future
+        except asyncio.CancelledError:
+            self.cancel(file_id)
+            # 워커가 실제로 멈춘 뒤에 슬롯을 반납하도록 잠시 대기
+            try:
+                await asyncio.wait_for(stopped.wait(), timeout=self.cancel_grace_seconds)
+            except asyncio.TimeoutError:
+                logger.warning(f"⚠️ Worker did not confirm cancellation of {file_id} in time")
+            raise
+        finally:
+            self._pending.pop(file_id, None)
+            self._stopped.pop(file_id, None)
+    
+    def cancel(self, file_id: str):
+        """워커에서 실행 중이거나 대기 중인 작업 취소 요청"""
+        worker_id = self._assignments.get(file_id)
+        if worker_id is None:
+            self._cancel_requested.add(file_id)
+            return
+        
+        worker = self._workers.get(worker_id)
+        if worker:
+            worker[1].put((CONTROL_CANCEL, file_id))
+    
+    def get_stats(self) -> dict:
+        """워커 풀 상태"""
+        return {
+            "enabled": self.enabled,
+            "workers": len(self._workers),
+            "alive_workers": sum(1 for process, _ in self._workers.values() if process.is_alive()),
+            "jobs_in_workers": len(self._assignments),
+            "pending_jobs": len(self._pending)
+        }
+    
+    def _spawn_worker(self, worker_id: int):
+        control_queue = self._context.Queue()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_id, self._job_queue, self._event_queue, control_queue),
+            name=f"conversion-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        self._workers[worker_id] = (process, control_queue)
+    
+    def _get_event(self):
+        """이벤트 큐에서 하나 읽기 (1초 대기 후 없으면 None)"""
+        try:
+            return self._event_queue.get(timeout=1.0)
+        except queue.Empty:
+            return None
+    
+    async def _relay_events(self):
+        """워커 이벤트를 API 프로세스로 중계"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            try:
+                event = await loop.run_in_executor(self._relay_executor, self._get_event)
+                if event is None:
+                    self._check_workers()
+                    continue
+                
+                kind, file_id, payload = event
+                pending = self._pending.get(file_id)
+                
+                if kind == EVENT_STARTED:
+                    self._assignments[file_id] = payload
+                    if file_id in self._cancel_requested or pending is None:
+                        self._cancel_requested.discard(file_id)
+                        self.cancel(file_id)
+                    continue
+                
+                if kind == EVENT_PROGRESS:
+                    if pending:
+                        await pending[1](**payload)
+                    continue
+                
+                # 종료 이벤트
+                self._assignments.pop(file_id, None)
+                self._cancel_requested.discard(file_id)
+                self._mark_stopped(file_id)
+                if kind == EVENT_CANCELLED and payload and payload.get("stop_latency") is not None:
+                    logger.info(f"🛑 Worker stopped {file_id} {payload['stop_latency'] * 1000:.1f}ms after cancel signal")
+                if pending is None or pending[0].done():
+                    continue
+                
+                future = pending[0]
+                if kind == EVENT_RESULT:
+                    future.set_result(payload)
+                elif kind == EVENT_CANCELLED:
+                    future.cancel()
+                else:
+                    future.set_exception(Exception(payload))
+                    
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Worker event relay error: {e}")
+    
+    def _mark_stopped(self, file_id: str):
+        stopped = self._stopped.get(file_id)
+        if stopped:
+            stopped.set()
+    
+    def _check_workers(self):
+        """비정상 종료된 워커의 작업을 실패 처리하고 워커 재시작"""
+        for worker_id, (process, _) in list(self._workers.items()):
+            if process.is_alive():
+                continue
+            
+            logger.error(f"💥 Worker {worker_id} exited with code {process.exitcode}, restarting")
+            for file_id, assigned in list(self._assignments.items()):
+                if assigned != worker_id:
+                    continue
+                self._assignments.pop(file_id, None)
+                self._mark_stopped(file_id)
+                pending = self._pending.get(file_id)
+                if pending and not pending[0].done():
+                    pending[0].set_exception(WorkerCrashedError("변환 워커가 비정상 종료되었습니다."))
+            
+            self._spawn_worker(worker_id)
+
+
+def _worker_main(worker_id: int, job_queue, event_queue, control_queue):
+    """워커 프로세스 진입점"""
+    from utils.logging_config import setup_logging
+    setup_logging(level=os.getenv("LOG_LEVEL", "INFO"))
+    
+    try:
+        asyncio.run(_worker_loop(worker_id, job_queue, event_queue, control_queue))
+    except KeyboardInterrupt:
+        pass
+
+
+def _listen_control(control_queue, loop: asyncio.AbstractEventLoop, jobs: Dict[str, tuple]):
+    """
+    API 프로세스의 제어 메시지 수신 (별도 스레드)
+    
+    취소 토큰은 여기서 바로 설정하여 이벤트 루프가 바쁘더라도 페이지 추출 루프가
+    즉시 멈추게 하고, 작업 태스크 취소는 이벤트 루프에 넘겨 대기 중인 요청을 중단한다.
+    """
+    while True:
+        message = control_queue.get()
+        if message is None:
+            return
+        action, file_id = message
+        job = jobs.get(file_id)
+        if action == CONTROL_CANCEL and job:
+            token, task = job
+            token.cancel()
+            if task is not None:
+                loop.call_soon_threadsafe(task.cancel)
+
+
+async def _worker_loop(worker_id: int, job_queue, event_queue, control_queue):
+    """작업 큐에서 작업을 받아 변환 단계 실행"""
+    # 순환 import 방지를 위해 워커 프로세스 안에서 import
+    from services.enhanced_conversion_service import enhanced_conversion_service
+    
+    from services.job_scheduler import job_scheduler
+    from services.result_cache import result_cache
+    
+    # 워커 메모리의 결과는 API 프로세스가 제공할 수 없으므로 Excel은 항상 디스크에 기록
+    result_cache.max_bytes = 0
+    
+    # 워커 하나가 코어 하나를 쓰므로 CPU 단계는 한 번에 하나씩,
+    # 여러 작업을 동시에 받아 한 작업의 AI 호출 중에 다른 작업의 추출이 진행되게 한다
+    job_scheduler.configure_stage("extract", 1)
+    job_scheduler.configure_stage("excel", 1)
+    jobs_per_worker = int(os.getenv("WORKER_JOBS_PER_PROCESS", "2"))
+    slots = asyncio.Semaphore(jobs_per_worker)
+    
+    loop = asyncio.get_running_loop()
+    # file_id → (취소 토큰, 작업 태스크)
+    jobs: Dict[str, tuple] = {}
+    threading.Thread(target=_listen_control, args=(control_queue, loop, jobs), daemon=True).start()
+    
+    running: Set[asyncio.Task] = set()
+    logger.info(f"👷 Worker {worker_id} ready (pid {os.getpid()}, {jobs_per_worker} jobs at a time)")
+    
+    async def run_job(job: dict, token: CancellationToken):
+        file_id = job["file_id"]
+        
+        async def report(status: str, progress: int, message: str, data: Optional[dict] = None):
+            event_queue.put((EVENT_PROGRESS, file_id, {
+                "status": status,
+                "progress": progress,
+                "message": message,
+                "data": data
+            }))
+        
+        try:
+            result = await enhanced_conversion_service.run_conversion_stages(
+                file_id,
+                job["file_path"],
+                job["use_ai"],
+                report,
+                token
+            )
+            event_queue.put((EVENT_RESULT, file_id, result))
+        except asyncio.CancelledError:
+            event_queue.put((EVENT_CANCELLED, file_id, {"stop_latency": token.elapsed_since_cancel()}))
+        except Exception as e:
+            logger.error(f"❌ Worker {worker_id} failed job {file_id}: {e}")
+            event_queue.put((EVENT_ERROR, file_id, str(e)))
+        finally:
+            jobs.pop(file_id, None)
+            # 취소된 작업의 자리는 바로 다음 작업이 가져간다
+            slots.release()
+    
+    while True:
+        await slots.acquire()
+        job = await loop.run_in_executor(None, job_queue.get)
+        if job is None:
+            break
+        
+        file_id = job["file_id"]
+        token = CancellationToken()
+        jobs[file_id] = (token, None)
+        event_queue.put((EVENT_STARTED, file_id, worker_id))
+        task = asyncio.create_task(run_job(job, token))
+        jobs[file_id] = (token, task)
+        running.add(task)
+        task.add_done_callback(running.discard)
+    
+    if running:
+        await asyncio.wait(running)
+    logger.info(f"👷 Worker {worker_id} shutting down")
+
+
+# 전역 워커 풀 인스턴스
+worker_pool = WorkerPool()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+오프라인 일괄 변환 CLI
+HTTP 서버 없이 디렉토리의 PDF들을 서버와 같은 변환 파이프라인(추출 → 분석 → ExcelGenerator)으로
+프로세스 풀에서 변환한다. 백필 작업과 웹 서버 영향 없는 엔진 프로파일링용.
+
+실행 (backend 디렉토리에서):
+    python -m tools.bulk_convert INPUT_DIR OUTPUT_DIR --workers 4
+    python -m tools.bulk_convert INPUT_DIR OUTPUT_DIR --ai          # CLAUDE_API_KEY 필요
+
+동작:
+    - INPUT_DIR 아래의 *.pdf 를 재귀적으로 찾아 OUTPUT_DIR 에 같은 상대 경로의 .xlsx 로 저장
+    - 파일마다 결과를 OUTPUT_DIR/manifest.jsonl 에 한 줄씩 기록
+    - 다시 실행하면 manifest에 완료로 기록되고 원본이 바뀌지 않은 파일은 건너뜀
+      (--force 로 전체 재변환, 실패한 파일은 항상 다시 시도)
+    - 끝나면 처리량(파일/초, 행/초, MB/초)과 파일별 소요 시간 분포, 단계별 평균 시간 출력
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+MANIFEST_NAME = "manifest.jsonl"
+
+# 워커 프로세스 상태 (프로세스마다 이벤트 루프 하나를 계속 사용)
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_service = None
+
+
+def _init_worker(temp_dir: str, log_level: str):
+    """
+    워커 프로세스 초기화
+
+    서비스 모듈을 import 하기 전에 환경을 정해야 하므로 여기서 늦게 import 한다.
+    작업 저장소는 프로세스별 메모리 DB를 써서 서버의 jobs.db 에 기록하지 않는다.
+    """
+    global _worker_loop, _worker_service
+
+    os.environ["JOB_STORE_PATH"] = ":memory:"
+    # 결과를 출력 디렉토리로 옮겨야 하므로 메모리 결과 캐시를 쓰지 않는다
+    os.environ["RESULT_CACHE_MAX_BYTES"] = "0"
+    os.environ.setdefault("CLAUDE_API_KEY", "sk-ant-offline")
+    logging.basicConfig(level=log_level, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    from utils.file_manager import FileManager
+    from services.enhanced_conversion_service import enhanced_conversion_service
+
+    FileManager.TEMP_DIR = temp_dir
+    # 임시 결과를 받을 클라이언트가 없으므로 AI 결과만 기다린다
+    enhanced_conversion_service.speculative_basic = False
+
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+    _worker_service = enhanced_conversion_service
+
+
+def _convert_file(source: str, output: str, use_ai: bool) -> Dict:
+    """PDF 하나 변환 (워커 프로세스에서 실행)"""
+    from services.cancellation import CancellationToken
+    from services.table_export import table_exporter
+
+    async def report(status: str, progress: int, message: str, data: Optional[dict] = None):
+        pass
+
+    started = time.perf_counter()
+    try:
+        result = _worker_loop.run_until_complete(
+            _worker_service.run_conversion_stages(
+                file_id=f"bulk_{uuid.uuid4().hex}",
+                file_path=source,
+                use_ai=use_ai,
+                report=report,
+                token=CancellationToken()
+            )
+        )
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        os.replace(result["excel_path"], output)
+        # 다른 형식 다운로드용으로 저장된 표는 CLI에서 쓰지 않는다
+        table_exporter.discard(result["excel_path"])
+
+        return {
+            "status": "completed",
+            "seconds": round(time.perf_counter() - started, 3),
+            "rows": sum(
+                len(table.get("rows", []))
+                for table in result["structured_data"].get("tables") or [result["structured_data"]]
+            ),
+            "output_size": os.path.getsize(output),
+            "stages": {name: outcome["seconds"] for name, outcome in result["stage_outcomes"].items()},
+        }
+    except Exception as e:
+        return {
+            "status": "failed",
+            "seconds": round(time.perf_counter() - started, 3),
+            "error": str(e),
+        }
+
+
+def load_manifest(manifest_path: Path) -> Dict[str, Dict]:
+    """상대 경로 → 마지막 기록 (나중 기록이 앞의 기록을 덮어씀)"""
+    records = {}
+    if not manifest_path.exists():
+        return records
+
+    with open(manifest_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 중단된 실행이 남긴 마지막 줄
+                continue
+            records[record["source"]] = record
+    return records
+
+
+def is_done(record: Optional[Dict], source: Path, output: Path) -> bool:
+    """원본이 바뀌지 않았고 결과 파일이 남아 있는 완료 기록인지 확인"""
+    if not record or record.get("status") != "completed" or not output.exists():
+        return False
+    stat = source.stat()
+    return record.get("size") == stat.st_size and record.get("mtime") == stat.st_mtime
+
+
+def percentile(values: List[float], ratio: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+def print_stats(results: List[Dict], elapsed: float, workers: int):
+    """처리량과 소요 시간 분포 출력"""
+    completed = [r for r in results if r["status"] == "completed"]
+    failed = len(results) - len(completed)
+    total_rows = sum(r["rows"] for r in completed)
+    total_mb = sum(r["size"] for r in results) / (1024 * 1024)
+    seconds = [r["seconds"] for r in results]
+
+    print()
+    print(f"files      {len(results)} ({len(completed)} completed, {failed} failed) with {workers} workers")
+    print(f"elapsed    {elapsed:.2f}s")
+    if not results or elapsed <= 0:
+        return
+    print(f"throughput {len(results) / elapsed:.2f} files/s, {total_rows / elapsed:.1f} rows/s, {total_mb / elapsed:.2f} MB/s")
+    print(
+        f"per file   mean {statistics.mean(seconds):.3f}s, p50 {percentile(seconds, 0.5):.3f}s, "
+        f"p95 {percentile(seconds, 0.95):.3f}s, max {max(seconds):.3f}s"
+    )
+
+    stage_names = []
+    for r in completed:
+        stage_names.extend(name for name in r["stages"] if name not in stage_names)
+    for name in stage_names:
+        values = [r["stages"][name] for r in completed if name in r["stages"]]
+        print(f"stage      {name:<10} mean {statistics.mean(values):.3f}s, max {max(values):.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 디렉토리 일괄 Excel 변환")
+    parser.add_argument("input_dir", type=Path)
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--ai", action="store_true", help="Claude AI 분석 사용 (CLAUDE_API_KEY 필요)")
+    parser.add_argument("--force", action="store_true", help="manifest의 완료 기록을 무시하고 전부 다시 변환")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    if args.ai and not os.getenv("CLAUDE_API_KEY"):
+        parser.error("--ai 에는 CLAUDE_API_KEY 환경변수가 필요합니다")
+    if not args.input_dir.is_dir():
+        parser.error(f"입력 디렉토리가 없습니다: {args.input_dir}")
+
+    output_dir = args.output_dir.resolve()
+    temp_dir = output_dir / ".tmp"
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+    manifest = {} if args.force else load_manifest(manifest_path)
+
+    sources = sorted(p for p in args.input_dir.rglob("*") if p.is_file() and p.suffix.lower() == ".pdf")
+    pending = []
+    for source in sources:
+        relative = source.relative_to(args.input_dir).as_posix()
+        output = output_dir / Path(relative).with_suffix(".xlsx")
+        if is_done(manifest.get(relative), source, output):
+            continue
+        pending.append((source, relative, output))
+
+    print(f"📂 {len(sources)} PDFs found, {len(sources) - len(pending)} already converted, {len(pending)} to convert")
+    if not pending:
+        return
+
+    results = []
+    started = time.perf_counter()
+    with open(manifest_path, "a", encoding="utf-8") as manifest_file, ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(str(temp_dir), args.log_level.upper())
+    ) as executor:
+        futures = {
+            executor.submit(_convert_file, str(source.resolve()), str(output), args.ai): (source, relative)
+            for source, relative, output in pending
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            source, relative = futures[future]
+            stat = source.stat()
+            record = {
+                "source": relative,
+                "output": Path(relative).with_suffix(".xlsx").as_posix(),
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                **future.result()
+            }
+            # 중간에 멈춰도 이어서 실행할 수 있도록 파일마다 바로 기록
+            manifest_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            manifest_file.flush()
+            results.append(record)
+
+            mark = "✅" if record["status"] == "completed" else "❌"
+            detail = f"{record['rows']} rows" if record["status"] == "completed" else record["error"]
+            print(f"{mark} [{done}/{len(pending)}] {relative} ({record['seconds']:.2f}s, {detail})")
+
+    print_stats(results, time.perf_counter() - started, args.workers)
+    if any(r["status"] == "failed" for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+서버 종료 시 대기 작업 보존 확인
+
+실행 (backend 디렉토리에서):
+    python -m tools.check_shutdown_recovery
+
+재배포처럼 이벤트 루프가 남은 작업을 모두 취소하며 끝날 때,
+실행 슬롯을 기다리던 작업이 취소 처리(cancelled 기록, 원본 PDF 삭제)되지 않고
+queued 상태와 원본 PDF를 유지해 재시작 후 recover_interrupted_jobs로 다시 등록되는지 확인한다.
+
+    1. 첫 프로세스: 실행 슬롯 하나를 미리 차지한 뒤 작업 여러 개를 등록하고
+       asyncio.run 종료로 전부 취소
+    2. 두 번째 프로세스: 작업 저장소에서 상태/원본을 확인하고 복구
+    3. 사용자가 대기 중에 취소한 작업은 그대로 cancelled 처리되는지도 함께 확인
+
+실패하면 종료 코드 1을 반환한다.
+"""
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+QUEUED_JOBS = 3
+
+
+def _configure(directory: str):
+    """서비스 모듈을 import 하기 전에 임시 디렉토리의 작업 저장소와 단일 실행 슬롯 사용"""
+    os.environ["JOB_STORE_PATH"] = os.path.join(directory, "jobs.db")
+    os.environ["MAX_RUNNING_JOBS"] = "1"
+    os.environ.setdefault("CLAUDE_API_KEY", "sk-ant-offline")
+
+    from utils.file_manager import FileManager
+    FileManager.TEMP_DIR = os.path.join(directory, "temp_files")
+
+
+async def _job_states():
+    from services.job_store import job_store
+    rows = await job_store._read("SELECT file_id, state, file_path FROM jobs", ())
+    return {row["file_id"]: (row["state"], os.path.exists(row["file_path"])) for row in rows}
+
+
+def _submit_and_shutdown(directory: str):
+    """작업을 대기열에 넣은 채로 이벤트 루프 종료 (첫 프로세스)"""
+    _configure(directory)
+    from services.enhanced_conversion_service import enhanced_conversion_service
+    from services.job_scheduler import job_scheduler
+    from services.task_manager import task_manager
+
+    async def main():
+        # 실행 슬롯을 차지해 등록한 작업이 모두 대기 상태로 남게 한다
+        await job_scheduler.acquire("slot_holder")
+        for index in range(QUEUED_JOBS + 1):
+            await enhanced_conversion_service.submit_conversion(
+                file_id=f"queued_{index}",
+                file_content=f"%PDF-1.4 shutdown check {index}".encode(),
+                original_filename=f"queued_{index}.pdf",
+                use_ai=False,
+                session_id=f"session_{index}"
+            )
+        await asyncio.sleep(0.1)
+
+        # 마지막 작업은 사용자가 대기 중에 취소
+        cancelled = f"queued_{QUEUED_JOBS}"
+        task_manager.cancel_task(cancelled)
+        await asyncio.sleep(0.2)
+        # 반환하면 asyncio.run이 남은 대기 작업을 모두 취소한다
+
+    asyncio.run(main())
+
+
+def _restart(directory: str, result_queue):
+    """재시작 후 작업 상태 확인과 복구 (두 번째 프로세스)"""
+    _configure(directory)
+    from services.enhanced_conversion_service import enhanced_conversion_service
+    from services.job_scheduler import job_scheduler
+
+    async def main():
+        states = await _job_states()
+        # 복구된 작업이 실제 변환을 시작하지 않도록 슬롯을 차지해 둔다
+        await job_scheduler.acquire("slot_holder")
+        recovered = await enhanced_conversion_service.recover_interrupted_jobs()
+        await asyncio.sleep(0.1)
+        return states, recovered, len(job_scheduler.waiting)
+
+    result_queue.put(asyncio.run(main()))
+
+
+def _run(target, *args):
+    context = multiprocessing.get_context("spawn")
+    process = context.Process(target=target, args=args)
+    process.start()
+    process.join()
+    if process.exitcode:
+        raise RuntimeError(f"{target.__name__} exited with {process.exitcode}")
+
+
+def main():
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        _run(_submit_and_shutdown, directory)
+
+        context = multiprocessing.get_context("spawn")
+        result_queue = context.Queue()
+        process = context.Process(target=_restart, args=(directory, result_queue))
+        process.start()
+        process.join(timeout=60)
+        if result_queue.empty():
+            process.kill()
+            raise RuntimeError(f"_restart exited with {process.exitcode} without a result")
+        states, recovered, queued = result_queue.get()
+
+    for index in range(QUEUED_JOBS):
+        file_id = f"queued_{index}"
+        state = states.get(file_id)
+        if state != ("queued", True):
+            failures.append(f"{file_id} after shutdown: {state} (expected queued with its PDF)")
+
+    cancelled = states.get(f"queued_{QUEUED_JOBS}")
+    if cancelled is None or cancelled[0] != "cancelled":
+        failures.append(f"queued_{QUEUED_JOBS} cancelled while waiting: {cancelled} (expected cancelled)")
+
+    if recovered != QUEUED_JOBS or queued != QUEUED_JOBS:
+        failures.append(f"recovered {recovered} jobs, {queued} queued (expected {QUEUED_JOBS})")
+
+    for file_id, state in sorted(states.items()):
+        print(f"  {file_id:<10} {state[0]:<10} pdf {'kept' if state[1] else 'deleted'}")
+    print(f"  recovered {recovered}, queued after restart {queued}")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Queued jobs survive shutdown and are requeued on restart")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+로컬 Claude Messages API 대역 서버
+부하 테스트와 회귀 테스트를 실제 API 비용/한도 없이 재현 가능하게 수행하기 위한 가짜 서버
+
+실행 (backend 디렉토리에서):
+    python -m tools.fake_claude_api --port 8787 --latency lognormal:-0.5,0.6 --rate-limit-rate 0.05
+
+변환 서버는 다음 환경변수로 이 서버를 바라보게 한다:
+    CLAUDE_API_URL=http://localhost:8787/v1/messages
+    CLAUDE_API_KEY=sk-ant-fake
+
+지원 기능:
+    - 일반 응답과 SSE 스트리밍 응답 (payload의 "stream": true)
+    - 지연 분포: fixed, uniform, normal, lognormal, exponential
+    - 429 (retry-after 포함) / 5xx 오류 주입, 잘린(max_tokens) 응답 주입
+    - 프롬프트 해시로부터 결정적으로 생성되는 응답
+    - GET/PUT /_config 로 실행 중 설정 변경, GET /_stats 로 요청 통계 조회
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# 명세서 텍스트에서 거래 행으로 보이는 줄을 찾기 위한 패턴
+_DATE_PATTERN = re.compile(r"(\d{4})[.\-/](\d{1,2})[.\-/](\d{1,2})")
+_AMOUNT_PATTERN = re.compile(r"[-+(]?₩?\d{1,3}(?:,\d{3})+(?:\.\d+)?\)?원?|[-+]?\d+(?:\.\d+)?원")
+
+_SYNTHETIC_MERCHANTS = ["스타벅스", "카카오페이 입금", "GS25", "쿠팡", "급여", "관리비", "이마트", "배달의민족"]
+
+
+@dataclass
+class FakeApiConfig:
+    """가짜 API 동작 설정"""
+    latency: str = "fixed:0.2"          # 분포:파라미터 (예: uniform:0.1,1.0)
+    stream_chunk_delay: float = 0.01    # SSE 청크 사이 지연 (초)
+    stream_chunk_chars: int = 40        # SSE 청크당 문자 수
+    rate_limit_rate: float = 0.0        # 429 응답 비율
+    retry_after: float = 1.0            # 429 응답의 retry-after (초)
+    server_error_rate: float = 0.0      # 5xx 응답 비율
+    truncate_rate: float = 0.0          # 잘린 응답 비율
+    synthetic_rows: int = 20            # 프롬프트에서 거래를 찾지 못했을 때 생성할 행 수
+    seed: int = 0                       # 오류/지연 주입용 난수 시드
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """설정된 분포에서 지연 시간(초) 샘플링"""
+        kind, _, raw_params = self.latency.partition(":")
+        params = [float(p) for p in raw_params.split(",") if p]
+
+        if kind == "fixed":
+            value = params[0] if params else 0.0
+        elif kind == "uniform":
+            value = rng.uniform(params[0], params[1])
+        elif kind == "normal":
+            value = rng.gauss(params[0], params[1])
+        elif kind == "lognormal":
+            value = rng.lognormvariate(params[0], params[1])
+        elif kind == "exponential":
+            value = rng.expovariate(1.0 / params[0])
+        else:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+
+        return max(0.0, value)
+
+
+class FakeClaudeApi:
+    """Messages API 요청 처리기"""
+
+    def __init__(self, config: FakeApiConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "streamed": 0,
+            "rate_limited": 0,
+            "server_errors": 0,
+            "truncated": 0,
+        }
+
+    def reconfigure(self, values: Dict) -> FakeApiConfig:
+        """설정 일부 변경 (시드가 바뀌면 난수 생성기 재초기화)"""
+        for key, value in values.items():
+            if hasattr(self.config, key):
+                setattr(self.config, key, type(getattr(self.config, key))(value))
+        if "seed" in values:
+            self.rng = random.Random(self.config.seed)
+        return self.config
+
+    def build_transactions(self, prompt: str) -> List[Dict]:
+        """프롬프트로부터 결정적인 거래 목록 생성"""
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        rng = random.Random(digest)
+
+        transactions = []
+        for line in prompt.splitlines():
+            date_match = _DATE_PATTERN.search(line)
+            amount_match = _AMOUNT_PATTERN.search(line, date_match.end()) if date_match else None
+            if not date_match or not amount_match:
+                continue
+
+            year, month, day = date_match.groups()
+            description = line[date_match.end():amount_match.start()].strip() or rng.choice(_SYNTHETIC_MERCHANTS)
+            transactions.append({
+                "Date": f"{year}-{int(month):02d}-{int(day):02d}",
+                "Description": description,
+                "Amount": amount_match.group(0),
+            })
+
+        if transactions:
+            return transactions
+
+        return [
+            {
+                "Date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "Description": rng.choice(_SYNTHETIC_MERCHANTS),
+                "Amount": -rng.randint(1, 500) * 100 if rng.random() < 0.8 else rng.randint(1, 5000) * 1000,
+            }
+            for _ in range(self.config.synthetic_rows)
+        ]
+
+    def pick_failure(self) -> Optional[str]:
+        """이번 요청에 주입할 실패 종류 결정"""
+        roll = self.rng.random()
+        if roll < self.config.rate_limit_rate:
+            return "rate_limit"
+        roll -= self.config.rate_limit_rate
+        if roll < self.config.server_error_rate:
+            return "server_error"
+        roll -= self.config.server_error_rate
+        if roll < self.config.truncate_rate:
+            return "truncate"
+        return None
+
+
+def _extract_prompt(payload: Dict) -> str:
+    """요청 payload에서 사용자 메시지 텍스트 추출"""
+    parts = []
+    for message in payload.get("messages", []):
+        content = message.get("content", "")
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(block.get("text", "") for block in content if isinstance(block, dict))
+    return "\n".join(parts)
+
+
+def _error_response(status_code: int, error_type: str, message: str, headers: Optional[Dict] = None) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"type": "error", "error": {"type": error_type, "message": message}},
+        headers=headers,
+    )
+
+
+def _sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def create_app(config: Optional[FakeApiConfig] = None) -> FastAPI:
+    """가짜 Messages API FastAPI 앱 생성"""
+    api = FakeClaudeApi(config or FakeApiConfig())
+    app = FastAPI(title="Fake Claude Messages API", docs_url=None, redoc_url=None)
+    app.state.fake_api = api
+    started_at = time.monotonic()
+
+    @app.post("/v1/messages")
+    async def create_message(request: Request):
+        payload = await request.json()
+        api.stats["requests"] += 1
+
+        await asyncio.sleep(api.config.sample_latency(api.rng))
+
+        failure = api.pick_failure()
+        if failure == "rate_limit":
+            api.stats["rate_limited"] += 1
+            return _error_response(
+                429, "rate_limit_error", "Fake rate limit",
+                headers={"retry-after": str(api.config.retry_after)},
+            )
+        if failure == "server_error":
+            api.stats["server_errors"] += 1
+            status_code = api.rng.choice([500, 503, 529])
+            error_type = "overloaded_error" if status_code == 529 else "api_error"
+            return _error_response(status_code, error_type, "Fake server error")
+
+        prompt = _extract_prompt(payload)
+        text = json.dumps(api.build_transactions(prompt), ensure_ascii=False)
+        stop_reason = "end_turn"
+        if failure == "truncate":
+            api.stats["truncated"] += 1
+            text = text[: max(1, len(text) // 2)]
+            stop_reason = "max_tokens"
+
+        message_id = f"msg_fake_{uuid.uuid4().hex[:24]}"
+        model = payload.get("model", "claude-3-haiku-20240307")
+        usage = {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4}
+
+        if not payload.get("stream"):
+            return {
+                "id": message_id,
+                "type": "message",
+                "role": "assistant",
+                "model": model,
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": stop_reason,
+                "stop_sequence": None,
+                "usage": usage,
+            }
+
+        api.stats["streamed"] += 1
+
+        async def event_stream():
+            yield _sse("message_start", {
+                "type": "message_start",
+                "message": {
+                    "id": message_id, "type": "message", "role": "assistant", "model": model,
+                    "content": [], "stop_reason": None, "stop_sequence": None,
+                    "usage": {"input_tokens": usage["input_tokens"], "output_tokens": 0},
+                },
+            })
+            yield _sse("content_block_start", {
+                "type": "content_block_start", "index": 0,
+                "content_block": {"type": "text", "text": ""},
+            })
+
+            size = max(1, api.config.stream_chunk_chars)
+            for offset in range(0, len(text), size):
+                yield _sse("content_block_delta", {
+                    "type": "content_block_delta", "index": 0,
+                    "delta": {"type": "text_delta", "text": text[offset:offset + size]},
+                })
+                await asyncio.sleep(api.config.stream_chunk_delay)
+
+            yield _sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+            yield _sse("message_delta", {
+                "type": "message_delta",
+                "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+                "usage": {"output_tokens": usage["output_tokens"]},
+            })
+            yield _sse("message_stop", {"type": "message_stop"})
+
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+    @app.get("/_config")
+    async def get_config():
+        return asdict(api.config)
+
+    @app.put("/_config")
+    async def update_config(request: Request):
+        return asdict(api.reconfigure(await request.json()))
+
+    @app.get("/_stats")
+    async def get_stats():
+        return {**api.stats, "uptime_seconds": round(time.monotonic() - started_at, 1)}
+
+    return app
+
+
+def main():
+    defaults = FakeApiConfig()
+    parser = argparse.ArgumentParser(description="로컬 Claude Messages API 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", default=defaults.latency,
+                        help="fixed:S | uniform:A,B | normal:MEAN,STD | lognormal:MU,SIGMA | exponential:MEAN")
+    parser.add_argument("--stream-chunk-delay", type=float, default=defaults.stream_chunk_delay)
+    parser.add_argument("--stream-chunk-chars", type=int, default=defaults.stream_chunk_chars)
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate)
+    parser.add_argument("--retry-after", type=float, default=defaults.retry_after)
+    parser.add_argument("--server-error-rate", type=float, default=defaults.server_error_rate)
+    parser.add_argument("--truncate-rate", type=float, default=defaults.truncate_rate)
+    parser.add_argument("--synthetic-rows", type=int, default=defaults.synthetic_rows)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    config = FakeApiConfig(
+        latency=args.latency,
+        stream_chunk_delay=args.stream_chunk_delay,
+        stream_chunk_chars=args.stream_chunk_chars,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        server_error_rate=args.server_error_rate,
+        truncate_rate=args.truncate_rate,
+        synthetic_rows=args.synthetic_rows,
+        seed=args.seed,
+    )
+    config.sample_latency(random.Random())  # 잘못된 분포 설정은 시작 시점에 실패시킴
+
+    print(f"🧪 Fake Claude API on http://{args.host}:{args.port}/v1/messages")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
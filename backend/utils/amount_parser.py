@@ -0,0 +1,91 @@
+"""
+한국 통화 금액 파싱 유틸리티
+Claude 응답 파싱과 Excel 생성에서 같은 규칙으로 금액을 정규화하기 위한 공용 함수
+"""
+import re
+import logging
+from functools import lru_cache
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# 통화 기호, '원', 쉼표, 공백을 한 번의 치환으로 제거
+_AMOUNT_NOISE = re.compile(r"[₩원,\s]")
+
+# 잡음을 제거한 뒤 금액으로 볼 수 있는 형태 (1234, -1234.5, +1234, (1234))
+_AMOUNT_SHAPE = re.compile(r"[-+]?\d+(?:\.\d+)?|\(\d+(?:\.\d+)?\)")
+
+# 같은 금액 문자열이 반복되는 명세서가 많으므로 결과를 캐시
+AMOUNT_CACHE_SIZE = 4096
+
+
+def parse_korean_amount(value) -> float:
+    """
+    한국 통화 표기법을 숫자로 변환
+
+    Args:
+        value: 숫자 또는 "₩5,800", "-5,800원", "(5,000)" 형태의 문자열
+
+    Returns:
+        변환된 금액 (변환 불가 시 0.0)
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    if not isinstance(value, str):
+        return 0.0
+
+    return _parse_amount_string(value)
+
+
+def try_parse_korean_amount(value) -> Optional[float]:
+    """
+    금액으로 해석할 수 있는 값만 변환 (parse_korean_amount와 같은 규칙)
+
+    형태를 먼저 확인하므로 금액이 아닌 값에 대해 경고 로그나 예외 없이 None을 반환한다.
+
+    Returns:
+        변환된 금액 (금액 형태가 아니면 None)
+    """
+    if isinstance(value, bool):
+        return None
+
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    if not isinstance(value, str):
+        return None
+
+    return _try_parse_amount_string(value)
+
+
+@lru_cache(maxsize=AMOUNT_CACHE_SIZE)
+def _try_parse_amount_string(value: str) -> Optional[float]:
+    """금액 형태인 문자열만 변환 (메모이제이션 적용)"""
+    if _AMOUNT_SHAPE.fullmatch(_AMOUNT_NOISE.sub("", value)) is None:
+        return None
+    return _parse_amount_string(value)
+
+
+@lru_cache(maxsize=AMOUNT_CACHE_SIZE)
+def _parse_amount_string(value: str) -> float:
+    """문자열 금액 변환 (메모이제이션 적용)"""
+    cleaned = _AMOUNT_NOISE.sub("", value)
+
+    # 괄호로 둘러싸인 음수 처리 (예: (5,000))
+    is_negative = False
+    if cleaned.startswith('(') and cleaned.endswith(')'):
+        cleaned = cleaned[1:-1]
+        is_negative = True
+    elif cleaned.startswith('-'):
+        is_negative = True
+        cleaned = cleaned[1:]
+    elif cleaned.startswith('+'):
+        cleaned = cleaned[1:]
+
+    try:
+        amount = float(cleaned)
+        return -amount if is_negative else amount
+    except ValueError:
+        logger.warning(f"Could not parse amount: {value}")
+        return 0.0
@@ -0,0 +1,52 @@
+"""
+명세서 날짜 파싱 유틸리티
+Excel 날짜 셀 작성과 거래 요약에서 같은 규칙으로 날짜 문자열을 해석하기 위한 공용 함수
+"""
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Optional
+
+# 2024-01-15, 2024.01.15, 2024/1/5, 2024-01-15 13:45(:30), 2024년 1월 15일
+_DATE_PATTERN = re.compile(
+    r"(\d{4})\s*(?:[-./]|년)\s*(\d{1,2})\s*(?:[-./]|월)\s*(\d{1,2})\s*일?\.?"
+    r"(?:[ T](\d{1,2}):(\d{2})(?::(\d{2}))?)?"
+)
+
+DATE_CACHE_SIZE = 4096
+
+
+def parse_statement_date(value) -> Optional[datetime]:
+    """
+    명세서 날짜 표기를 datetime으로 변환
+
+    Args:
+        value: date/datetime 또는 날짜 문자열
+
+    Returns:
+        변환된 날짜 (날짜 형태가 아니거나 존재하지 않는 날짜면 None)
+    """
+    if isinstance(value, datetime):
+        return value
+
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+
+    if not isinstance(value, str):
+        return None
+
+    return _parse_date_string(value.strip())
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date_string(value: str) -> Optional[datetime]:
+    """문자열 날짜 변환 (메모이제이션 적용)"""
+    match = _DATE_PATTERN.fullmatch(value)
+    if not match:
+        return None
+
+    year, month, day, hour, minute, second = (int(part) if part else 0 for part in match.groups())
+    try:
+        return datetime(year, month, day, hour, minute, second)
+    except ValueError:
+        return None
@@ -4,6 +4,8 @@ from typing import Dict, Optional
 import asyncio
 from datetime import datetime, timedelta
 
+from services.result_cache import result_cache
+
 class FileManager:
     """
     Utility class for managing temporary file storage and cleanup
@@ -93,12 +95,13 @@ class FileManager:
         return cls._file_registry.get(file_id)
     
     @classmethod
-    async def delete_file(cls, file_id: str) -> bool:
+    async def delete_file(cls, file_id: str, remove_from_disk: bool = True) -> bool:
         """
         Delete a file and remove it from registry
         
         Args:
             file_id: Unique identifier for the file
+            remove_from_disk: False keeps the physical file (e.g. still shared by other file_ids)
             
         Returns:
             True if file was deleted, False if not found
@@ -111,9 +114,10 @@ class FileManager:
             
             file_path = file_info["path"]
             
-            # Delete physical file if it exists
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            # Delete the result (and its other export formats) from the in-memory cache and disk
+            if remove_from_disk:
+                result_cache.discard(file_path)
+                cls._discard_exports(file_path)
             
             # Remove from registry
             del cls._file_registry[file_id]
@@ -123,6 +127,12 @@ class FileManager:
         except Exception:
             return False
     
+    @staticmethod
+    def _discard_exports(excel_path: str):
+        # Imported here because the export service itself depends on FileManager
+        from services.table_export import table_exporter
+        table_exporter.discard(excel_path)
+    
     @classmethod
     async def cleanup_old_files(cls, hours: int = 24) -> int:
         """
@@ -173,11 +183,15 @@ class FileManager:
             
             for ext in extensions:
                 file_path = await cls.get_temp_file_path(file_id, ext)
-                if os.path.exists(file_path):
-                    try:
-                        os.remove(file_path)
-                    except Exception:
-                        success = False
+                try:
+                    result_cache.discard(file_path)
+                except Exception:
+                    success = False
+            
+            try:
+                cls._discard_exports(await cls.get_temp_file_path(file_id, "xlsx"))
+            except Exception:
+                success = False
             
             # Also try to delete from registry
             if file_id in cls._file_registry:
@@ -202,8 +216,7 @@ class FileManager:
         total_size = 0
         for file_info in cls._file_registry.values():
             try:
-                if os.path.exists(file_info["path"]):
-                    total_size += os.path.getsize(file_info["path"])
+                total_size += result_cache.size(file_info["path"])
             except Exception:
                 continue
         